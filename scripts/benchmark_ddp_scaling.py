@@ -0,0 +1,86 @@
+"""
+Data-parallel scaling benchmark: 1 -> N gloo processes on one machine
+
+Trains the same config with 1, 2, 4, ... processes (cores split evenly
+between ranks) and reports train throughput, speedup and efficiency.
+
+Usage:
+    python scripts/benchmark_ddp_scaling.py --graph data/hetero_graph.pt --max_procs 8
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import torch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.data.adjacency import HeteroAdjacency, trd_edge_index_dict
+from src.models.distributed import train_data_parallel
+from src.utils.sweep import share_graph
+
+
+def main():
+    parser = argparse.ArgumentParser(description='DDP (gloo) scaling benchmark')
+    parser.add_argument('--graph', type=str, default='data/hetero_graph.pt')
+    parser.add_argument('--shared_graph', type=str, default='data/sweep_graph.pt')
+    parser.add_argument('--index', type=str, default='data/trd_adjacency.pt')
+    parser.add_argument('--model', type=str, default='simplified_hhgtn',
+                        choices=['e7_a3', 'simplified_hhgtn', 'trd_hhgtn'])
+    parser.add_argument('--max_procs', type=int, default=os.cpu_count())
+    parser.add_argument('--epochs', type=int, default=3)
+    parser.add_argument('--batch_size', type=int, default=1024)
+    parser.add_argument('--fanouts', type=int, nargs='+', default=[10, 10])
+    parser.add_argument('--output', type=str, default='reports/ddp_scaling.json')
+    args = parser.parse_args()
+
+    print(f"Loading graph: {args.graph}")
+    data = torch.load(args.graph, weights_only=False)
+    graph_path = share_graph(data, args.shared_graph)
+    if not Path(args.index).exists():
+        print("Building TRD adjacency index...")
+        edges = trd_edge_index_dict(data.edge_index_dict, {t: data[t].timestamp for t in data.node_types})
+        HeteroAdjacency(edges, {t: data[t].num_nodes for t in data.node_types}).save(args.index)
+    del data
+
+    config = {'model': args.model, 'epochs': args.epochs, 'batch_size': args.batch_size, 'fanouts': args.fanouts}
+    world_sizes = [n for n in (2 ** k for k in range(8)) if n <= args.max_procs]
+
+    rows = []
+    for world_size in world_sizes:
+        print(f"\n world_size={world_size}")
+        result = train_data_parallel(config, graph_path, args.index, world_size)
+        # First epoch includes page-in of the mapped graph; time the rest
+        seconds = result['history']['epoch_seconds'][1:] or result['history']['epoch_seconds']
+        epoch_s = float(np.median(seconds))
+        rows.append({
+            'world_size': world_size,
+            'threads_per_rank': result['threads_per_rank'],
+            'epoch_seconds': epoch_s,
+            'targets_per_sec': result['targets_per_epoch'] / epoch_s,
+            'final_val_pr_auc': result['history']['val_pr_auc'][-1]
+        })
+
+    base = rows[0]['targets_per_sec']
+    for row in rows:
+        row['speedup'] = row['targets_per_sec'] / base
+        row['efficiency'] = row['speedup'] / row['world_size']
+
+    print(f"\n{'Procs':>5} {'Threads':>7} {'Epoch s':>8} {'Targets/s':>10} {'Speedup':>8} {'Eff.':>6} {'Val PR-AUC':>10}")
+    for row in rows:
+        print(f"{row['world_size']:>5} {row['threads_per_rank']:>7} {row['epoch_seconds']:>8.2f} "
+              f"{row['targets_per_sec']:>10,.0f} {row['speedup']:>7.2f}x {row['efficiency']:>6.0%} "
+              f"{row['final_val_pr_auc']:>10.4f}")
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({'config': config, 'cores': os.cpu_count(), 'results': rows}, f, indent=2)
+    print(f"\n Saved: {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+CPU inference benchmark: eager fp32 vs TorchScript / torch.compile (+bf16)
+
+Scores a fixed batch of validation transactions (with their exact L-hop
+in-neighborhood) and reports parity on val scores plus latency/throughput.
+
+Usage:
+    python scripts/benchmark_inference.py --model e7_a3 \
+        --checkpoint reports/Kaggle_results/a3_best.pt --graph data/hetero_graph.pt
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import torch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.data.adjacency import HeteroAdjacency
+from src.models.hhgtn import build_model, load_checkpoint
+from src.models.inference import bf16_supported, compare_backends
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark CPU inference backends')
+    parser.add_argument('--graph', type=str, default='data/hetero_graph.pt',
+                        help='HeteroData built by build_hetero_graph.py')
+    parser.add_argument('--model', type=str, default='e7_a3',
+                        choices=['e7_a3', 'simplified_hhgtn', 'trd_hhgtn'])
+    parser.add_argument('--checkpoint', type=str, default=None,
+                        help='Trained checkpoint (random weights if omitted)')
+    parser.add_argument('--batch_size', type=int, default=2048,
+                        help='Validation transactions scored per call')
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--threads', type=int, default=None,
+                        help='torch intra-op threads (default: torch default)')
+    parser.add_argument('--output', type=str, default='reports/inference_benchmark.json')
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    print(f"Loading graph: {args.graph}")
+    data = torch.load(args.graph, weights_only=False)
+
+    model = build_model(args.model)
+    if args.checkpoint:
+        load_checkpoint(model, args.checkpoint)
+    model.eval()
+
+    # Fixed batch: first val transactions + exact receptive field
+    seeds = data['transaction'].val_mask.nonzero().view(-1)[:args.batch_size]
+    adjacency = HeteroAdjacency(data.edge_index_dict, {t: data[t].num_nodes for t in data.node_types})
+    nodes, edge_index_dict = adjacency.subgraph({'transaction': seeds}, model.num_layers)
+    x_dict = {t: data[t].x[idx] for t, idx in nodes.items()}
+    y = data['transaction'].y[nodes['transaction']]
+    mask = torch.isin(nodes['transaction'], seeds)
+
+    print(f"   Scored transactions: {int(mask.sum()):,}")
+    print(f"   Subgraph nodes: " + ", ".join(f"{t}={idx.numel():,}" for t, idx in nodes.items()))
+    print(f"   Native bf16: {bf16_supported()}, threads: {torch.get_num_threads()}")
+
+    rows = compare_backends(model, x_dict, edge_index_dict, y, mask, repeats=args.repeats)
+
+    print(f"\n{'Backend':<16} {'p50 ms':>9} {'p90 ms':>9} {'tx/s':>12} {'speedup':>8} {'max|Δp|':>10} {'ΔPR-AUC':>9}")
+    print("-" * 80)
+    for row in rows:
+        print(f"{row['backend']:<16} {row['p50_ms']:>9.2f} {row['p90_ms']:>9.2f} {row['tx_per_sec']:>12,.0f} "
+              f"{row['speedup']:>7.2f}x {row['max_abs_diff']:>10.2e} {row['pr_auc_delta']:>+9.4f}")
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            'model': args.model,
+            'checkpoint': args.checkpoint,
+            'num_scored': int(mask.sum()),
+            'threads': torch.get_num_threads(),
+            'results': rows
+        }, f, indent=2)
+    print(f"\n Saved: {output}")
+
+
+if __name__ == '__main__':
+    main()
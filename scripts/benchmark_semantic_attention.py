@@ -0,0 +1,143 @@
+"""
+Semantic attention cost: MultiheadAttention vs segment softmax
+
+Compares, at equal hidden size, full-graph train steps and inference of:
+
+    sum      TRD_HHGTN as trained in E6 (relations summed, no attention)
+    mha      TRD_HHGTN with its nn.MultiheadAttention block applied over
+             the stacked [N, R, H] relation outputs
+    segment  SegmentHHGTN (per-node-type attention vector, segment softmax)
+
+Each variant runs in a fresh subprocess so peak RSS is comparable. The
+attention block itself is measured with `label_relations` profiler ranges
+(forward/backward CPU time and memory allocated inside the range).
+
+Usage:
+    python scripts/benchmark_semantic_attention.py --graph data/hetero_graph.pt --hidden_dim 128
+    python scripts/benchmark_semantic_attention.py --scale medium   # generated Elliptic++-shaped graph
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import torch
+from torch.profiler import ProfilerActivity, profile
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.models.hhgtn import build_model
+from src.models.trainer import FullGraphTrainer
+from src.utils.benchmark import SCALES, bench_graph_build, generate_elliptic_like, peak_rss_mb
+from src.utils.profiling import label_relations, relation_breakdown
+
+
+VARIANTS = {
+    'sum': ('trd_hhgtn', {}),
+    'mha': ('trd_hhgtn', {'apply_semantic_attention': True}),
+    'segment': ('segment_hhgtn', {})
+}
+
+
+def median_seconds(fn, repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def measure(graph_path: str, variant: str, hidden_dim: int, repeats: int) -> dict:
+    data = torch.load(graph_path, weights_only=False)
+    tx = data['transaction']
+    edge_types = [('transaction', 'to', 'transaction'), ('address', 'to', 'transaction'),
+                  ('transaction', 'to', 'address'), ('address', 'to', 'address')]
+    name, kwargs = VARIANTS[variant]
+    torch.manual_seed(0)
+    model = build_model(name, hidden_dim=hidden_dim, **kwargs)
+    trainer = FullGraphTrainer(model, {t: data[t].x for t in data.node_types},
+                               {et: data[et].edge_index for et in edge_types},
+                               tx.y, tx.train_mask, tx.val_mask, tx.test_mask)
+    trainer.train_epoch()  # warmup
+    result = {
+        'params': sum(p.numel() for p in model.parameters()),
+        'train_step_s': median_seconds(trainer.train_epoch, repeats),
+        'inference_s': median_seconds(trainer.predict, repeats)
+    }
+
+    handles = label_relations(model)
+    try:
+        with profile(activities=[ProfilerActivity.CPU], profile_memory=True) as prof:
+            trainer.train_epoch()
+    finally:
+        for h in handles:
+            h.remove()
+    ranges = relation_breakdown(prof.key_averages())
+    for key in ('semantic_attention', 'semantic_attention_backward'):
+        r = ranges.get(key, {'cpu_ms': 0.0, 'cpu_memory_mb': 0.0})
+        result[f'{key}_ms'] = r['cpu_ms']
+        result[f'{key}_memory_mb'] = r['cpu_memory_mb']
+    result['peak_rss_mb'] = peak_rss_mb()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='MultiheadAttention vs segment-softmax semantic attention')
+    parser.add_argument('--graph', type=str, default=None, help='HeteroData from the builder')
+    parser.add_argument('--scale', type=str, default='small', choices=list(SCALES),
+                        help='Generated graph size when --graph is not given')
+    parser.add_argument('--work_dir', type=str, default='data/benchmark')
+    parser.add_argument('--hidden_dim', type=int, default=128)
+    parser.add_argument('--variants', type=str, nargs='+', default=list(VARIANTS), choices=list(VARIANTS))
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--worker', type=str, default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--output', type=str, default='reports/semantic_attention.json')
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(measure(args.graph, args.worker, args.hidden_dim, args.repeats)))
+        return
+
+    graph_path = args.graph
+    if graph_path is None:
+        root = Path(args.work_dir) / f'elliptic_like_{SCALES[args.scale]}'
+        if not (root / 'AddrAddr_edgelist.csv').exists():
+            generate_elliptic_like(root, SCALES[args.scale])
+        graph_path = str(root / 'hetero_graph.pt')
+        torch.save(bench_graph_build(root)[1], graph_path)
+
+    results = {}
+    for variant in args.variants:
+        out = subprocess.run([sys.executable, __file__, '--worker', variant, '--graph', graph_path,
+                              '--hidden_dim', str(args.hidden_dim), '--repeats', str(args.repeats)],
+                             capture_output=True, text=True, check=True)
+        results[variant] = json.loads(out.stdout.strip().splitlines()[-1])
+        r = results[variant]
+        print(f"  {variant:<8} train step {r['train_step_s']:.3f}s | inference {r['inference_s']:.3f}s | "
+              f"attention fwd {r['semantic_attention_ms']:7.1f} ms / {r['semantic_attention_memory_mb']:7.1f} MB, "
+              f"bwd {r['semantic_attention_backward_ms']:7.1f} ms | peak RSS {r['peak_rss_mb']:.0f} MB")
+
+    if 'mha' in results and 'segment' in results:
+        mha, seg = results['mha'], results['segment']
+        results['segment_vs_mha'] = {
+            'train_speedup': mha['train_step_s'] / seg['train_step_s'],
+            'inference_speedup': mha['inference_s'] / seg['inference_s'],
+            'attention_memory_ratio': seg['semantic_attention_memory_mb'] / max(mha['semantic_attention_memory_mb'], 1e-9),
+            'peak_rss_saved_mb': mha['peak_rss_mb'] - seg['peak_rss_mb']
+        }
+        print(f"\n segment vs mha: {results['segment_vs_mha']['train_speedup']:.2f}x train, "
+              f"{results['segment_vs_mha']['inference_speedup']:.2f}x inference")
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({'graph': graph_path, 'hidden_dim': args.hidden_dim, 'results': results}, f, indent=2)
+    print(f"\n Saved: {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Distill a graph-free MLP student from a trained hetero GNN teacher
+
+Trains the student on teacher soft labels, then reports the share of the
+teacher's test PR-AUC it keeps and the scoring latency of both on a fixed
+batch of test transactions (teacher latency includes the neighborhood fetch).
+
+Usage:
+    python scripts/distill_student.py --teacher e7_a3 \
+        --checkpoint reports/Kaggle_results/a3_best.pt --graph data/hetero_graph.pt
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import torch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.data.adjacency import HeteroAdjacency
+from src.models.distill import MLPStudent, distill, feature_aggregates, save_student
+from src.models.hhgtn import build_model, load_checkpoint
+from src.utils.metrics import pr_auc, roc_auc
+
+
+def time_ms(fn, repeats: int, warmup: int = 2):
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return {'p50_ms': float(np.percentile(times, 50)), 'p99_ms': float(np.percentile(times, 99))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Distill an MLP student from a GNN teacher')
+    parser.add_argument('--graph', type=str, default='data/hetero_graph.pt')
+    parser.add_argument('--teacher', type=str, default='e7_a3',
+                        choices=['e7_a3', 'simplified_hhgtn', 'trd_hhgtn'])
+    parser.add_argument('--checkpoint', type=str, required=True, help='Teacher checkpoint')
+    parser.add_argument('--output_dir', type=str, default='reports/distilled_mlp')
+    parser.add_argument('--hidden_dim', type=int, default=128)
+    parser.add_argument('--temperature', type=float, default=2.0)
+    parser.add_argument('--alpha', type=float, default=0.7)
+    parser.add_argument('--max_epochs', type=int, default=100)
+    parser.add_argument('--batch_size', type=int, default=2048,
+                        help='Test transactions in the latency batch')
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"Loading graph: {args.graph}")
+    data = torch.load(args.graph, weights_only=False)
+    tx = data['transaction']
+
+    teacher = load_checkpoint(build_model(args.teacher), args.checkpoint)
+    with torch.no_grad():
+        teacher_logits = teacher(data.x_dict, data.edge_index_dict)
+
+    print("\n Precomputing aggregates...")
+    time_dict = {t: data[t].timestamp for t in data.node_types}
+    aggregates, names = feature_aggregates(data.x_dict, data.edge_index_dict, time_dict)
+    features = torch.cat([tx.x, aggregates], dim=1)
+    print(f"   Student input: {tx.x.shape[1]} features + {aggregates.shape[1]} aggregates")
+
+    print("\n Distilling...")
+    student = MLPStudent(features.shape[1], hidden_dim=args.hidden_dim)
+    result = distill(student, features, teacher_logits, tx.y, tx.train_mask, tx.val_mask,
+                     temperature=args.temperature, alpha=args.alpha, max_epochs=args.max_epochs)
+
+    # Test PR-AUC retention
+    test = tx.test_mask & (tx.y >= 0)
+    y_test = tx.y[test]
+    with torch.no_grad():
+        student_probs = torch.sigmoid(student(features[test]))
+    teacher_probs = torch.sigmoid(teacher_logits[test])
+    metrics = {
+        'teacher': {'pr_auc': pr_auc(y_test, teacher_probs), 'roc_auc': roc_auc(y_test, teacher_probs)},
+        'student': {'pr_auc': pr_auc(y_test, student_probs), 'roc_auc': roc_auc(y_test, student_probs)}
+    }
+    metrics['pr_auc_retention'] = metrics['student']['pr_auc'] / max(metrics['teacher']['pr_auc'], 1e-12)
+
+    # Latency on a fixed batch: teacher fetch + forward vs student lookup + MLP
+    seeds = tx.test_mask.nonzero().view(-1)[:args.batch_size]
+    adjacency = HeteroAdjacency(data.edge_index_dict, {t: data[t].num_nodes for t in data.node_types})
+
+    @torch.no_grad()
+    def score_teacher():
+        nodes, edge_index_dict = adjacency.subgraph({'transaction': seeds}, teacher.num_layers)
+        x_dict = {t: data[t].x[idx] for t, idx in nodes.items()}
+        return teacher(x_dict, edge_index_dict)
+
+    @torch.no_grad()
+    def score_student():
+        return torch.sigmoid(student(torch.cat([tx.x[seeds], aggregates[seeds]], dim=1)))
+
+    latency = {
+        'batch_size': int(seeds.numel()),
+        'teacher': time_ms(score_teacher, args.repeats),
+        'student': time_ms(score_student, args.repeats)
+    }
+    latency['p50_speedup'] = latency['teacher']['p50_ms'] / latency['student']['p50_ms']
+
+    print(f"\n{'':<10} {'PR-AUC':>8} {'ROC-AUC':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for name in ('teacher', 'student'):
+        print(f"{name:<10} {metrics[name]['pr_auc']:>8.4f} {metrics[name]['roc_auc']:>8.4f} "
+              f"{latency[name]['p50_ms']:>8.2f} {latency[name]['p99_ms']:>8.2f}")
+    print(f"PR-AUC retention: {metrics['pr_auc_retention']:.1%} | p50 speedup: {latency['p50_speedup']:.1f}x")
+
+    save_student(student, aggregates, args.output_dir, names, meta={
+        'teacher': args.teacher,
+        'teacher_checkpoint': args.checkpoint,
+        'temperature': args.temperature,
+        'alpha': args.alpha,
+        'best_val_pr_auc': result['best_val_pr_auc'],
+        'test': metrics,
+        'latency': latency
+    })
+
+
+if __name__ == '__main__':
+    main()
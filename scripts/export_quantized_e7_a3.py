@@ -0,0 +1,125 @@
+"""
+Export an int8 dynamic-quantized E7-A3 scoring artifact
+
+Evaluates PR-AUC/ROC-AUC on the test split for fp32 vs int8, benchmarks
+scoring latency on a fixed batch of test transactions, and writes the
+artifact (weights + meta.json with the report).
+
+Model size is reported two ways: the serialized state dict (file size)
+and the peak RSS of scoring the full graph, each precision in a fresh
+subprocess so the peaks are comparable.
+
+Usage:
+    python scripts/export_quantized_e7_a3.py \
+        --checkpoint reports/Kaggle_results/a3_best.pt --graph data/hetero_graph.pt
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import torch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.data.adjacency import HeteroAdjacency
+from src.models.hhgtn import E7_A3_Model, load_checkpoint
+from src.models.inference import InferenceSession
+from src.models.quantize import compare_quantized, export_quantized_e7_a3, quantize_dynamic_int8
+from src.utils.benchmark import peak_rss_mb
+
+
+def measure_rss(graph_path: str, checkpoint: str, precision: str, hidden_dim: int) -> dict:
+    """Peak RSS of loading the graph, then building and running one full-graph scoring pass."""
+    data = torch.load(graph_path, weights_only=False)
+    graph_rss = peak_rss_mb()
+    # int8 is built the way `load_quantized_e7_a3` builds it: fp32 module first, then quantized
+    model = load_checkpoint(E7_A3_Model(hidden_dim=hidden_dim), checkpoint)
+    if precision == 'int8':
+        model = quantize_dynamic_int8(model)
+    session = InferenceSession(model, backend='eager', bf16=False)
+    with torch.no_grad():
+        session(data.x_dict, data.edge_index_dict)
+    return {'graph_rss_mb': graph_rss, 'peak_rss_mb': peak_rss_mb()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export int8 E7-A3 scorer')
+    parser.add_argument('--checkpoint', type=str, required=True, help='fp32 E7-A3 checkpoint')
+    parser.add_argument('--graph', type=str, default='data/hetero_graph.pt')
+    parser.add_argument('--output_dir', type=str, default='reports/e7_a3_int8')
+    parser.add_argument('--hidden_dim', type=int, default=64)
+    parser.add_argument('--batch_size', type=int, default=2048,
+                        help='Test transactions in the latency batch')
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--worker', type=str, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(measure_rss(args.graph, args.checkpoint, args.worker, args.hidden_dim)))
+        return
+
+    print(f"Loading graph: {args.graph}")
+    data = torch.load(args.graph, weights_only=False)
+    y = data['transaction'].y
+    test_mask = data['transaction'].test_mask
+
+    fp32_model = load_checkpoint(E7_A3_Model(hidden_dim=args.hidden_dim), args.checkpoint)
+    int8_model = quantize_dynamic_int8(fp32_model)
+
+    # Accuracy: full graph, test split
+    print("\n Evaluating fp32 vs int8 on test split (full graph)...")
+    full = compare_quantized(fp32_model, int8_model, data.x_dict, data.edge_index_dict,
+                             y, test_mask, repeats=1)
+
+    # Latency: fixed batch of test transactions with exact receptive field
+    seeds = test_mask.nonzero().view(-1)[:args.batch_size]
+    adjacency = HeteroAdjacency(data.edge_index_dict, {t: data[t].num_nodes for t in data.node_types})
+    nodes, edge_index_dict = adjacency.subgraph({'transaction': seeds}, fp32_model.num_layers)
+    x_dict = {t: data[t].x[idx] for t, idx in nodes.items()}
+    batch_mask = torch.isin(nodes['transaction'], seeds)
+    batch = compare_quantized(fp32_model, int8_model, x_dict, edge_index_dict,
+                              y[nodes['transaction']], batch_mask, repeats=args.repeats)
+
+    # Memory: peak RSS of full-graph scoring, one fresh process per precision
+    print("\n Measuring scoring peak RSS (fresh process per precision)...")
+    rss = {}
+    for name in ('fp32', 'int8'):
+        out = subprocess.run([sys.executable, __file__, '--worker', name, '--graph', args.graph,
+                              '--checkpoint', args.checkpoint, '--hidden_dim', str(args.hidden_dim)],
+                             capture_output=True, text=True, check=True)
+        rss[name] = json.loads(out.stdout.strip().splitlines()[-1])
+
+    report = {
+        'test': {
+            'fp32': {k: full['fp32'][k] for k in ('pr_auc', 'roc_auc')},
+            'int8': {k: full['int8'][k] for k in ('pr_auc', 'roc_auc')},
+            'delta': {k: full['delta'][k] for k in ('pr_auc', 'roc_auc')}
+        },
+        'latency_batch': {
+            'num_scored': int(batch_mask.sum()),
+            'fp32': {k: batch['fp32'][k] for k in ('p50_ms', 'p90_ms', 'tx_per_sec')},
+            'int8': {k: batch['int8'][k] for k in ('p50_ms', 'p90_ms', 'tx_per_sec')},
+            'speedup': batch['delta']['speedup']
+        },
+        'size_bytes': {'fp32': full['fp32']['size_bytes'], 'int8': full['int8']['size_bytes']},
+        'peak_rss_mb': {name: rss[name]['peak_rss_mb'] for name in ('fp32', 'int8')},
+        'graph_rss_mb': rss['fp32']['graph_rss_mb']
+    }
+
+    print(f"\n{'':<8} {'PR-AUC':>8} {'ROC-AUC':>8} {'p50 ms':>8} {'tx/s':>10} {'size KB':>8} {'RSS MB':>8}")
+    for name in ('fp32', 'int8'):
+        print(f"{name:<8} {full[name]['pr_auc']:>8.4f} {full[name]['roc_auc']:>8.4f} "
+              f"{batch[name]['p50_ms']:>8.2f} {batch[name]['tx_per_sec']:>10,.0f} "
+              f"{full[name]['size_bytes'] / 1024:>8.1f} {rss[name]['peak_rss_mb']:>8.0f}")
+    print(f"Δ PR-AUC: {full['delta']['pr_auc']:+.4f} | Δ ROC-AUC: {full['delta']['roc_auc']:+.4f} | "
+          f"speedup: {batch['delta']['speedup']:.2f}x | size: {full['delta']['size_ratio']:.2f}x | "
+          f"peak RSS: {rss['int8']['peak_rss_mb']:.0f} vs {rss['fp32']['peak_rss_mb']:.0f} MB "
+          f"(graph alone {rss['fp32']['graph_rss_mb']:.0f} MB)")
+
+    export_quantized_e7_a3(args.checkpoint, args.output_dir, hidden_dim=args.hidden_dim, report=report)
+
+
+if __name__ == '__main__':
+    main()
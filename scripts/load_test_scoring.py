@@ -0,0 +1,97 @@
+"""
+Load generator for the local scoring server
+
+Opens `--concurrency` persistent connections that each send scoring
+requests back-to-back for `--duration` seconds, then reports sustained
+throughput, client-side latency and the server's batch statistics.
+
+Usage:
+    python scripts/serve_scoring.py --checkpoint reports/Kaggle_results/a3_best.pt &
+    python scripts/load_test_scoring.py --concurrency 64 --duration 30
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+async def request(reader, writer, message: dict) -> dict:
+    writer.write((json.dumps(message) + '\n').encode())
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+async def client(host: str, port: int, num_targets: int, deadline: float, seed: int):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    latencies, errors = [], 0
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await request(reader, writer, {'tx_id': rng.randrange(num_targets)})
+        latencies.append((time.perf_counter() - start) * 1000)
+        errors += 'error' in response
+    writer.close()
+    return latencies, errors
+
+
+async def run(args) -> dict:
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    before = await request(reader, writer, {'op': 'stats'})
+
+    deadline = time.perf_counter() + args.duration
+    start = time.perf_counter()
+    results = await asyncio.gather(*(
+        client(args.host, args.port, before['num_targets'], deadline, seed)
+        for seed in range(args.concurrency)
+    ))
+    elapsed = time.perf_counter() - start
+
+    after = await request(reader, writer, {'op': 'stats'})
+    writer.close()
+
+    latencies = np.concatenate([np.array(l) for l, _ in results])
+    return {
+        'concurrency': args.concurrency,
+        'duration_s': elapsed,
+        'requests': int(latencies.size),
+        'errors': int(sum(e for _, e in results)),
+        'throughput_rps': float(latencies.size / elapsed),
+        'client_p50_ms': float(np.percentile(latencies, 50)),
+        'client_p99_ms': float(np.percentile(latencies, 99)),
+        'server': after
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the scoring server')
+    parser.add_argument('--host', type=str, default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--duration', type=float, default=30.0)
+    parser.add_argument('--output', type=str, default='reports/scoring_load_test.json')
+    args = parser.parse_args()
+
+    print(f"Load test: {args.concurrency} clients for {args.duration:g}s -> {args.host}:{args.port}")
+    report = asyncio.run(run(args))
+
+    server = report['server']
+    print(f"\n   Throughput:   {report['throughput_rps']:,.0f} req/s ({report['requests']:,} requests, "
+          f"{report['errors']} errors)")
+    print(f"   Client p50/p99: {report['client_p50_ms']:.2f} / {report['client_p99_ms']:.2f} ms")
+    print(f"   Server p50/p99: {server['p50_ms']:.2f} / {server['p99_ms']:.2f} ms "
+          f"(mean batch {server['mean_batch_size']:.1f})")
+    print(f"   Batch sizes:  {server['batch_size_histogram']}")
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n Saved: {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Profile full-graph training / inference of a hetero model with torch.profiler
+
+Writes a Chrome trace, op tables sorted by self CPU time and memory, and
+the per-relation (tx->tx, addr->tx, tx->addr, addr->addr) forward/backward
+breakdown for each mode under <output_dir>/<model>/<mode>/.
+
+Usage:
+    python scripts/profile_model.py --graph data/hetero_graph.pt --model trd_hhgtn --mode train inference
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import torch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.models.trainer import trainer_from_config
+from src.utils.profiling import profile_trainer
+from src.utils.sweep import load_shared_graph, share_graph
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-relation torch.profiler breakdown of a hetero model')
+    parser.add_argument('--graph', type=str, default='data/hetero_graph.pt')
+    parser.add_argument('--shared_graph', type=str, default='data/sweep_graph.pt')
+    parser.add_argument('--model', type=str, default='e7_a3',
+                        choices=['e7_a3', 'simplified_hhgtn', 'trd_hhgtn'])
+    parser.add_argument('--mode', type=str, nargs='+', default=['train', 'inference'],
+                        choices=['train', 'inference'])
+    parser.add_argument('--fanout', type=int, default=None, help='Per-relation in-edge cap for training steps')
+    parser.add_argument('--wait', type=int, default=1)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--active', type=int, default=3, help='Profiled steps')
+    parser.add_argument('--output_dir', type=str, default='reports/profile')
+    args = parser.parse_args()
+
+    print(f"Loading graph: {args.graph}")
+    data = torch.load(args.graph, weights_only=False)
+    graph_path = share_graph(data, args.shared_graph)
+    del data
+    graph = load_shared_graph(graph_path)
+
+    summary = {}
+    for mode in args.mode:
+        trainer = trainer_from_config({'model': args.model, 'fanout': args.fanout}, graph)
+        report = profile_trainer(trainer, Path(args.output_dir) / args.model / mode, mode,
+                                 args.wait, args.warmup, args.active)
+        summary[mode] = report['relations']
+        print(f"\n{args.model} {mode} ({args.active} steps):")
+        for name, r in report['relations'].items():
+            print(f"  {name:<45} {r['cpu_ms']:9.1f} ms  {r['cpu_memory_mb']:8.1f} MB")
+
+    output = Path(args.output_dir) / args.model / 'relations.json'
+    with open(output, 'w') as f:
+        json.dump({'model': args.model, 'steps': args.active, 'modes': summary}, f, indent=2)
+    print(f"\n Saved: {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Successive-halving (ASHA) search over hetero model hyperparameters
+
+Usage:
+    python scripts/run_asha.py --config configs/asha_search.json --graph data/hetero_graph.pt \
+        --min_epochs 5 --max_epochs 100 --eta 3
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import torch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.utils.asha import run_asha
+from src.utils.sweep import load_sweep_config, share_graph
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ASHA hyperparameter search')
+    parser.add_argument('--config', type=str, required=True, help='Sweep JSON (runs and/or grid)')
+    parser.add_argument('--graph', type=str, default='data/hetero_graph.pt')
+    parser.add_argument('--shared_graph', type=str, default='data/sweep_graph.pt')
+    parser.add_argument('--work_dir', type=str, default='data/asha_trials',
+                        help='Per-trial checkpoints')
+    parser.add_argument('--output_dir', type=str, default='reports/sweeps')
+    parser.add_argument('--name', type=str, default=None, help='Search name (default: config file stem)')
+    parser.add_argument('--min_epochs', type=int, default=5)
+    parser.add_argument('--max_epochs', type=int, default=100)
+    parser.add_argument('--eta', type=int, default=3, help='Reduction factor')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--threads_per_worker', type=int, default=None)
+    args = parser.parse_args()
+
+    configs = load_sweep_config(args.config)
+
+    print(f"Loading graph: {args.graph}")
+    data = torch.load(args.graph, weights_only=False)
+    graph_path = share_graph(data, args.shared_graph)
+    del data
+
+    summary = run_asha(configs, graph_path, args.work_dir, args.output_dir, args.name or Path(args.config).stem,
+                       min_epochs=args.min_epochs, max_epochs=args.max_epochs, reduction_factor=args.eta,
+                       workers=args.workers, threads_per_worker=args.threads_per_worker)
+
+    print(f"\n{'Trial':<56} {'Epochs':>6} {'Val PR-AUC':>10} {'Test PR-AUC':>11}")
+    for trial in summary['trials'][:10]:
+        test = f"{trial['test']['pr_auc']:>11.4f}" if 'test' in trial else f"{'-':>11}"
+        print(f"{trial['name']:<56} {trial['epochs']:>6} {trial['val_pr_auc']:>10.4f} {test}")
+
+
+if __name__ == '__main__':
+    main()
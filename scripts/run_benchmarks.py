@@ -0,0 +1,75 @@
+"""
+Performance benchmark suite with regression baselines
+
+Generates an Elliptic++-shaped graph (benchmark use only), measures build,
+sampling, training, inference, scoring latency and peak RSS, and compares
+against a stored JSON baseline. Exits with status 1 when any metric
+regresses past the tolerance.
+
+Usage:
+    python scripts/run_benchmarks.py --scale small --update_baseline   # record baseline
+    python scripts/run_benchmarks.py --scale small --tolerance 0.2     # check for regressions
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.utils.benchmark import SCALES, compare_to_baseline, load_results, run_suite, save_results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Performance benchmarks with regression baselines')
+    parser.add_argument('--scale', type=str, default='small', choices=list(SCALES))
+    parser.add_argument('--num_tx', type=int, default=None, help='Override the transaction count of --scale')
+    parser.add_argument('--work_dir', type=str, default='data/benchmark', help='Generated graph cache')
+    parser.add_argument('--fanouts', type=str, nargs='+', default=['10,10', '25,10'])
+    parser.add_argument('--batch_sizes', type=int, nargs='+', default=[64, 256])
+    parser.add_argument('--model', type=str, default='e7_a3',
+                        choices=['e7_a3', 'simplified_hhgtn', 'trd_hhgtn'])
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--baseline', type=str, default=None,
+                        help='Baseline JSON (default: reports/benchmarks/baseline_<scale>.json)')
+    parser.add_argument('--update_baseline', action='store_true', help='Store this run as the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed relative regression')
+    parser.add_argument('--output', type=str, default=None,
+                        help='Result JSON (default: reports/benchmarks/<scale>.json)')
+    args = parser.parse_args()
+
+    num_tx = args.num_tx or SCALES[args.scale]
+    name = args.scale if args.num_tx is None else f'tx{num_tx}'
+    baseline_path = Path(args.baseline or f'reports/benchmarks/baseline_{name}.json')
+
+    results = run_suite(num_tx, args.work_dir, [[int(f) for f in spec.split(',')] for spec in args.fanouts],
+                        args.batch_sizes, args.model, args.repeats)
+    save_results(results, args.output or f'reports/benchmarks/{name}.json')
+
+    baseline = load_results(baseline_path) if baseline_path.exists() else None
+    print(f"\n{'Metric':<48} {'Value':>12} {'Baseline':>12} {'Change':>8}")
+    for metric, m in results['metrics'].items():
+        base = baseline['metrics'].get(metric) if baseline else None
+        change = f"{m['value'] / base['value'] - 1:+.1%}" if base and base['value'] else ''
+        base_value = f"{base['value']:.4g}" if base else '-'
+        print(f"{metric:<48} {m['value']:>12.4g} {base_value:>12} {change:>8}  {m['unit']}")
+
+    if args.update_baseline:
+        save_results(results, baseline_path)
+        print(f"\n Baseline updated: {baseline_path}")
+        return
+    if baseline is None:
+        print(f"\n No baseline at {baseline_path}; run with --update_baseline to record one")
+        return
+
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n {len(regressions)} regression(s) beyond tolerance:")
+        for r in regressions:
+            print(f"   {r['metric']}: {r['baseline']:.4g} -> {r['current']:.4g} ({r['change']:+.1%}, "
+                  f"allowed {r['tolerance']:.0%})")
+        sys.exit(1)
+    print(f"\n No regressions beyond {args.tolerance:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Run a hyperparameter / ablation sweep in parallel
+
+Usage:
+    python scripts/run_sweep.py --config configs/e7_ablation.json --graph data/hetero_graph.pt
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import torch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.utils.sweep import load_sweep_config, run_sweep, share_graph
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Parallel sweep runner')
+    parser.add_argument('--config', type=str, required=True, help='Sweep JSON (runs and/or grid)')
+    parser.add_argument('--graph', type=str, default='data/hetero_graph.pt')
+    parser.add_argument('--shared_graph', type=str, default='data/sweep_graph.pt',
+                        help='Memory-mapped copy of the graph shared by workers')
+    parser.add_argument('--output_dir', type=str, default='reports/sweeps')
+    parser.add_argument('--name', type=str, default=None, help='Sweep name (default: config file stem)')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--threads_per_worker', type=int, default=None)
+    parser.add_argument('--max_epochs', type=int, default=None, help='Override max_epochs of every run')
+    args = parser.parse_args()
+
+    configs = load_sweep_config(args.config)
+    if args.max_epochs is not None:
+        configs = [{**c, 'max_epochs': args.max_epochs} for c in configs]
+
+    print(f"Loading graph: {args.graph}")
+    data = torch.load(args.graph, weights_only=False)
+    graph_path = share_graph(data, args.shared_graph)
+    del data
+
+    records = run_sweep(configs, graph_path, args.output_dir, args.name or Path(args.config).stem,
+                        workers=args.workers, threads_per_worker=args.threads_per_worker)
+
+    print(f"\n{'Run':<24} {'Val PR-AUC':>10} {'Test PR-AUC':>11} {'Test ROC-AUC':>12} {'Test F1':>8} {'Time s':>7}")
+    for r in sorted(records, key=lambda r: -r['val']['pr_auc']):
+        print(f"{r['name']:<24} {r['val']['pr_auc']:>10.4f} {r['test']['pr_auc']:>11.4f} "
+              f"{r['test']['roc_auc']:>12.4f} {r['test']['best_f1']:>8.4f} {r['train_seconds']:>7.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Local micro-batching scoring server
+
+Loads the graph and a trained checkpoint, builds (or reuses) the persistent
+TRD adjacency index, and serves fraud probabilities over JSON-lines TCP.
+
+Usage:
+    python scripts/serve_scoring.py --model e7_a3 \
+        --checkpoint reports/Kaggle_results/a3_best.pt --graph data/hetero_graph.pt
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+import torch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.data.adjacency import HeteroAdjacency, trd_edge_index_dict
+from src.models.hhgtn import build_model, load_checkpoint
+from src.models.serving import ScoringServer
+
+
+def load_index(data, index_path: Path, directed: bool) -> HeteroAdjacency:
+    """Load the TRD adjacency index, building and saving it on first use."""
+    if index_path.exists():
+        print(f"Loading adjacency index: {index_path}")
+        return HeteroAdjacency.load(index_path)
+
+    print("Building TRD adjacency index...")
+    time_dict = {t: data[t].timestamp for t in data.node_types}
+    edges = trd_edge_index_dict(data.edge_index_dict, time_dict, directed=directed)
+    adjacency = HeteroAdjacency(edges, {t: data[t].num_nodes for t in data.node_types})
+    adjacency.save(index_path)
+    print(f" Saved adjacency index: {index_path}")
+    return adjacency
+
+
+async def serve(server: ScoringServer, host: str, port: int):
+    async with server:
+        tcp = await server.serve_tcp(host, port)
+        async with tcp:
+            await tcp.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve fraud scores with micro-batching')
+    parser.add_argument('--graph', type=str, default='data/hetero_graph.pt')
+    parser.add_argument('--model', type=str, default='e7_a3',
+                        choices=['e7_a3', 'simplified_hhgtn', 'trd_hhgtn'])
+    parser.add_argument('--checkpoint', type=str, default=None,
+                        help='Trained checkpoint (random weights if omitted)')
+    parser.add_argument('--index', type=str, default='data/trd_adjacency.pt',
+                        help='Persistent adjacency index (built if missing)')
+    parser.add_argument('--undirected', action='store_true',
+                        help='Only in-neighbor messages (TRD directed=False)')
+    parser.add_argument('--max_batch_size', type=int, default=256)
+    parser.add_argument('--max_wait_ms', type=float, default=5.0)
+    parser.add_argument('--backend', type=str, default='eager', choices=['eager', 'trace', 'compile'])
+    parser.add_argument('--host', type=str, default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    print(f"Loading graph: {args.graph}")
+    data = torch.load(args.graph, weights_only=False)
+    adjacency = load_index(data, Path(args.index), directed=not args.undirected)
+
+    model = build_model(args.model)
+    if args.checkpoint:
+        load_checkpoint(model, args.checkpoint)
+
+    server = ScoringServer(model, data.x_dict, adjacency, max_batch_size=args.max_batch_size,
+                           max_wait_ms=args.max_wait_ms, backend=args.backend)
+    try:
+        asyncio.run(serve(server, args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n" + "\n".join(f"   {k}: {v}" for k, v in server.stats.summary().items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,4 @@
+"""`python -m src` runs the trdgnn CLI (see src/cli.py)."""
+from src.cli import main
+
+main()
@@ -0,0 +1,236 @@
+"""
+trdgnn: Command-Line Entry Point
+
+    python -m src <command> [options]
+
+Commands:
+    build    Build the hetero graph from the Elliptic++ CSVs
+    splits   Show (or generate) the temporal split metadata
+    sample   Run the TRD sampler on a built graph, print hot-path stats
+    train    Train a hetero model full-graph with early stopping
+    score    Score all transactions with a trained checkpoint
+    bench    Run the performance benchmark suite
+
+Only argparse/json are imported at startup; torch, PyG and pandas are
+imported inside the commands that need them, so `--help` and metadata
+commands start in well under 200 ms (`cli.startup_*` benchmark metrics).
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+
+DEFAULT_DATA_ROOT = 'data/Elliptic++ Dataset'
+MODELS = ['e7_a3', 'simplified_hhgtn', 'trd_hhgtn', 'segment_hhgtn']
+
+
+def _load_graph(path: str) -> dict:
+    """HeteroData from `build` as the trainer's graph dict (plus `time_dict`)."""
+    import torch
+
+    data = torch.load(path, weights_only=False)
+    tx = data['transaction']
+    return {
+        'x_dict': {t: data[t].x for t in data.node_types},
+        'edge_index_dict': {et: data[et].edge_index for et in data.edge_types},
+        'time_dict': {t: data[t].timestamp for t in data.node_types},
+        'y': tx.y, 'train_mask': tx.train_mask, 'val_mask': tx.val_mask, 'test_mask': tx.test_mask
+    }
+
+
+def _write_json(obj: dict, path: str):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(obj, f, indent=2)
+    print(f" Saved: {path}")
+
+
+def cmd_build(args):
+    from src.data.build_hetero_graph import HeteroGraphBuilder
+
+    builder = HeteroGraphBuilder(data_root=args.data_root, use_all_addresses=args.all_addresses)
+    data = builder.build_hetero_data(top_k_addresses=None if args.all_addresses else args.top_k_addresses,
+                                     co_address=args.co_address, max_address_degree=args.max_address_degree,
+                                     max_degree=args.max_degree)
+    builder.save_hetero_data(data, output_dir=args.output_dir)
+
+
+def cmd_splits(args):
+    path = Path(args.path or Path(args.data_root) / 'splits.json')
+    if args.generate:
+        import numpy as np
+        import pandas as pd
+
+        tx_features = pd.read_csv(Path(args.data_root) / 'txs_features.csv', usecols=['txId', 'Time step'])
+        tx_classes = pd.read_csv(Path(args.data_root) / 'txs_classes.csv')
+        timestamps = tx_features['Time step'].values
+        y = (tx_features.merge(tx_classes, on='txId', how='left')['class'].values == 1).astype(int)
+        steps = np.sort(np.unique(timestamps))
+        train_end = steps[int(len(steps) * args.train_frac) - 1]
+        val_end = steps[int(len(steps) * (args.train_frac + args.val_frac)) - 1]
+        masks = {'train': timestamps <= train_end,
+                 'val': (timestamps > train_end) & (timestamps <= val_end),
+                 'test': timestamps > val_end}
+        splits = {split: np.where(m)[0].tolist() for split, m in masks.items()}
+        splits['metadata'] = {
+            'n_transactions': len(timestamps),
+            'train_time_end': int(train_end),
+            'val_time_end': int(val_end),
+            **{f'fraud_rate_{split}': float(y[m].mean()) for split, m in masks.items()}
+        }
+        _write_json(splits, path)
+    else:
+        with open(path) as f:
+            splits = json.load(f)
+    metadata = splits.get('metadata', {})
+    print(json.dumps({
+        **metadata,
+        'sizes': {split: len(splits[split]) for split in ('train', 'val', 'test') if split in splits}
+    }, indent=2))
+
+
+def cmd_sample(args):
+    import numpy as np
+    import torch
+
+    from src.data.trd_sampler import TRDSampler
+
+    graph = _load_graph(args.graph)
+    edge_index = graph['edge_index_dict'][('transaction', 'to', 'transaction')]
+    timestamps = graph['time_dict']['transaction']
+    generator = torch.Generator().manual_seed(args.seed)
+    np.random.seed(args.seed)
+    sampler = TRDSampler(fanouts=[int(f) for f in args.fanouts.split(',')], instrument=True, backend=args.backend)
+    for _ in range(args.batches):
+        targets = torch.randint(0, timestamps.numel(), (args.batch_size,), generator=generator)
+        sampler.sample(edge_index, timestamps, targets, generator=generator)
+    report = {'backend': sampler.backend_used, 'stats': sampler.stats.summary(), 'audit': sampler.audit.metrics()}
+    print(json.dumps(report, indent=2))
+    if args.output:
+        _write_json(report, args.output)
+
+
+def cmd_train(args):
+    import torch
+
+    from src.models.trainer import trainer_from_config
+
+    config = {'model': args.model}
+    if args.config:
+        with open(args.config) as f:
+            config.update(json.load(f))
+    trainer = trainer_from_config(config, _load_graph(args.graph))
+    results = trainer.fit(max_epochs=args.max_epochs, patience=args.patience)
+    print(f"\n Test PR-AUC: {results['test']['pr_auc']:.4f} (best epoch {results['best_epoch'] + 1})")
+    _write_json({'config': config, **results}, args.output)
+    if args.checkpoint:
+        Path(args.checkpoint).parent.mkdir(parents=True, exist_ok=True)
+        torch.save(trainer.model.state_dict(), args.checkpoint)
+        print(f" Saved: {args.checkpoint}")
+
+
+def cmd_score(args):
+    import numpy as np
+
+    from src.models.hhgtn import build_model, load_checkpoint
+    from src.models.inference import InferenceSession
+
+    graph = _load_graph(args.graph)
+    model = load_checkpoint(build_model(args.model), args.checkpoint)
+    probs = InferenceSession(model, backend=args.backend)(graph['x_dict'], graph['edge_index_dict'])
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    np.savetxt(output, np.column_stack([np.arange(probs.numel()), probs.float().numpy()]),
+               fmt=['%d', '%.6f'], delimiter=',', header='tx_index,fraud_prob', comments='')
+    print(f" Scored {probs.numel():,} transactions: {output}")
+
+
+def cmd_bench(args):
+    from src.utils.benchmark import SCALES, bench_cli_startup, run_suite, save_results
+
+    if args.startup_only:
+        results = {'metrics': bench_cli_startup(args.repeats)}
+    else:
+        fanouts = [[int(f) for f in spec.split(',')] for spec in args.fanouts]
+        results = run_suite(SCALES[args.scale], args.work_dir, fanouts, args.batch_sizes,
+                            args.model, args.repeats)
+    for metric, m in results['metrics'].items():
+        print(f"  {metric:<48} {m['value']:>12.4g}  {m['unit']}")
+    if args.output:
+        save_results(results, args.output)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='trdgnn', description='TRD hetero GNN fraud detection on Elliptic++')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    p = commands.add_parser('build', help='Build the hetero graph from the Elliptic++ CSVs')
+    p.add_argument('--data_root', type=str, default=DEFAULT_DATA_ROOT)
+    p.add_argument('--output_dir', type=str, default='data')
+    p.add_argument('--top_k_addresses', type=int, default=100000)
+    p.add_argument('--all_addresses', action='store_true')
+    p.add_argument('--co_address', action='store_true', help='Derive the tx-tx co-address relation')
+    p.add_argument('--max_address_degree', type=int, default=100, help='Causal per-address window and per-destination cap for co-address edges')
+    p.add_argument('--max_degree', type=int, default=None,
+                   help='Causally recency-prune address relations to K past edges per node and direction')
+    p.set_defaults(func=cmd_build)
+
+    p = commands.add_parser('splits', help='Show (or --generate) temporal split metadata')
+    p.add_argument('--data_root', type=str, default=DEFAULT_DATA_ROOT)
+    p.add_argument('--path', type=str, default=None, help='splits.json (default: <data_root>/splits.json)')
+    p.add_argument('--generate', action='store_true', help='Recompute from txs_features.csv')
+    p.add_argument('--train_frac', type=float, default=0.6)
+    p.add_argument('--val_frac', type=float, default=0.2)
+    p.set_defaults(func=cmd_splits)
+
+    p = commands.add_parser('sample', help='Run the TRD sampler and print hot-path stats')
+    p.add_argument('--graph', type=str, default='data/hetero_graph.pt')
+    p.add_argument('--fanouts', type=str, default='10,10')
+    p.add_argument('--batch_size', type=int, default=256)
+    p.add_argument('--batches', type=int, default=10)
+    p.add_argument('--backend', type=str, default='python', choices=['python', 'vectorized', 'pyglib'])
+    p.add_argument('--seed', type=int, default=0)
+    p.add_argument('--output', type=str, default=None)
+    p.set_defaults(func=cmd_sample)
+
+    p = commands.add_parser('train', help='Full-graph training with early stopping')
+    p.add_argument('--graph', type=str, default='data/hetero_graph.pt')
+    p.add_argument('--model', type=str, default='e7_a3', choices=MODELS)
+    p.add_argument('--config', type=str, default=None, help='JSON run config (trainer_from_config keys)')
+    p.add_argument('--max_epochs', type=int, default=100)
+    p.add_argument('--patience', type=int, default=15)
+    p.add_argument('--output', type=str, default='reports/train_results.json')
+    p.add_argument('--checkpoint', type=str, default=None, help='Where to save the best weights')
+    p.set_defaults(func=cmd_train)
+
+    p = commands.add_parser('score', help='Score all transactions with a checkpoint')
+    p.add_argument('--graph', type=str, default='data/hetero_graph.pt')
+    p.add_argument('--model', type=str, default='e7_a3', choices=MODELS)
+    p.add_argument('--checkpoint', type=str, required=True)
+    p.add_argument('--backend', type=str, default='eager', choices=['eager', 'trace', 'compile'])
+    p.add_argument('--output', type=str, default='reports/scores.csv')
+    p.set_defaults(func=cmd_score)
+
+    p = commands.add_parser('bench', help='Performance benchmark suite (see scripts/run_benchmarks.py)')
+    p.add_argument('--scale', type=str, default='small', choices=['tiny', 'small', 'medium', 'full'])
+    p.add_argument('--work_dir', type=str, default='data/benchmark')
+    p.add_argument('--fanouts', type=str, nargs='+', default=['10,10', '25,10'])
+    p.add_argument('--batch_sizes', type=int, nargs='+', default=[64, 256])
+    p.add_argument('--model', type=str, default='e7_a3', choices=MODELS)
+    p.add_argument('--repeats', type=int, default=3)
+    p.add_argument('--startup_only', action='store_true', help='Only the CLI startup-time benchmark')
+    p.add_argument('--output', type=str, default=None)
+    p.set_defaults(func=cmd_bench)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
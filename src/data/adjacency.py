@@ -0,0 +1,306 @@
+"""
+Vectorized CSR adjacency helpers shared by samplers, scorers and trainers.
+
+All functions work on flat `torch.long` tensors and avoid per-node Python
+loops, so neighborhood lookups cost O(#nodes queried + #edges returned).
+"""
+import torch
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+
+def build_csr(row: torch.Tensor, col: torch.Tensor, num_rows: int) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+    """
+    Group `col` by `row` into compressed sparse rows.
+
+    Args:
+        row: [E] row index of each entry (e.g. edge destination)
+        col: [E] value of each entry (e.g. edge source)
+        num_rows: Number of rows (must exceed row.max())
+
+    Returns:
+        ptr: [num_rows + 1] row pointers
+        col_sorted: [E] values grouped by row (stable order within a row)
+        perm: [E] positions of `col_sorted` entries in the input
+    """
+    perm = torch.argsort(row, stable=True)
+    ptr = torch.zeros(num_rows + 1, dtype=torch.long)
+    ptr[1:] = torch.cumsum(torch.bincount(row, minlength=num_rows), dim=0)
+    return ptr, col[perm], perm
+
+
+def recency_rank(row: torch.Tensor, time: torch.Tensor, num_rows: int) -> Tuple[torch.Tensor, torch.Tensor]:
+    """
+    Rank of each entry within its row, newest first.
+
+    Args:
+        row: [E] row index of each entry (e.g. the node an edge is stored at)
+        time: [E] recency key of each entry (e.g. the neighbor's timestamp)
+        num_rows: Number of rows
+
+    Returns:
+        rank: [E] 0 for the newest entry of each row (ties: later entries first)
+        degree: [num_rows] entries per row
+    """
+    num = row.numel()
+    order = torch.argsort(time * max(num, 1) + torch.arange(num), descending=True)
+    ptr, _, perm = build_csr(row[order], order, num_rows)
+    degree = ptr[1:] - ptr[:-1]
+    rank = torch.empty_like(row)
+    rank[order[perm]] = torch.arange(num) - torch.repeat_interleave(ptr[:-1], degree)
+    return rank, degree
+
+
+def segment_cumsum(values: torch.Tensor, ptr: torch.Tensor) -> torch.Tensor:
+    """
+    Inclusive cumulative sum of `values` restarting at every CSR row.
+
+    Only entries of the same row are ever added (log-step scan), so small
+    rows keep full precision no matter how large earlier rows are.
+
+    Args:
+        values: [E] entries grouped by row
+        ptr: [num_rows + 1] row pointers
+
+    Returns:
+        [E] per-row inclusive prefix sums
+    """
+    num = values.numel()
+    degree = ptr[1:] - ptr[:-1]
+    row_start = torch.repeat_interleave(ptr[:-1], degree)
+    position = torch.arange(num)
+    out = values.clone()
+    max_degree = int(degree.max()) if num else 0
+    offset = 1
+    while offset < max_degree:
+        source = position - offset
+        inside = source >= row_start
+        shifted = torch.zeros_like(out)
+        shifted[inside] = out[source[inside]]
+        out = out + shifted
+        offset *= 2
+    return out
+
+
+def gather_rows(ptr: torch.Tensor, col: torch.Tensor, rows: torch.Tensor) -> torch.Tensor:
+    """
+    All CSR entries of `rows` as [2, k] (row, value) pairs.
+
+    Rows beyond the CSR range are treated as empty.
+    """
+    rows = rows[rows < ptr.numel() - 1]
+    start = ptr[rows]
+    count = ptr[rows + 1] - start
+    total = int(count.sum())
+    if total == 0:
+        return torch.zeros((2, 0), dtype=torch.long)
+    offsets = torch.arange(total) - torch.repeat_interleave(torch.cumsum(count, dim=0) - count, count)
+    values = col[torch.repeat_interleave(start, count) + offsets]
+    return torch.stack([torch.repeat_interleave(rows, count), values])
+
+
+def relabel(sorted_nodes: torch.Tensor, ids: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+    """
+    Local positions of global `ids` within `sorted_nodes`.
+
+    Returns:
+        pos: [k] position of each id (undefined where not found)
+        found: [k] bool, whether the id is in `sorted_nodes`
+    """
+    if sorted_nodes.numel() == 0:
+        return torch.zeros_like(ids), torch.zeros_like(ids, dtype=torch.bool)
+    pos = torch.searchsorted(sorted_nodes, ids).clamp(max=sorted_nodes.numel() - 1)
+    return pos, sorted_nodes[pos] == ids
+
+
+def sample_in_edges(edge_index: torch.Tensor, num_dst: int, fanout: int,
+                    generator: Optional[torch.Generator] = None) -> torch.Tensor:
+    """
+    Keep at most `fanout` uniformly chosen in-edges per destination node.
+
+    Args:
+        edge_index: [2, E] (src, dst) edges
+        num_dst: Number of destination nodes
+        fanout: Max in-edges kept per destination
+        generator: RNG for the random choice
+
+    Returns:
+        [2, E'] sampled edges
+    """
+    perm = torch.randperm(edge_index.shape[1], generator=generator)
+    ptr, picked, _ = build_csr(edge_index[1, perm], perm, num_dst)
+    rank = torch.arange(picked.numel()) - ptr[edge_index[1, picked]]
+    return edge_index[:, picked[rank < fanout]]
+
+
+def trd_edge_index_dict(
+    edge_index_dict: Dict[Tuple[str, str, str], torch.Tensor],
+    time_dict: Dict[str, torch.Tensor],
+    directed: bool = True
+) -> Dict[Tuple[str, str, str], torch.Tensor]:
+    """
+    Build the TRD message graph: only time-valid messages are kept.
+
+    Mirrors `TRDSampler`: node u receives messages from in-neighbors v with
+    time(v) <= time(u) and, when `directed=True`, also from out-neighbors
+    with time(v) <= time(u) (routed through the reverse relation).
+
+    Args:
+        edge_index_dict: {(src, rel, dst): [2, E]} raw relations
+        time_dict: {node_type: [N] timestamps}
+        directed: Also pass messages back along time-valid out-edges
+
+    Returns:
+        {(src, rel, dst): [2, E']} message edges (src -> dst)
+    """
+    parts = defaultdict(list)
+    for (src_type, rel, dst_type), edge_index in edge_index_dict.items():
+        src, dst = edge_index
+        src_time = time_dict[src_type][src]
+        dst_time = time_dict[dst_type][dst]
+
+        # In-neighbors: message src -> dst
+        valid = src_time <= dst_time
+        parts[(src_type, rel, dst_type)].append(edge_index[:, valid])
+
+        # Out-neighbors in range: message dst -> src on the reverse relation
+        reverse = (dst_type, rel, src_type)
+        if directed and reverse in edge_index_dict:
+            valid = dst_time <= src_time
+            parts[reverse].append(torch.stack([dst[valid], src[valid]]))
+
+    return {
+        edge_type: torch.cat(parts[edge_type], dim=1) if parts[edge_type]
+        else torch.zeros((2, 0), dtype=torch.long)
+        for edge_type in edge_index_dict
+    }
+
+
+class HeteroAdjacency:
+    """
+    In-adjacency (dst -> src) CSR per relation for repeated neighborhood queries.
+
+    Args:
+        edge_index_dict: {(src, rel, dst): [2, E]} message edges
+        num_nodes: {node_type: N}
+    """
+
+    def __init__(self, edge_index_dict: Dict[Tuple[str, str, str], torch.Tensor],
+                 num_nodes: Dict[str, int]):
+        self.num_nodes = dict(num_nodes)
+        self.csr = {}
+        for edge_type, edge_index in edge_index_dict.items():
+            ptr, src, _ = build_csr(edge_index[1], edge_index[0], self.num_nodes[edge_type[2]])
+            self.csr[edge_type] = (ptr, src)
+
+    @property
+    def edge_types(self):
+        return list(self.csr)
+
+    def to_edge_index_dict(self) -> Dict[Tuple[str, str, str], torch.Tensor]:
+        """The indexed message edges as {edge_type: [2, E] (src, dst)}."""
+        return {
+            edge_type: torch.stack([src, torch.repeat_interleave(torch.arange(ptr.numel() - 1), ptr.diff())])
+            for edge_type, (ptr, src) in self.csr.items()
+        }
+
+    def save(self, path: Union[str, Path]):
+        """Persist the CSR index so serving processes can skip the rebuild."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        torch.save({'num_nodes': self.num_nodes, 'csr': self.csr}, path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path], mmap: bool = True) -> 'HeteroAdjacency':
+        """Load a saved index; with `mmap=True` the arrays are paged in lazily."""
+        state = torch.load(path, map_location='cpu', mmap=mmap, weights_only=True)
+        adjacency = cls.__new__(cls)
+        adjacency.num_nodes = dict(state['num_nodes'])
+        adjacency.csr = {tuple(et): tuple(arrays) for et, arrays in state['csr'].items()}
+        return adjacency
+
+    def in_edges(self, edge_type, dst_nodes: torch.Tensor) -> torch.Tensor:
+        """[2, k] (src, dst) edges of `edge_type` ending at `dst_nodes`."""
+        ptr, src = self.csr[edge_type]
+        dst, src = gather_rows(ptr, src, dst_nodes)
+        return torch.stack([src, dst])
+
+    def khop_in(self, seeds: Dict[str, torch.Tensor], num_hops: int) -> Dict[str, torch.Tensor]:
+        """Sorted `num_hops`-hop in-neighborhood closure of `seeds` per node type."""
+        empty = torch.zeros(0, dtype=torch.long)
+        closure = {t: seeds.get(t, empty).unique() for t in self.num_nodes}
+        frontier = dict(closure)
+        for _ in range(num_hops):
+            reached = {t: [] for t in self.num_nodes}
+            for edge_type in self.csr:
+                if frontier[edge_type[2]].numel():
+                    reached[edge_type[0]].append(self.in_edges(edge_type, frontier[edge_type[2]])[0])
+            for t in self.num_nodes:
+                new = torch.cat(reached[t]).unique() if reached[t] else empty
+                frontier[t] = new[~relabel(closure[t], new)[1]]
+                closure[t] = torch.cat([closure[t], frontier[t]]).sort().values
+        return closure
+
+    def subgraph(self, seeds: Dict[str, torch.Tensor], num_hops: int):
+        """
+        Induced subgraph over the `num_hops`-hop in-closure of `seeds`.
+
+        Outputs of an L-layer model on this subgraph are exact for the
+        seeds when num_hops >= L.
+
+        Returns:
+            nodes: {node_type: sorted global ids}
+            edge_index_dict: {edge_type: [2, k] local edges}
+        """
+        nodes = self.khop_in(seeds, num_hops)
+        return nodes, self.induced(nodes)
+
+    def sample(self, seeds: Dict[str, torch.Tensor], fanouts, generator: Optional[torch.Generator] = None):
+        """
+        Neighbor-sampled subgraph: at each hop keep at most `fanouts[hop]`
+        in-edges per frontier node and relation.
+
+        Returns:
+            nodes: {node_type: sorted global ids}
+            edge_index_dict: {edge_type: [2, k] local sampled edges}
+        """
+        empty = torch.zeros(0, dtype=torch.long)
+        frontier = {t: seeds.get(t, empty).unique() for t in self.num_nodes}
+        visited = dict(frontier)
+        sampled = {et: [] for et in self.csr}
+        for fanout in fanouts:
+            reached = {t: [] for t in self.num_nodes}
+            for edge_type in self.csr:
+                dst_nodes = frontier[edge_type[2]]
+                if dst_nodes.numel() == 0:
+                    continue
+                src, dst = self.in_edges(edge_type, dst_nodes)
+                local_dst = relabel(dst_nodes, dst)[0]
+                keep = sample_in_edges(torch.stack([src, local_dst]), dst_nodes.numel(), fanout, generator)
+                sampled[edge_type].append(torch.stack([keep[0], dst_nodes[keep[1]]]))
+                reached[edge_type[0]].append(keep[0])
+            for t in self.num_nodes:
+                new = torch.cat(reached[t]).unique() if reached[t] else empty
+                frontier[t] = new[~relabel(visited[t], new)[1]]
+                visited[t] = torch.cat([visited[t], frontier[t]]).sort().values
+
+        edges = {}
+        for edge_type, parts in sampled.items():
+            src_type, _, dst_type = edge_type
+            pairs = torch.cat(parts, dim=1) if parts else torch.zeros((2, 0), dtype=torch.long)
+            edges[edge_type] = torch.stack([
+                relabel(visited[src_type], pairs[0])[0], relabel(visited[dst_type], pairs[1])[0]
+            ])
+        return visited, edges
+
+    def induced(self, nodes: Dict[str, torch.Tensor]) -> Dict[Tuple[str, str, str], torch.Tensor]:
+        """Local edges among `nodes` ({node_type: sorted global ids})."""
+        edges = {}
+        for edge_type in self.csr:
+            src_type, _, dst_type = edge_type
+            src, dst = self.in_edges(edge_type, nodes[dst_type])
+            src_local, keep = relabel(nodes[src_type], src)
+            dst_local, _ = relabel(nodes[dst_type], dst)
+            edges[edge_type] = torch.stack([src_local[keep], dst_local[keep]])
+        return edges
@@ -5,20 +5,26 @@ E5 Milestone: Build PyG HeteroData with temporal constraints
 Features:
 - Load transaction and address nodes
 - Load 4 edge types: tx-tx, addr-tx, tx-addr, addr-addr
+- Optional recency pruning of hub-heavy address relations (degree cap)
+- Optional derived tx-tx co-address relation (shared addresses, TRD-valid)
 - Preserve temporal information
 - Create train/val/test splits
 - TRD sampler compatible
+
+pandas and PyG are imported inside the methods that use them, so importing
+this module (e.g. from the CLI) stays cheap.
 """
+from __future__ import annotations
 
-import pandas as pd
 import numpy as np
 import torch
 from pathlib import Path
-from typing import Dict, Tuple, Optional
+from typing import TYPE_CHECKING, Dict, Tuple, Optional
 import json
-from torch_geometric.data import HeteroData
-from tqdm.auto import tqdm
 import warnings
+
+if TYPE_CHECKING:
+    from torch_geometric.data import HeteroData
 warnings.filterwarnings('ignore')
 
 
@@ -35,6 +41,8 @@ class HeteroGraphBuilder:
         - (address, to, transaction): addr sends to tx (input)
         - (transaction, to, address): tx pays to addr (output)
         - (address, to, address): addr-to-addr connections
+        - (transaction, co_address, transaction): optional, derived from
+          shared addresses (see `src.data.co_address`)
     """
     
     def __init__(self, data_root: str, use_all_addresses: bool = False):
@@ -70,6 +78,8 @@ class HeteroGraphBuilder:
             y: Labels [N_tx] (1=illicit, 0=licit, -1=unknown)
             timestamps: Timestamps [N_tx]
         """
+        import pandas as pd
+
         print("\n Loading transaction nodes...")
         
         # Load features
@@ -137,6 +147,8 @@ class HeteroGraphBuilder:
             y: Labels [N_addr] (1=illicit, 0=licit, -1=unknown)
             timestamps: Timestamps [N_addr]
         """
+        import pandas as pd
+
         print("\n Loading address nodes...")
         
         # Use combined file if available (smaller memory footprint)
@@ -215,6 +227,8 @@ class HeteroGraphBuilder:
         if edge_type not in file_map:
             raise ValueError(f"Unknown edge type: {edge_type}")
         
+        import pandas as pd
+
         print(f"\n Loading {edge_type} edges...")
         
         edges_df = pd.read_csv(self.data_root / file_map[edge_type])
@@ -300,12 +314,22 @@ class HeteroGraphBuilder:
             'val_time_end': int(val_time_end)
         }
     
-    def build_hetero_data(self, top_k_addresses: Optional[int] = 100000) -> HeteroData:
+    def build_hetero_data(self, top_k_addresses: Optional[int] = 100000, co_address: bool = False,
+                          max_address_degree: Optional[int] = 100,
+                          max_degree: Optional[int] = None) -> HeteroData:
         """
         Build complete HeteroData object.
         
         Args:
             top_k_addresses: Number of addresses to use (None = all)
+            co_address: Also derive the tx-tx co-address relation
+            max_address_degree: Causal per-address window and
+                per-destination source cap for co-address edges (None =
+                exact product)
+            max_degree: Keep at most this many most recent past edges
+                (neighbor no newer than the node) per node, relation and
+                direction on the address relations (None = no pruning); the
+                removed counts become `pruned_degree` features
         
         Returns:
             HeteroData object
@@ -314,6 +338,8 @@ class HeteroGraphBuilder:
         print(" BUILDING HETEROGENEOUS GRAPH")
         print("="*70)
         
+        from torch_geometric.data import HeteroData
+
         # Initialize HeteroData
         data = HeteroData()
         
@@ -352,15 +378,43 @@ class HeteroGraphBuilder:
             print(f"\n Skipping addr-addr edges: {e}")
             self.stats['num_edges_addr-addr'] = 0
         
+        edge_types = [
+            ('transaction', 'to', 'transaction'),
+            ('address', 'to', 'transaction'),
+            ('transaction', 'to', 'address'),
+            ('address', 'to', 'address')
+        ]
+        
+        # Optional: recency pruning of hub-heavy address relations
+        if max_degree is not None:
+            from src.data.degree_pruning import prune_hetero_graph
+
+            print(f"\n Pruning address relations to the {max_degree} most recent past edges per node...")
+            pruning = prune_hetero_graph(data, max_degree)
+            for name, r in pruning['relations'].items():
+                print(f"   {name}: {r['edges_removed']:,} / {r['edges_before']:,} edges removed")
+            memory = pruning['memory']
+            print(f"   Edge memory: {memory['edge_bytes_before'] / 2**20:.1f} -> {memory['edge_bytes_after'] / 2**20:.1f} MB "
+                  f"(+{memory['pruned_degree_feature_bytes'] / 2**20:.1f} MB pruned-degree features)")
+            self.stats['degree_pruning'] = pruning
+        
+        # Optional: derived co-address relation (tx -> address -> tx in one hop)
+        if co_address:
+            from src.data.co_address import CO_ADDRESS, add_co_address_relation
+
+            print(f"\n Deriving co-address edges (max address degree: {max_address_degree})...")
+            co_stats = add_co_address_relation(data, max_address_degree)
+            print(f"   Incidence entries: {co_stats['incidence_nnz']:,} "
+                  f"({co_stats['capped_addresses']:,} hub addresses capped)")
+            print(f"   TRD-valid edges: {co_stats['co_address_edges']:,} / {co_stats['co_address_pairs']:,} pairs")
+            self.stats['num_edges_co-address'] = co_stats['co_address_edges']
+            self.stats['co_address'] = co_stats
+            edge_types.append(CO_ADDRESS)
+        
         # Store metadata
         data.metadata = {
             'node_types': ['transaction', 'address'],
-            'edge_types': [
-                ('transaction', 'to', 'transaction'),
-                ('address', 'to', 'transaction'),
-                ('transaction', 'to', 'address'),
-                ('address', 'to', 'address')
-            ],
+            'edge_types': edge_types,
             'stats': self.stats
         }
         
@@ -374,7 +428,7 @@ class HeteroGraphBuilder:
         print(f"  Edges:")
         for edge_type in data.edge_types:
             src, rel, dst = edge_type
-            print(f"    {src}  {dst}: {data[edge_type].num_edges:,}")
+            print(f"    {src}  {dst}{'' if rel == 'to' else f' ({rel})'}: {data[edge_type].num_edges:,}")
         
         return data
     
@@ -394,7 +448,7 @@ class HeteroGraphBuilder:
                 'address': data['address'].num_nodes
             },
             'num_edges': {
-                f"{src}_to_{dst}": data[edge_type].num_edges
+                f"{src}_{rel}_{dst}": data[edge_type].num_edges
                 for src, rel, dst in data.edge_types
                 for edge_type in [(src, rel, dst)]
             },
@@ -450,6 +504,12 @@ def main():
                        help='Number of addresses to use (None for all)')
     parser.add_argument('--all_addresses', action='store_true',
                        help='Use all addresses instead of top K')
+    parser.add_argument('--co_address', action='store_true',
+                       help='Derive the tx-tx co-address relation')
+    parser.add_argument('--max_address_degree', type=int, default=100,
+                       help='Causal per-address window and per-destination cap for co-address edges')
+    parser.add_argument('--max_degree', type=int, default=None,
+                       help='Causally recency-prune address relations to K past edges per node and direction')
     
     args = parser.parse_args()
     
@@ -460,7 +520,8 @@ def main():
     )
     
     top_k = None if args.all_addresses else args.top_k_addresses
-    data = builder.build_hetero_data(top_k_addresses=top_k)
+    data = builder.build_hetero_data(top_k_addresses=top_k, co_address=args.co_address,
+                                     max_address_degree=args.max_address_degree, max_degree=args.max_degree)
     
     # Save
     builder.save_hetero_data(data, output_dir=args.output_dir)
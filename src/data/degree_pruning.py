@@ -0,0 +1,128 @@
+"""
+Degree-Capped, Recency-Pruned Relation Storage
+
+A few exchange-like addresses touch huge numbers of transactions and
+addresses, so they dominate the size of the addr-addr / tx-addr relations
+and the worst-case aggregation cost of every full-graph epoch. This stage
+keeps, per relation and direction, at most `max_degree` edges per node:
+
+- in-direction: each destination keeps its `max_degree` most recent
+  sources (by source timestamp)
+- out-direction: each source keeps its `max_degree` most recent
+  destinations (by destination timestamp)
+
+An edge survives only if both of its endpoints keep it. The number of
+edges each node lost is stored per relation/direction as
+`data[node_type].pruned_degree` (columns named in
+`data[node_type].pruned_degree_names`), so models can still see how big a
+hub really was.
+"""
+from collections import defaultdict
+from typing import Dict, Optional, Sequence, Tuple
+
+import torch
+
+from src.data.adjacency import recency_rank
+
+
+def _tensor_bytes(store) -> int:
+    return sum(v.numel() * v.element_size() for v in store.values() if isinstance(v, torch.Tensor))
+
+
+def prune_edges(edge_index: torch.Tensor, src_time: torch.Tensor, dst_time: torch.Tensor,
+                num_src: int, num_dst: int, max_degree: int) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+    """
+    Keep at most `max_degree` most recent past edges per node in each direction.
+
+    Args:
+        edge_index: [2, E] (src, dst) edges of one relation
+        src_time / dst_time: Timestamps of the source / destination node type
+        num_src / num_dst: Node counts
+        max_degree: Past-edge cap per node and direction
+
+    Returns:
+        keep: [E] bool mask of surviving edges
+        out_pruned: [num_src] past out-edges removed per source node
+        in_pruned: [num_dst] past in-edges removed per destination node
+    """
+    src, dst = edge_index
+    t_src, t_dst = src_time[src], dst_time[dst]
+    keep = torch.ones(src.numel(), dtype=torch.bool)
+
+    # Each endpoint only ranks edges whose other end is no newer than itself
+    past_in = t_src <= t_dst
+    in_rank, _ = recency_rank(dst[past_in], t_src[past_in], num_dst)
+    keep[past_in] &= in_rank < max_degree
+    past_out = t_dst <= t_src
+    out_rank, _ = recency_rank(src[past_out], t_dst[past_out], num_src)
+    keep[past_out] &= out_rank < max_degree
+
+    out_pruned = torch.bincount(src[past_out & ~keep], minlength=num_src)
+    in_pruned = torch.bincount(dst[past_in & ~keep], minlength=num_dst)
+    return keep, out_pruned, in_pruned
+
+
+def prune_hetero_graph(data, max_degree: int, edge_types: Optional[Sequence[tuple]] = None) -> Dict[str, dict]:
+    """
+    Builder stage: recency-prune relations of a HeteroData graph in place.
+
+    Per-edge attributes (e.g. `edge_weight`) are filtered with the edges.
+
+    Args:
+        data: HeteroData with `timestamp` on every node type
+        max_degree: Past-edge cap per node, relation and direction
+        edge_types: Relations to prune (default: every relation with an
+            address endpoint)
+
+    Returns:
+        {'relations': {name: edges before/after/removed, capped nodes},
+         'memory': edge storage bytes before/after/saved (net of the new
+         pruned_degree features)}
+    """
+    if edge_types is None:
+        edge_types = [et for et in data.edge_types if 'address' in (et[0], et[2])]
+    columns = defaultdict(list)
+    relations = {}
+    bytes_before = sum(_tensor_bytes(data[et]) for et in data.edge_types)
+
+    for edge_type in edge_types:
+        src_type, rel, dst_type = edge_type
+        store = data[edge_type]
+        num_edges = store.edge_index.shape[1]
+        keep, out_pruned, in_pruned = prune_edges(
+            store.edge_index, data[src_type].timestamp, data[dst_type].timestamp,
+            data[src_type].num_nodes, data[dst_type].num_nodes, max_degree
+        )
+        for key, value in list(store.items()):
+            if key != 'edge_index' and isinstance(value, torch.Tensor) and value.dim() and value.shape[0] == num_edges:
+                store[key] = value[keep]
+        store.edge_index = store.edge_index[:, keep]
+
+        name = f'{src_type}_{rel}_{dst_type}'
+        columns[src_type].append((f'{name}_out', out_pruned))
+        columns[dst_type].append((f'{name}_in', in_pruned))
+        relations[name] = {
+            'edges_before': num_edges,
+            'edges_after': int(keep.sum()),
+            'edges_removed': num_edges - int(keep.sum()),
+            'capped_src_nodes': int((out_pruned > 0).sum()),
+            'capped_dst_nodes': int((in_pruned > 0).sum())
+        }
+
+    feature_bytes = 0
+    for node_type, cols in columns.items():
+        data[node_type].pruned_degree = torch.stack([c for _, c in cols], dim=1).float()
+        data[node_type].pruned_degree_names = [n for n, _ in cols]
+        feature_bytes += data[node_type].pruned_degree.numel() * 4
+
+    bytes_after = sum(_tensor_bytes(data[et]) for et in data.edge_types)
+    return {
+        'max_degree': max_degree,
+        'relations': relations,
+        'memory': {
+            'edge_bytes_before': bytes_before,
+            'edge_bytes_after': bytes_after,
+            'pruned_degree_feature_bytes': feature_bytes,
+            'bytes_saved': bytes_before - bytes_after - feature_bytes
+        }
+    }
@@ -0,0 +1,207 @@
+"""
+Persistent Node Embedding Store
+
+Caches GNN node embeddings on disk as memory-mapped `.npy` files so that
+downstream consumers (E9 XGBoost fusion, tree-model retraining) never rerun
+the GNN forward pass for a checkpoint/graph pair they have already seen.
+
+Layout:
+    <root>/<key>/meta.json
+    <root>/<key>/<node_type>.npy
+
+where key = "<checkpoint sha256[:16]>-<graph version>".
+"""
+import hashlib
+import json
+import os
+import shutil
+import numpy as np
+import torch
+from pathlib import Path
+from typing import Callable, Dict, Optional, Union
+
+
+PathLike = Union[str, Path]
+
+
+def file_sha256(path: PathLike, chunk_size: int = 1 << 20) -> str:
+    """Hex sha256 of a file's contents (streamed, constant memory)."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class EmbeddingStore:
+    """
+    On-disk store of per-node-type embeddings keyed by model and graph.
+
+    Args:
+        root: Directory holding one sub-directory per stored key
+    """
+
+    def __init__(self, root: PathLike):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(checkpoint: PathLike, graph_version: str) -> str:
+        """
+        Build a store key from a checkpoint file and a graph artifact version.
+
+        Args:
+            checkpoint: Path to the model checkpoint (hashed by content)
+            graph_version: Version tag of the graph artifact, e.g. the
+                sha256 of `hetero_graph.pt` (see `graph_version`)
+
+        Returns:
+            Key string usable with `write`/`load`
+        """
+        return f"{file_sha256(checkpoint)[:16]}-{graph_version}"
+
+    @staticmethod
+    def graph_version(graph_path: PathLike) -> str:
+        """Content-derived version tag for a saved graph artifact."""
+        return file_sha256(graph_path)[:12]
+
+    def path(self, key: str) -> Path:
+        return self.root / key
+
+    def exists(self, key: str) -> bool:
+        return (self.path(key) / 'meta.json').exists()
+
+    def keys(self):
+        """List stored keys."""
+        return sorted(p.name for p in self.root.iterdir() if (p / 'meta.json').exists())
+
+    def write(
+        self,
+        key: str,
+        embeddings: Dict[str, Union[torch.Tensor, np.ndarray]],
+        metadata: Optional[dict] = None
+    ) -> Path:
+        """
+        Persist embeddings for `key`.
+
+        Arrays are written into a temporary directory and renamed into place,
+        so readers never observe a partially written entry.
+
+        Args:
+            key: Store key (see `make_key`)
+            embeddings: {node_type: [N, D] embeddings}
+            metadata: Extra JSON-serializable info stored in meta.json
+
+        Returns:
+            Directory of the stored entry
+        """
+        final_dir = self.path(key)
+        tmp_dir = self.root / f".{key}.tmp-{os.getpid()}"
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir)
+        tmp_dir.mkdir(parents=True)
+
+        shapes = {}
+        for node_type, emb in embeddings.items():
+            if isinstance(emb, torch.Tensor):
+                emb = emb.detach().cpu().numpy()
+            emb = np.ascontiguousarray(emb, dtype=np.float32)
+            out = np.lib.format.open_memmap(
+                tmp_dir / f'{node_type}.npy', mode='w+',
+                dtype=np.float32, shape=emb.shape
+            )
+            out[:] = emb
+            out.flush()
+            del out
+            shapes[node_type] = list(emb.shape)
+
+        meta = {'key': key, 'shapes': shapes, **(metadata or {})}
+        with open(tmp_dir / 'meta.json', 'w') as f:
+            json.dump(meta, f, indent=2)
+
+        if final_dir.exists():
+            shutil.rmtree(final_dir)
+        os.replace(tmp_dir, final_dir)
+        return final_dir
+
+    def load(self, key: str, node_types=None) -> Dict[str, np.ndarray]:
+        """
+        Open stored embeddings as read-only memory maps.
+
+        Args:
+            key: Store key
+            node_types: Subset of node types to open (default: all)
+
+        Returns:
+            {node_type: np.memmap [N, D]}
+        """
+        if not self.exists(key):
+            raise KeyError(f"No embeddings stored for key: {key}")
+        meta = self.metadata(key)
+        node_types = node_types or list(meta['shapes'])
+        return {
+            node_type: np.load(self.path(key) / f'{node_type}.npy', mmap_mode='r')
+            for node_type in node_types
+        }
+
+    def metadata(self, key: str) -> dict:
+        with open(self.path(key) / 'meta.json') as f:
+            return json.load(f)
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute_fn: Callable[[], Dict[str, torch.Tensor]],
+        metadata: Optional[dict] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Return stored embeddings, running `compute_fn` only on a cache miss.
+
+        Args:
+            key: Store key
+            compute_fn: Zero-argument callable producing {node_type: embeddings}
+            metadata: Extra info recorded when the entry is written
+
+        Returns:
+            {node_type: np.memmap [N, D]}
+        """
+        if not self.exists(key):
+            print(f"   Embedding store miss: {key} (running GNN forward pass)")
+            self.write(key, compute_fn(), metadata=metadata)
+        else:
+            print(f"   Embedding store hit: {key}")
+        return self.load(key)
+
+
+@torch.no_grad()
+def compute_embeddings(model: torch.nn.Module, x_dict, edge_index_dict) -> Dict[str, torch.Tensor]:
+    """Full-graph `model.get_embeddings` in eval mode, returned on CPU."""
+    model.eval()
+    embeddings = model.get_embeddings(x_dict, edge_index_dict)
+    return {key: emb.cpu() for key, emb in embeddings.items()}
+
+
+def build_fusion_features(
+    embeddings: np.ndarray,
+    tabular: np.ndarray,
+    train_mask: np.ndarray
+) -> np.ndarray:
+    """
+    Concatenate GNN embeddings with train-standardized tabular features.
+
+    Matches the E9 fusion recipe (StandardScaler fit on train rows only).
+
+    Args:
+        embeddings: [N, D] node embeddings (memmap is fine)
+        tabular: [N, F] raw tabular features
+        train_mask: Boolean train mask or train indices
+
+    Returns:
+        [N, D + F] float32 fusion matrix
+    """
+    tabular = np.asarray(tabular, dtype=np.float64)
+    mean = tabular[train_mask].mean(axis=0)
+    std = tabular[train_mask].std(axis=0)
+    std[std == 0] = 1.0
+    tabular_norm = ((tabular - mean) / std).astype(np.float32)
+    return np.concatenate([np.asarray(embeddings, dtype=np.float32), tabular_norm], axis=1)
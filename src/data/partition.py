@@ -0,0 +1,271 @@
+"""
+Temporal Graph Partitioning with Halo Nodes
+
+Splits the graph into k partitions for partition-parallel training:
+- Transactions: each partition owns a contiguous range of time steps. The
+  range boundaries are chosen by dynamic programming to minimize the
+  transaction edges cut between ranges, subject to a load-balance bound.
+- Other node types (addresses): assigned to the partition holding most of
+  their transaction edges (one label-propagation sweep), falling back to the
+  partition of their timestamp.
+
+Each stored partition holds its owned nodes plus the `num_hops`-hop
+in-neighborhood halo with features and induced edges, so an L-layer model
+(L <= num_hops) computes exact outputs for owned nodes without fetching
+anything from other workers.
+
+Layout:
+    <dir>/part_<i>.pt       nodes, owned masks, x_dict, edges, labels, masks
+    <dir>/partition.json    assignment summary + report
+"""
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import torch
+
+from src.data.adjacency import HeteroAdjacency
+
+
+PathLike = Union[str, Path]
+EdgeType = Tuple[str, str, str]
+
+
+def time_step_boundaries(
+    step_load: torch.Tensor,
+    step_edges: torch.Tensor,
+    num_parts: int,
+    imbalance: float = 0.1
+) -> List[int]:
+    """
+    Contiguous split of T time steps into `num_parts` ranges minimizing cut edges.
+
+    Args:
+        step_load: [T] load (e.g. #transactions) per time step
+        step_edges: [T, T] edge counts between time steps
+        num_parts: Number of ranges
+        imbalance: Max load of a range is (1 + imbalance) * total / num_parts;
+            relaxed to the smallest achievable max load when time steps are
+            too coarse for that bound
+
+    Returns:
+        num_parts + 1 boundaries; range i covers steps [b[i], b[i+1])
+    """
+    num_steps = step_load.numel()
+    if not 1 <= num_parts <= num_steps:
+        raise ValueError(f"num_parts must be in [1, {num_steps}] (one time step per partition minimum)")
+
+    load = torch.zeros(num_steps + 1, dtype=torch.float64)
+    load[1:] = step_load.double().cumsum(0)
+    load = load.tolist()
+
+    # prefix[i, j] = edges between steps < i and steps < j
+    sym = (step_edges + step_edges.T).double()
+    prefix = torch.zeros(num_steps + 1, num_steps + 1, dtype=torch.float64)
+    prefix[1:, 1:] = sym.cumsum(0).cumsum(1)
+    degree = sym.sum(1)
+    degree_prefix = torch.zeros(num_steps + 1, dtype=torch.float64)
+    degree_prefix[1:] = degree.cumsum(0)
+
+    def leaving(a: int, b: int) -> float:
+        """Edges from steps [a, b) to steps outside it."""
+        inside = prefix[b, b] - prefix[a, b] - prefix[b, a] + prefix[a, a]
+        return float(degree_prefix[b] - degree_prefix[a] - inside)
+
+    inf = float('inf')
+    # Smallest achievable max range load (bottleneck), to relax the cap
+    bottleneck = [[inf] * (num_steps + 1) for _ in range(num_parts + 1)]
+    bottleneck[0][0] = 0.0
+    for p in range(1, num_parts + 1):
+        for b in range(p, num_steps + 1):
+            bottleneck[p][b] = min(max(bottleneck[p - 1][a], load[b] - load[a]) for a in range(p - 1, b))
+    cap = max((1 + imbalance) * load[-1] / num_parts, bottleneck[num_parts][num_steps])
+
+    # cost[p][b]: min cut of splitting steps [0, b) into p ranges
+    cost = [[inf] * (num_steps + 1) for _ in range(num_parts + 1)]
+    back = [[0] * (num_steps + 1) for _ in range(num_parts + 1)]
+    cost[0][0] = 0.0
+    for p in range(1, num_parts + 1):
+        for b in range(p, num_steps - (num_parts - p) + 1):
+            for a in range(p - 1, b):
+                if cost[p - 1][a] == inf or load[b] - load[a] > cap * (1 + 1e-9):
+                    continue
+                c = cost[p - 1][a] + leaving(a, b)
+                if c < cost[p][b]:
+                    cost[p][b], back[p][b] = c, a
+
+    bounds, b = [num_steps], num_steps
+    for p in range(num_parts, 0, -1):
+        b = back[p][b]
+        bounds.append(b)
+    return bounds[::-1]
+
+
+def partition_graph(
+    edge_index_dict: Dict[EdgeType, torch.Tensor],
+    num_nodes: Dict[str, int],
+    timestamps: Dict[str, torch.Tensor],
+    num_parts: int,
+    imbalance: float = 0.1,
+    time_type: str = 'transaction',
+    node_load: Optional[torch.Tensor] = None
+) -> Dict[str, torch.Tensor]:
+    """
+    Assign every node to one of `num_parts` partitions.
+
+    Args:
+        edge_index_dict: {edge_type: [2, E]} relations
+        num_nodes: {node_type: N}
+        timestamps: {node_type: [N]} time steps (`time_type` required)
+        num_parts: Number of partitions
+        imbalance: Load tolerance for `time_type` nodes (see `time_step_boundaries`)
+        time_type: Node type whose time steps are kept contiguous
+        node_load: [N_time_type] load per node to balance (default: 1 each;
+            e.g. the train mask to balance supervised targets)
+
+    Returns:
+        {node_type: [N] partition id}
+    """
+    steps, step_of = timestamps[time_type].long().unique(return_inverse=True)
+    num_steps = steps.numel()
+    step_edges = torch.zeros(num_steps * num_steps, dtype=torch.long)
+    for (src_type, _, dst_type), e in edge_index_dict.items():
+        if src_type == dst_type == time_type and e.numel():
+            step_edges += torch.bincount(step_of[e[0]] * num_steps + step_of[e[1]], minlength=num_steps ** 2)
+    weights = None if node_load is None else node_load.double()
+    bounds = time_step_boundaries(torch.bincount(step_of, weights=weights, minlength=num_steps),
+                                  step_edges.view(num_steps, num_steps), num_parts, imbalance)
+
+    part_of_step = torch.repeat_interleave(torch.arange(num_parts), torch.tensor(bounds).diff())
+    assignment = {time_type: part_of_step[step_of]}
+
+    for node_type, n in num_nodes.items():
+        if node_type == time_type:
+            continue
+        # Fallback: partition of the node's own time step (or partition 0)
+        if node_type in timestamps:
+            pos = torch.searchsorted(steps, timestamps[node_type].long()).clamp(max=num_steps - 1)
+            fallback = part_of_step[pos]
+        else:
+            fallback = torch.zeros(n, dtype=torch.long)
+        votes = torch.zeros(n * num_parts, dtype=torch.long)
+        for (src_type, _, dst_type), e in edge_index_dict.items():
+            if src_type == node_type and dst_type == time_type:
+                votes += torch.bincount(e[0] * num_parts + assignment[time_type][e[1]], minlength=n * num_parts)
+            if dst_type == node_type and src_type == time_type:
+                votes += torch.bincount(e[1] * num_parts + assignment[time_type][e[0]], minlength=n * num_parts)
+        votes = votes.view(n, num_parts)
+        assignment[node_type] = torch.where(votes.sum(1) > 0, votes.argmax(1), fallback)
+    return assignment
+
+
+def build_partitions(graph: dict, assignment: Dict[str, torch.Tensor], num_hops: int) -> List[dict]:
+    """
+    Materialize each partition with its `num_hops`-hop halo.
+
+    Args:
+        graph: Dict with x_dict, edge_index_dict, y, train_mask, val_mask,
+            test_mask (as written by `sweep.share_graph`)
+        assignment: Output of `partition_graph`
+        num_hops: Halo depth (>= number of model layers)
+
+    Returns:
+        One dict per partition in the `graph` format plus `nodes` (global
+        ids) and `owned` masks; split masks only cover owned transactions
+    """
+    x_dict = graph['x_dict']
+    num_nodes = {t: x.shape[0] for t, x in x_dict.items()}
+    adjacency = HeteroAdjacency(graph['edge_index_dict'], num_nodes)
+    num_parts = int(max(int(a.max()) for a in assignment.values() if a.numel())) + 1
+
+    partitions = []
+    for part in range(num_parts):
+        owned_ids = {t: (a == part).nonzero().view(-1) for t, a in assignment.items()}
+        nodes, edges = adjacency.subgraph(owned_ids, num_hops)
+        owned = {t: assignment[t][ids] == part for t, ids in nodes.items()}
+        tx = nodes['transaction']
+        partitions.append({
+            'part': part,
+            'num_hops': num_hops,
+            'nodes': nodes,
+            'owned': owned,
+            'x_dict': {t: x_dict[t][ids] for t, ids in nodes.items()},
+            'edge_index_dict': edges,
+            'y': graph['y'][tx],
+            **{f'{split}_mask': graph[f'{split}_mask'][tx] & owned['transaction']
+               for split in ('train', 'val', 'test')}
+        })
+    return partitions
+
+
+def partition_report(
+    edge_index_dict: Dict[EdgeType, torch.Tensor],
+    assignment: Dict[str, torch.Tensor],
+    partitions: List[dict]
+) -> dict:
+    """
+    Edge-cut, halo overhead and load balance of a partitioning.
+
+    - edge_cut: edges whose endpoints are owned by different partitions
+    - halo_overhead: stored halo nodes / owned nodes (0 = no replication)
+    - load_balance: max / mean owned nodes (and edges) per partition (1 = perfect)
+    """
+    total_edges = sum(e.shape[1] for e in edge_index_dict.values())
+    cut = {
+        f'{s}_{r}_{d}': int((assignment[s][e[0]] != assignment[d][e[1]]).sum())
+        for (s, r, d), e in edge_index_dict.items()
+    }
+    per_part = []
+    for p in partitions:
+        owned = {t: int(mask.sum()) for t, mask in p['owned'].items()}
+        stored = {t: int(mask.numel()) for t, mask in p['owned'].items()}
+        per_part.append({
+            'part': p['part'],
+            'owned_nodes': owned,
+            'halo_nodes': {t: stored[t] - owned[t] for t in stored},
+            'halo_overhead': (sum(stored.values()) - sum(owned.values())) / max(sum(owned.values()), 1),
+            'edges': int(sum(e.shape[1] for e in p['edge_index_dict'].values())),
+            'train_targets': int(p['train_mask'].sum())
+        })
+
+    def imbalance(values):
+        mean = sum(values) / len(values)
+        return max(values) / mean if mean else 1.0
+
+    owned_total = [sum(r['owned_nodes'].values()) for r in per_part]
+    stored_total = sum(sum(p['owned'][t].numel() for t in p['owned']) for p in partitions)
+    return {
+        'num_parts': len(partitions),
+        'num_hops': partitions[0]['num_hops'] if partitions else 0,
+        'edge_cut': sum(cut.values()),
+        'edge_cut_fraction': sum(cut.values()) / max(total_edges, 1),
+        'edge_cut_per_relation': cut,
+        'halo_overhead': stored_total / max(sum(owned_total), 1) - 1,
+        'load_balance': {
+            'nodes': imbalance(owned_total),
+            'transactions': imbalance([r['owned_nodes']['transaction'] for r in per_part]),
+            'train_targets': imbalance([r['train_targets'] for r in per_part]),
+            'edges': imbalance([r['edges'] for r in per_part])
+        },
+        'partitions': per_part
+    }
+
+
+def save_partitions(partitions: List[dict], output_dir: PathLike, report: Optional[dict] = None) -> Path:
+    """Write one `part_<i>.pt` per partition plus `partition.json`."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for p in partitions:
+        torch.save(p, output_dir / f"part_{p['part']}.pt")
+    with open(output_dir / 'partition.json', 'w') as f:
+        json.dump({'num_parts': len(partitions), **(report or {})}, f, indent=2)
+    print(f" Saved {len(partitions)} partitions: {output_dir}")
+    return output_dir
+
+
+def load_partition(path: PathLike, mmap: bool = True) -> dict:
+    """
+    Load one partition; usable directly as the `graph` of `trainer_from_config`
+    (split masks cover owned transactions only).
+    """
+    return torch.load(path, map_location='cpu', mmap=mmap, weights_only=True)
@@ -0,0 +1,128 @@
+"""
+Class-Aware Target Batch Scheduler for Mini-Batch Training
+
+Elliptic++ is ~2% fraud overall, so uniform batches spend most compute on
+easy negatives. Each batch here holds:
+- positives: a fixed `fraud_ratio` of the batch, cycling through all
+  fraud targets (every positive is seen once per epoch by default)
+- hard negatives: drawn from the negatives the model scored highest in
+  the previous epoch (`update_scores`)
+- uniform negatives: the rest, drawn from all negatives
+
+Every draw carries an importance weight B / (M * pi_i), where pi_i is the
+expected number of draws of target i per batch and M the number of
+targets. The weighted batch mean of per-target losses is then an unbiased
+estimate of the full-data mean loss (uniform batches give weight 1).
+"""
+import math
+from typing import List, Optional, Tuple
+
+import torch
+
+
+class ClassAwareScheduler:
+    """
+    Fraud-enriched, hard-negative-mined target batches with unbiased loss weights.
+
+    Args:
+        targets: [M] global ids of the training targets
+        y: [N] labels (1=fraud, 0=legit, -1=unknown; unknown targets are dropped)
+        batch_size: Targets per batch
+        fraud_ratio: Fraction of each batch drawn from the positives
+        hard_negative_ratio: Fraction of the negatives drawn from the hard
+            pool (once scores exist; uniform before the first update)
+        hard_pool_size: Top-scored negatives forming the hard pool (default:
+            4x the hard draws per batch)
+        num_batches: Batches per epoch (default: one pass over the positives)
+    """
+
+    def __init__(
+        self,
+        targets: torch.Tensor,
+        y: torch.Tensor,
+        batch_size: int = 1024,
+        fraud_ratio: float = 0.25,
+        hard_negative_ratio: float = 0.5,
+        hard_pool_size: Optional[int] = None,
+        num_batches: Optional[int] = None
+    ):
+        labels = y[targets]
+        self.pos = targets[labels == 1]
+        self.neg = targets[labels == 0]
+        if self.pos.numel() == 0 or self.neg.numel() == 0:
+            raise ValueError("ClassAwareScheduler needs both fraud and legit targets")
+        self.batch_size = batch_size
+        self.num_pos = min(max(1, round(fraud_ratio * batch_size)), batch_size - 1)
+        num_neg = batch_size - self.num_pos
+        self.num_hard = min(round(hard_negative_ratio * num_neg), num_neg)
+        self.hard_pool_size = min(hard_pool_size or 4 * max(self.num_hard, 1), self.neg.numel())
+        self.num_batches = num_batches or math.ceil(self.pos.numel() / self.num_pos)
+        self.scores = torch.full((y.numel(),), float('nan'))
+        self.targets_processed = 0
+
+    @property
+    def num_targets(self) -> int:
+        return self.pos.numel() + self.neg.numel()
+
+    def update_scores(self, ids: torch.Tensor, scores: torch.Tensor):
+        """Record model scores (e.g. fraud probabilities from the training pass)."""
+        self.scores[ids] = scores.detach().float().cpu()
+
+    def _draws(self, pool: torch.Tensor, per_batch: int, generator: torch.Generator) -> torch.Tensor:
+        """[num_batches, per_batch] draws; distinct within a batch, cycling over the pool."""
+        if per_batch == 0:
+            return torch.zeros((self.num_batches, 0), dtype=torch.long)
+        if per_batch > pool.numel():
+            # Pool smaller than a batch: draw with replacement
+            order = torch.randint(0, pool.numel(), (self.num_batches * per_batch,), generator=generator)
+        else:
+            passes = math.ceil(self.num_batches * per_batch / pool.numel())
+            order = torch.cat([torch.randperm(pool.numel(), generator=generator) for _ in range(passes)])
+        return pool[order[:self.num_batches * per_batch]].view(self.num_batches, per_batch)
+
+    def epoch(self, seed: int = 0) -> List[Tuple[torch.Tensor, torch.Tensor]]:
+        """
+        Batches for one epoch, using the scores recorded so far.
+
+        Returns:
+            List of (ids [B], loss weights [B])
+        """
+        generator = torch.Generator().manual_seed(seed)
+        neg_scores = self.scores[self.neg]
+        mined = bool(self.num_hard) and not torch.isnan(neg_scores).all()
+        num_hard = self.num_hard if mined else 0
+        num_uniform = self.batch_size - self.num_pos - num_hard
+
+        pos = self._draws(self.pos, self.num_pos, generator)
+        uniform = self._draws(self.neg, num_uniform, generator)
+        pool = self.neg[torch.argsort(torch.nan_to_num(neg_scores, nan=-1.0), descending=True)[:self.hard_pool_size]]
+        hard = self._draws(pool, num_hard, generator) if mined else uniform[:, :0]
+
+        # Expected draws per batch of each target (pi_i)
+        m = self.num_targets
+        pi_pos = self.num_pos / self.pos.numel()
+        pi_uniform = num_uniform / self.neg.numel()
+        in_pool = torch.zeros(self.scores.numel(), dtype=torch.bool)
+        in_pool[pool] = True
+        pi_hard = num_hard / pool.numel()
+
+        batches = []
+        for b in range(self.num_batches):
+            negatives = torch.cat([hard[b], uniform[b]])
+            pi_neg = pi_uniform + pi_hard * in_pool[negatives].float()
+            weights = torch.cat([torch.full((self.num_pos,), pi_pos), pi_neg])
+            batches.append((torch.cat([pos[b], negatives]), self.batch_size / (m * weights)))
+        self.targets_processed += self.num_batches * self.batch_size
+        return batches
+
+    def summary(self) -> dict:
+        return {
+            'positives': self.pos.numel(),
+            'negatives': self.neg.numel(),
+            'batch_size': self.batch_size,
+            'positives_per_batch': self.num_pos,
+            'hard_negatives_per_batch': self.num_hard,
+            'hard_pool_size': self.hard_pool_size,
+            'batches_per_epoch': self.num_batches,
+            'targets_processed': self.targets_processed
+        }
@@ -0,0 +1,189 @@
+"""
+Time-Sorted Graph with Zero-Copy Snapshot Views
+
+`TemporalGraph` relabels the nodes of each type in time order and sorts
+the edges of each relation by edge time (the later endpoint's time, i.e.
+when the edge first exists). With per-step offset tables:
+
+- as_of(t):        nodes with time <= t and edges with time <= t are
+                   prefixes, so the view is plain slices (no copies)
+- window(t0, t1):  edges that appear in [t0, t1] are one slice; nodes are
+                   the as_of(t1) prefix (sources may be older), and the
+                   nodes born in the window are [node_start, num_nodes)
+
+Works for the hetero graph and, via `from_homogeneous`, for the tx-only
+graph. `perm` / `inverse` map between original and time-sorted ids.
+"""
+from typing import Dict, Optional, Tuple
+
+import torch
+
+
+EdgeType = Tuple[str, str, str]
+
+
+class TemporalView:
+    """
+    Snapshot of a `TemporalGraph`; all tensors are slices of the parent.
+
+    Attributes:
+        x_dict: {node_type: [n, F]} features of visible nodes
+        edge_index_dict: {edge_type: [2, e]} visible edges (time-sorted ids)
+        node_attrs: {node_type: {name: [n]}} labels, masks, timestamps, ...
+        node_start: {node_type: first node id born inside the window}
+        t0, t1: Time range of the view (inclusive)
+    """
+
+    def __init__(self, x_dict, edge_index_dict, node_attrs, node_start, t0, t1):
+        self.x_dict = x_dict
+        self.edge_index_dict = edge_index_dict
+        self.node_attrs = node_attrs
+        self.node_start = node_start
+        self.t0, self.t1 = t0, t1
+
+    @property
+    def num_nodes(self) -> Dict[str, int]:
+        return {t: x.shape[0] for t, x in self.x_dict.items()}
+
+    def new_nodes(self, node_type: str) -> torch.Tensor:
+        """Ids of `node_type` nodes whose time is inside [t0, t1]."""
+        return torch.arange(self.node_start[node_type], self.x_dict[node_type].shape[0])
+
+    # Homogeneous shortcuts (single node type / relation)
+    @property
+    def x(self) -> torch.Tensor:
+        (x,) = self.x_dict.values()
+        return x
+
+    @property
+    def edge_index(self) -> torch.Tensor:
+        (edge_index,) = self.edge_index_dict.values()
+        return edge_index
+
+    def __getitem__(self, name: str) -> torch.Tensor:
+        """Node attribute of the single node type (e.g. view['y'])."""
+        (attrs,) = self.node_attrs.values()
+        return attrs[name]
+
+
+class TemporalGraph:
+    """
+    Nodes and edges sorted by time step with per-step offset tables.
+
+    Args:
+        x_dict: {node_type: [N, F]} node features
+        edge_index_dict: {edge_type: [2, E]} relations (original ids)
+        time_dict: {node_type: [N]} integer time steps
+        node_attrs: {node_type: {name: [N, ...]}} per-node tensors to keep
+            aligned (labels, split masks, ...)
+    """
+
+    def __init__(
+        self,
+        x_dict: Dict[str, torch.Tensor],
+        edge_index_dict: Dict[EdgeType, torch.Tensor],
+        time_dict: Dict[str, torch.Tensor],
+        node_attrs: Optional[Dict[str, Dict[str, torch.Tensor]]] = None
+    ):
+        times = {t: time_dict[t].long() for t in x_dict}
+        self.t_min = int(min(int(t.min()) for t in times.values() if t.numel()))
+        self.t_max = int(max(int(t.max()) for t in times.values() if t.numel()))
+        steps = torch.arange(self.t_min, self.t_max + 2)
+
+        # Nodes: stable sort by time; node_ptr[t][k] = #nodes with time < t_min + k
+        self.perm, self.inverse, self.time_dict, self.node_ptr = {}, {}, {}, {}
+        for node_type, t in times.items():
+            perm = torch.argsort(t, stable=True)
+            self.perm[node_type] = perm
+            self.inverse[node_type] = torch.empty_like(perm).scatter_(0, perm, torch.arange(perm.numel()))
+            self.time_dict[node_type] = t[perm]
+            self.node_ptr[node_type] = torch.searchsorted(self.time_dict[node_type], steps)
+        self.x_dict = {t: x[self.perm[t]] for t, x in x_dict.items()}
+        self.node_attrs = {
+            t: {name: v[self.perm[t]] for name, v in attrs.items()}
+            for t, attrs in (node_attrs or {}).items()
+        }
+        for node_type, t in self.time_dict.items():
+            self.node_attrs.setdefault(node_type, {})['time'] = t
+
+        # Edges: relabel, then sort by edge time = max(src time, dst time)
+        self.edge_index_dict, self.edge_time, self.edge_ptr = {}, {}, {}
+        for (src_type, rel, dst_type), e in edge_index_dict.items():
+            src, dst = self.inverse[src_type][e[0]], self.inverse[dst_type][e[1]]
+            edge_time = torch.maximum(self.time_dict[src_type][src], self.time_dict[dst_type][dst])
+            order = torch.argsort(edge_time, stable=True)
+            self.edge_index_dict[(src_type, rel, dst_type)] = torch.stack([src[order], dst[order]])
+            self.edge_time[(src_type, rel, dst_type)] = edge_time[order]
+            self.edge_ptr[(src_type, rel, dst_type)] = torch.searchsorted(edge_time[order], steps)
+
+    @classmethod
+    def from_hetero_data(cls, data, attrs=('y', 'train_mask', 'val_mask', 'test_mask')) -> 'TemporalGraph':
+        """Build from the HeteroData of `HeteroGraphBuilder` (uses `.timestamp`)."""
+        return cls(
+            {t: data[t].x for t in data.node_types},
+            {et: data[et].edge_index for et in data.edge_types},
+            {t: data[t].timestamp for t in data.node_types},
+            {t: {a: data[t][a] for a in attrs if a in data[t]} for t in data.node_types}
+        )
+
+    @classmethod
+    def from_homogeneous(cls, x: torch.Tensor, edge_index: torch.Tensor, time: torch.Tensor,
+                         node_type: str = 'transaction', **node_attrs) -> 'TemporalGraph':
+        """Build from a single-type graph (e.g. the tx-tx graph); extra kwargs are node attributes."""
+        return cls({node_type: x}, {(node_type, 'to', node_type): edge_index},
+                   {node_type: time}, {node_type: node_attrs})
+
+    @property
+    def steps(self) -> torch.Tensor:
+        return torch.arange(self.t_min, self.t_max + 1)
+
+    def _pos(self, t: int) -> int:
+        """Offset-table index of the first step after `t` (clamped)."""
+        return min(max(t - self.t_min + 1, 0), self.t_max - self.t_min + 1)
+
+    def _view(self, t0: int, t1: int) -> TemporalView:
+        start, end = self._pos(t0 - 1), self._pos(t1)
+        node_end = {t: int(ptr[end]) for t, ptr in self.node_ptr.items()}
+        return TemporalView(
+            {t: x[:node_end[t]] for t, x in self.x_dict.items()},
+            {et: e[:, int(self.edge_ptr[et][start]):int(self.edge_ptr[et][end])]
+             for et, e in self.edge_index_dict.items()},
+            {t: {name: v[:node_end[t]] for name, v in attrs.items()} for t, attrs in self.node_attrs.items()},
+            {t: int(ptr[start]) for t, ptr in self.node_ptr.items()},
+            t0, t1
+        )
+
+    def as_of(self, t: int) -> TemporalView:
+        """The graph as it existed at the end of step `t` (zero-copy)."""
+        return self._view(self.t_min, t)
+
+    def window(self, t0: int, t1: int) -> TemporalView:
+        """
+        Edges appearing in steps [t0, t1] over the as_of(t1) node prefix
+        (zero-copy); `view.new_nodes(type)` are the nodes born in the window.
+        """
+        return self._view(t0, t1)
+
+    def to_original(self, node_type: str, ids: torch.Tensor) -> torch.Tensor:
+        """Map time-sorted ids back to the original node ids."""
+        return self.perm[node_type][ids]
+
+    def from_original(self, node_type: str, ids: torch.Tensor) -> torch.Tensor:
+        """Map original node ids to time-sorted ids."""
+        return self.inverse[node_type][ids]
+
+    def induced_window(self, t0: int, t1: int) -> TemporalView:
+        """
+        Window restricted to nodes born in [t0, t1], with local ids (copies
+        the edge tensors; nodes and attributes are still slices).
+        """
+        view = self.window(t0, t1)
+        x_dict, attrs, edges = {}, {}, {}
+        for t, x in view.x_dict.items():
+            x_dict[t] = x[view.node_start[t]:]
+            attrs[t] = {name: v[view.node_start[t]:] for name, v in view.node_attrs[t].items()}
+        for (src_type, rel, dst_type), e in view.edge_index_dict.items():
+            src, dst = e[0] - view.node_start[src_type], e[1] - view.node_start[dst_type]
+            keep = (src >= 0) & (dst >= 0)
+            edges[(src_type, rel, dst_type)] = torch.stack([src[keep], dst[keep]])
+        return TemporalView(x_dict, edges, attrs, {t: 0 for t in x_dict}, t0, t1)
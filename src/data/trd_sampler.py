@@ -3,11 +3,105 @@ Time-Relaxed Directed (TRD) Sampler for Temporal GNNs
 
 Enforces strict temporal constraint: for target node at time t*, 
 only neighbors with timestamp <= t* are sampled (no future leakage).
+
+Backends (same TRD rule and cap/fanout semantics):
+- 'python':     reference per-node implementation
+- 'vectorized': CSR index (cached per graph) + batched torch ops per hop
+- 'pyglib':     pyg-lib's compiled temporal neighbor sampler, one hop at
+                a time with each frontier node as its own seed time; falls
+                back to 'vectorized' when pyg-lib is not installed.
+                Unverified until the pyg-lib parity test in
+                tests/test_sampler_backends.py runs (it is skipped where
+                pyg-lib is missing)
+
+strategy='recency' (vectorized backend) draws neighbors with probability
+proportional to exp(-(t* - t) / tau) instead of uniformly. Since that is
+exp(t / tau) up to a per-query constant, one cumulative-weight table over
+each node's time-sorted neighbor list serves every t*: the time-valid
+neighbors are a prefix, and each draw is a binary search (O(log d)).
 """
+import time
 import torch
 import numpy as np
 from typing import List, Tuple, Optional
-from torch_geometric.data import Data
+
+from src.data.adjacency import build_csr, gather_rows, sample_in_edges, segment_cumsum
+from src.data.leakage_audit import LeakageAudit
+
+
+BACKENDS = ('python', 'vectorized', 'pyglib')
+STRATEGIES = ('uniform', 'recency')
+
+
+def pyglib_available() -> bool:
+    """Whether pyg-lib's compiled neighbor sampler can be imported."""
+    try:
+        import pyg_lib  # noqa: F401
+        return hasattr(pyg_lib, 'sampler') and hasattr(pyg_lib.sampler, 'neighbor_sample')
+    except ImportError:
+        return False
+
+
+class SamplerStats:
+    """
+    Hot-path counters of `TRDSampler`, aggregated across `sample` calls.
+
+    Phase times (seconds): index_build, filter (time constraint), cap
+    (max_in/max_out/fanout subsampling), relabel. Per layer: frontier
+    size, candidate neighbors, neighbors kept by the time filter, cap hits.
+    """
+
+    PHASES = ('index_build', 'filter', 'cap', 'relabel')
+    LAYER_COUNTERS = ('frontier', 'candidates', 'time_kept', 'sampled',
+                      'in_cap_hits', 'out_cap_hits', 'fanout_hits')
+
+    def __init__(self, num_layers: int):
+        self.num_layers = num_layers
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.targets = 0
+        self.seconds = {phase: 0.0 for phase in self.PHASES}
+        self.total_seconds = 0.0
+        self.layers = [{c: 0 for c in self.LAYER_COUNTERS} for _ in range(self.num_layers)]
+
+    def summary(self) -> dict:
+        """Aggregated stats; ratios are over all calls since the last reset."""
+        layers = []
+        for counters in self.layers:
+            frontier = max(counters['frontier'], 1)
+            layers.append({
+                **counters,
+                'mean_frontier': counters['frontier'] / max(self.calls, 1),
+                'time_filtered_fraction': 1 - counters['time_kept'] / counters['candidates']
+                if counters['candidates'] else 0.0,
+                'in_cap_rate': counters['in_cap_hits'] / frontier,
+                'out_cap_rate': counters['out_cap_hits'] / frontier,
+                'fanout_cap_rate': counters['fanout_hits'] / frontier
+            })
+        return {
+            'calls': self.calls,
+            'targets': self.targets,
+            'seconds': {**self.seconds, 'total': self.total_seconds},
+            'targets_per_sec': self.targets / self.total_seconds if self.total_seconds else 0.0,
+            'layers': layers
+        }
+
+    def metrics(self, prefix: str = 'sampler') -> dict:
+        """`summary()` as flat {name: number} pairs for per-epoch log lines."""
+        summary = self.summary()
+        out = {f'{prefix}_calls': summary['calls'], f'{prefix}_targets_per_sec': summary['targets_per_sec']}
+        out.update({f'{prefix}_{phase}_seconds': v for phase, v in summary['seconds'].items()})
+        for i, layer in enumerate(summary['layers']):
+            out.update({f'{prefix}_layer{i}_{k}': v for k, v in layer.items()})
+        return out
+
+    def pop(self) -> dict:
+        """`summary()` then reset, e.g. once per epoch."""
+        summary = self.summary()
+        self.reset()
+        return summary
 
 
 class TRDSampler:
@@ -23,6 +117,22 @@ class TRDSampler:
         max_in_neighbors: Max incoming neighbors per node
         max_out_neighbors: Max outgoing neighbors per node
         allow_self_loops: Include self-connections in sampling
+        audit: Check every sampled batch for future leakage (counters in
+            `self.audit.metrics()`)
+        strict_audit: Raise instead of only counting violations
+        instrument: Collect hot-path timings and per-layer counters in
+            `self.stats` (`SamplerStats`)
+        backend: 'python', 'vectorized' or 'pyglib' (see module docstring);
+            the backend actually used is `self.backend_used`. pyg-lib draws
+            up to `fanout` uniformly from the time-valid in + out neighbors,
+            so the separate in/out caps only apply to the other backends
+            (per-node counts match whenever fanout <= both caps).
+        strategy: 'uniform' or 'recency' (exponential time decay; needs a
+            batched backend). Recency draws `fanout` times with replacement
+            from the time-valid in + out neighbors and keeps the distinct
+            ones, so in/out caps do not apply
+        recency_tau: Decay time constant in time steps (weight halves every
+            tau * ln 2 steps back from t*)
     """
     
     def __init__(
@@ -31,21 +141,49 @@ class TRDSampler:
         directed: bool = True,
         max_in_neighbors: int = 15,
         max_out_neighbors: int = 15,
-        allow_self_loops: bool = True
+        allow_self_loops: bool = True,
+        audit: bool = True,
+        strict_audit: bool = False,
+        instrument: bool = False,
+        backend: str = 'python',
+        strategy: str = 'uniform',
+        recency_tau: float = 5.0
     ):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend: {backend} (expected one of {BACKENDS})")
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy: {strategy} (expected one of {STRATEGIES})")
+        if strategy == 'recency' and backend == 'python':
+            raise ValueError("strategy='recency' needs the 'vectorized' or 'pyglib' backend")
         self.fanouts = list(fanouts)
         self.directed = directed
         self.max_in_neighbors = max_in_neighbors
         self.max_out_neighbors = max_out_neighbors
         self.allow_self_loops = allow_self_loops
         self.num_layers = len(self.fanouts)
+        self.audit = LeakageAudit(strict=strict_audit) if audit else None
+        self.stats = SamplerStats(self.num_layers) if instrument else None
+        self.backend = backend
+        self.backend_used = backend
+        self.strategy = strategy
+        self.recency_tau = recency_tau
+        if strategy == 'recency':
+            # pyg-lib has no exponential-decay strategy; the tables live in the vectorized path
+            self.backend_used = 'vectorized'
+        elif backend == 'pyglib' and not pyglib_available():
+            print("   pyg-lib not installed; TRDSampler using the vectorized backend")
+            self.backend_used = 'vectorized'
+        self._index_key = None
+        self._index_tensors = None
+        self._index = None
         
     def sample(
         self, 
         edge_index: torch.Tensor,
         timestamps: torch.Tensor,
         target_nodes: torch.Tensor,
-        num_hops: int = 2
+        num_hops: int = 2,
+        generator: Optional[torch.Generator] = None
     ) -> Tuple[torch.Tensor, torch.Tensor, List[int]]:
         """
         Sample temporal neighborhood for target nodes.
@@ -55,6 +193,7 @@ class TRDSampler:
             timestamps: [N] node timestamps
             target_nodes: [T] target node indices
             num_hops: Number of hops to sample (should match len(fanouts))
+            generator: RNG of the vectorized backend (python uses np.random)
             
         Returns:
             sampled_nodes: Nodes in sampled subgraph
@@ -63,8 +202,32 @@ class TRDSampler:
         """
         if num_hops != self.num_layers:
             num_hops = self.num_layers
-            
+
+        stats = self.stats
+        start = time.perf_counter()
+        if self.backend_used == 'python':
+            all_nodes, sampled_edge_index, layer_sizes = self._sample_python(
+                edge_index, timestamps, target_nodes, num_hops)
+        else:
+            all_nodes, sampled_edge_index, layer_sizes = self._sample_vectorized(
+                edge_index, timestamps, target_nodes, num_hops, generator)
+        if stats:
+            stats.total_seconds += time.perf_counter() - start
+            stats.calls += 1
+            stats.targets += len(target_nodes)
+
+        if self.audit is not None:
+            self.audit.check_homogeneous(all_nodes, sampled_edge_index, timestamps,
+                                         sample_seconds=time.perf_counter() - start)
+        
+        return all_nodes, sampled_edge_index, layer_sizes
+
+    def _sample_python(self, edge_index, timestamps, target_nodes, num_hops):
+        """Reference implementation: Python adjacency lists, per-node np.random draws."""
         device = edge_index.device
+        stats = self.stats
+        clock = time.perf_counter
+        start = clock()
         
         # Initialize with target nodes
         current_nodes = target_nodes.unique()
@@ -81,15 +244,22 @@ class TRDSampler:
             src, dst = edge_index[0, i].item(), edge_index[1, i].item()
             adj_out[src].append(dst)
             adj_in[dst].append(src)
+        if stats:
+            stats.seconds['index_build'] += clock() - start
         
         # Sample layer by layer (backward from targets)
         for layer_idx in range(num_hops):
             fanout = self.fanouts[layer_idx]
             next_layer_nodes = []
             layer_edges = []
+            if stats:
+                counters = stats.layers[layer_idx]
+                counters['frontier'] += len(current_nodes)
             
             for node_idx in current_nodes.cpu().numpy():
                 node_time = timestamps[node_idx].item()
+                if stats:
+                    t0 = clock()
                 
                 # Get temporal neighbors (time <= node_time)
                 in_neighbors = [
@@ -100,6 +270,12 @@ class TRDSampler:
                     n for n in adj_out[node_idx]
                     if timestamps[n].item() <= node_time
                 ] if self.directed else []
+                if stats:
+                    t1 = clock()
+                    counters['candidates'] += len(adj_in[node_idx]) + (len(adj_out[node_idx]) if self.directed else 0)
+                    counters['time_kept'] += len(in_neighbors) + len(out_neighbors)
+                    counters['in_cap_hits'] += len(in_neighbors) > self.max_in_neighbors
+                    counters['out_cap_hits'] += self.directed and len(out_neighbors) > self.max_out_neighbors
                 
                 # Cap neighbors
                 if len(in_neighbors) > self.max_in_neighbors:
@@ -128,6 +304,11 @@ class TRDSampler:
                     ).tolist()
                 else:
                     sampled = all_neighbors
+                if stats:
+                    counters['fanout_hits'] += len(all_neighbors) > fanout
+                    counters['sampled'] += len(sampled)
+                    stats.seconds['filter'] += t1 - t0
+                    stats.seconds['cap'] += clock() - t1
                 
                 # Add sampled neighbors
                 for neighbor in sampled:
@@ -156,6 +337,8 @@ class TRDSampler:
                 all_sampled_edges.extend(layer_edges)
         
         # Combine all sampled nodes
+        if stats:
+            t0 = clock()
         all_nodes = torch.cat(all_sampled_nodes).unique()
         
         # Create node mapping
@@ -175,8 +358,196 @@ class TRDSampler:
             ).t().contiguous() if remapped_edges else torch.zeros((2, 0), dtype=torch.long, device=device)
         else:
             sampled_edge_index = torch.zeros((2, 0), dtype=torch.long, device=device)
-        
+        if stats:
+            stats.seconds['relabel'] += clock() - t0
         return all_nodes, sampled_edge_index, layer_sizes
+
+    def _csr(self, edge_index: torch.Tensor, timestamps: torch.Tensor) -> dict:
+        """
+        In/out CSR of the graph (and recency table) plus CPU int64 node
+        times, cached across calls on the same, unmodified edge and
+        timestamp tensors.
+        """
+        num_nodes = timestamps.numel()
+        # Identity + in-place version of the caller's tensors; holding the
+        # references keeps their storage from being reused by another tensor
+        key = (edge_index._version, timestamps._version, edge_index.shape[1], num_nodes)
+        cached = self._index_tensors
+        if cached is None or cached[0] is not edge_index or cached[1] is not timestamps or self._index_key != key:
+            times = timestamps.cpu().long()
+            src, dst = edge_index.cpu()
+            index = {'times': times,
+                     'in': build_csr(dst, src, num_nodes)[:2], 'out': build_csr(src, dst, num_nodes)[:2]}
+            if self.strategy == 'recency':
+                index['recency'] = self._recency_table(src, dst, times)
+            if self.backend_used == 'pyglib':
+                # pyg-lib samples from one CSC: in-sources and (directed) out-destinations
+                rows, cols = (torch.cat([dst, src]), torch.cat([src, dst])) if self.directed else (dst, src)
+                index['union'] = build_csr(rows, cols, num_nodes)[:2]
+            self._index_key, self._index_tensors, self._index = key, (edge_index, timestamps), index
+        return self._index
+
+    def _hop_vectorized(self, index, times, frontier, fanout, generator, counters):
+        """One hop for all frontier nodes: time filter, in/out caps, fanout -> (neighbor, local dst)."""
+        clock = time.perf_counter
+        t0 = clock()
+        parts = []
+        for direction, cap, enabled in (('in', self.max_in_neighbors, True),
+                                        ('out', self.max_out_neighbors, self.directed)):
+            if not enabled:
+                continue
+            rows, neighbors = gather_rows(*index[direction], frontier)
+            local = torch.searchsorted(frontier, rows)
+            keep = times[neighbors] <= times[rows]
+            if counters is not None:
+                counters['candidates'] += neighbors.numel()
+                counters['time_kept'] += int(keep.sum())
+            parts.append((torch.stack([neighbors[keep], local[keep]]), cap, direction))
+        t1 = clock()
+
+        capped = []
+        for pairs, cap, direction in parts:
+            if counters is not None:
+                counters[f'{direction}_cap_hits'] += int((torch.bincount(pairs[1], minlength=frontier.numel()) > cap).sum())
+            capped.append(sample_in_edges(pairs, frontier.numel(), cap, generator))
+        pairs = torch.cat(capped, dim=1)
+        sampled = sample_in_edges(pairs, frontier.numel(), fanout, generator)
+        if counters is not None:
+            counters['fanout_hits'] += int((torch.bincount(pairs[1], minlength=frontier.numel()) > fanout).sum())
+            counters['sampled'] += sampled.shape[1]
+            self.stats.seconds['filter'] += t1 - t0
+            self.stats.seconds['cap'] += clock() - t1
+        return sampled
+
+    def _recency_table(self, src: torch.Tensor, dst: torch.Tensor, times: torch.Tensor) -> dict:
+        """
+        Neighbor lists (in + directed out) sorted by (node, neighbor time),
+        with per-node cumulative sums of exp((t - t_node_max) / tau) weights
+        (t_node_max: the node's newest neighbor, so each list starts at its
+        own scale and never cancels against other nodes' totals).
+        """
+        rows, neighbors = (torch.cat([dst, src]), torch.cat([src, dst])) if self.directed else (dst, src)
+        t_min, t_max = int(times.min()), int(times.max())
+        span = t_max - t_min + 2
+        # Composite key: node-major, neighbor-time-minor; searchsorted on it finds valid prefixes
+        key = rows * span + (times[neighbors] - t_min)
+        order = torch.argsort(key, stable=True)
+        ptr = torch.zeros(times.numel() + 1, dtype=torch.long)
+        degree = torch.bincount(rows, minlength=times.numel())
+        ptr[1:] = torch.cumsum(degree, dim=0)
+        neighbor_time = times[neighbors[order]]
+        # Sorted by time within a node: its newest neighbor is the last entry
+        row_max = torch.repeat_interleave(neighbor_time[(ptr[1:] - 1).clamp(min=0)], degree)
+        weight = torch.exp((neighbor_time - row_max).double() / self.recency_tau)
+        return {'ptr': ptr, 'neighbors': neighbors[order], 'key': key[order],
+                'cumulative': segment_cumsum(weight, ptr), 't_min': t_min, 'span': span,
+                'max_degree': int(degree.max()) if degree.numel() else 0}
+
+    def _hop_recency(self, table, times, frontier, fanout, generator, counters):
+        """One recency-weighted hop: `fanout` O(log d) draws per node, deduplicated."""
+        clock = time.perf_counter
+        t0 = clock()
+        start = table['ptr'][frontier]
+        # End of the time-valid prefix: last entry with neighbor time <= t*
+        end = torch.searchsorted(table['key'], frontier * table['span'] + (times[frontier] - table['t_min']),
+                                 right=True)
+        valid = end - start
+        if counters is not None:
+            counters['candidates'] += int((table['ptr'][frontier + 1] - start).sum())
+            counters['time_kept'] += int(valid.sum())
+        t1 = clock()
+
+        local = torch.repeat_interleave(torch.arange(frontier.numel())[valid > 0], fanout)
+        if local.numel() == 0:
+            return torch.zeros((2, 0), dtype=torch.long)
+        a, b = start[local], end[local]
+        u = torch.rand(local.numel(), generator=generator, dtype=torch.float64)
+        cumulative = table['cumulative']
+        # Per-node sums start at the node's first entry `a`: draw below cumulative[b - 1]
+        total = cumulative[b - 1]
+        target = u * total
+        # Vectorized binary search for the first entry in [a, b) with cumulative > target
+        low, high = a.clone(), b - 1
+        for _ in range(table['max_degree'].bit_length()):
+            mid = (low + high) // 2
+            right = cumulative[mid] <= target
+            low = torch.where(right, mid + 1, low)
+            high = torch.where(right, high, mid)
+        pick = low
+        # Weights that underflow to 0 (tiny tau, old neighbors): fall back to uniform
+        uniform = a + (u * (b - a)).long()
+        pick = torch.where(total > 0, pick, uniform).clamp(min=a, max=b - 1)
+        pairs = torch.stack([table['neighbors'][pick], local]).unique(dim=1)
+        if counters is not None:
+            counters['fanout_hits'] += int((valid > fanout).sum())
+            counters['sampled'] += pairs.shape[1]
+            self.stats.seconds['filter'] += t1 - t0
+            self.stats.seconds['cap'] += clock() - t1
+        return pairs
+
+    def _hop_pyglib(self, index, times, frontier, fanout, counters):
+        """
+        One hop through pyg-lib: each frontier node is a disjoint seed at its own time.
+
+        Unverified: only exercised by `test_pyglib_matches_vectorized_counts`,
+        which skips unless pyg-lib is installed.
+        """
+        import pyg_lib
+
+        t0 = time.perf_counter()
+        row, col, node = pyg_lib.sampler.neighbor_sample(
+            *index['union'], frontier, [fanout], node_time=times, seed_time=times[frontier],
+            csc=True, replace=False, directed=True, disjoint=True,
+            temporal_strategy='uniform', return_edge_id=False)[:3]
+        node = node[:, 1] if node.dim() == 2 else node
+        # Seeds come first in `node`, in `frontier` order
+        sampled = torch.stack([node[row], col])
+        if counters is not None:
+            counters['sampled'] += sampled.shape[1]
+            self.stats.seconds['cap'] += time.perf_counter() - t0
+        return sampled
+
+    def _sample_vectorized(self, edge_index, timestamps, target_nodes, num_hops, generator):
+        """Batched backends ('vectorized', 'pyglib'): one set of tensor ops per hop."""
+        device = edge_index.device
+        stats = self.stats
+        clock = time.perf_counter
+        t0 = clock()
+        index = self._csr(edge_index, timestamps)
+        times = index['times']
+        if stats:
+            stats.seconds['index_build'] += clock() - t0
+
+        frontier = target_nodes.cpu().unique()
+        visited, edges, layer_sizes = [frontier], [], [frontier.numel()]
+        for layer_idx in range(num_hops):
+            counters = stats.layers[layer_idx] if stats else None
+            if counters is not None:
+                counters['frontier'] += frontier.numel()
+            if self.strategy == 'recency':
+                sampled = self._hop_recency(index['recency'], times, frontier, self.fanouts[layer_idx],
+                                            generator, counters)
+            elif self.backend_used == 'pyglib':
+                sampled = self._hop_pyglib(index, times, frontier, self.fanouts[layer_idx], counters)
+            else:
+                sampled = self._hop_vectorized(index, times, frontier, self.fanouts[layer_idx], generator, counters)
+            edges.append(torch.stack([sampled[0], frontier[sampled[1]]]))
+            if self.allow_self_loops:
+                edges.append(torch.stack([frontier, frontier]))
+            # As in the reference path, an empty hop keeps the current frontier
+            if sampled.shape[1]:
+                frontier = sampled[0].unique()
+                visited.append(frontier)
+                layer_sizes.append(frontier.numel())
+            else:
+                layer_sizes.append(0)
+
+        t0 = clock()
+        all_nodes = torch.cat(visited).unique()
+        sampled_edge_index = torch.searchsorted(all_nodes, torch.cat(edges, dim=1))
+        if stats:
+            stats.seconds['relabel'] += clock() - t0
+        return all_nodes.to(device), sampled_edge_index.to(device), layer_sizes
     
     def validate_no_future_leakage(
         self,
@@ -0,0 +1,272 @@
+"""
+Graph-Free MLP Student Distilled from a Hetero GNN Teacher
+
+Scoring with the GNN requires a neighborhood fetch per request. The student
+is an MLP over transaction features plus cheap aggregates that are
+precomputed once per graph snapshot (relation degrees and mean neighbor
+features over TRD-valid edges only). It is trained on the teacher's temperature-softened
+probabilities (plus hard labels), so pre-screening needs no graph access.
+
+Artifact layout:
+    <dir>/student.pt        state dict + architecture
+    <dir>/aggregates.npy    precomputed aggregates of indexed transactions
+    <dir>/meta.json         teacher info, feature layout, report
+"""
+import json
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from src.data.adjacency import trd_edge_index_dict
+from src.models.hhgtn import EdgeType
+from src.utils.metrics import pr_auc
+
+
+PathLike = Union[str, Path]
+
+
+def feature_aggregates(
+    x_dict: Dict[str, torch.Tensor],
+    edge_index_dict: Dict[EdgeType, torch.Tensor],
+    time_dict: Dict[str, torch.Tensor],
+    target_type: str = 'transaction',
+    mean_features: bool = True
+):
+    """
+    Precomputed per-target aggregates: log in/out degree per relation and the
+    mean raw features of in-neighbors per relation.
+
+    Only TRD-valid edges count: in-neighbors and out-neighbors no newer
+    than the target (`trd_edge_index_dict` on the relation and on its
+    flipped copy), so a snapshot's aggregates never depend on later
+    transactions.
+
+    Args:
+        x_dict: {node_type: [N, F]} node features
+        edge_index_dict: {edge_type: [2, E]} raw relations
+        time_dict: {node_type: [N]} timestamps
+        target_type: Node type the aggregates are computed for
+        mean_features: Include mean in-neighbor features (else degrees only)
+
+    Returns:
+        aggregates: [N_target, D] float tensor
+        names: D column names
+    """
+    num_targets = x_dict[target_type].shape[0]
+    in_edges = trd_edge_index_dict(edge_index_dict, time_dict, directed=False)
+    out_edges = trd_edge_index_dict({(d, r, s): e.flip(0) for (s, r, d), e in edge_index_dict.items()},
+                                    time_dict, directed=False)
+    columns, names = [], []
+    for edge_type in edge_index_dict:
+        src_type, rel, dst_type = edge_type
+        tag = f'{src_type}_{rel}_{dst_type}'
+        if dst_type == target_type:
+            edge_index = in_edges[edge_type]
+            deg = torch.bincount(edge_index[1], minlength=num_targets).float()
+            columns.append(torch.log1p(deg)[:, None])
+            names.append(f'log_in_deg[{tag}]')
+            if mean_features:
+                x_src = x_dict[src_type]
+                total = torch.zeros(num_targets, x_src.shape[1]).index_add_(0, edge_index[1], x_src[edge_index[0]])
+                columns.append(total / deg.clamp(min=1)[:, None])
+                names.extend(f'mean_in[{tag}][{i}]' for i in range(x_src.shape[1]))
+        if src_type == target_type:
+            deg = torch.bincount(out_edges[dst_type, rel, src_type][1], minlength=num_targets).float()
+            columns.append(torch.log1p(deg)[:, None])
+            names.append(f'log_out_deg[{tag}]')
+    return torch.cat(columns, dim=1), names
+
+
+class MLPStudent(nn.Module):
+    """
+    MLP scorer over [transaction features, aggregates].
+
+    Input standardization is stored as buffers so the artifact is
+    self-contained.
+
+    Args:
+        in_dim: Input feature size
+        hidden_dim: Hidden layer size
+        num_layers: Number of hidden layers
+        dropout: Dropout rate
+    """
+
+    def __init__(self, in_dim: int, hidden_dim: int = 128, num_layers: int = 2, dropout: float = 0.2):
+        super().__init__()
+        self.config = {'in_dim': in_dim, 'hidden_dim': hidden_dim, 'num_layers': num_layers, 'dropout': dropout}
+        self.register_buffer('mean', torch.zeros(in_dim))
+        self.register_buffer('std', torch.ones(in_dim))
+
+        layers, dim = [], in_dim
+        for _ in range(num_layers):
+            layers += [nn.Linear(dim, hidden_dim), nn.ReLU(), nn.Dropout(dropout)]
+            dim = hidden_dim
+        layers.append(nn.Linear(dim, 1))
+        self.mlp = nn.Sequential(*layers)
+
+    def set_normalization(self, features: torch.Tensor):
+        """Fit standardization on (training) features."""
+        self.mean.copy_(features.mean(dim=0))
+        self.std.copy_(features.std(dim=0).clamp(min=1e-6))
+
+    def forward(self, features: torch.Tensor) -> torch.Tensor:
+        """Fraud logits [N]."""
+        return self.mlp((features - self.mean) / self.std).squeeze(-1)
+
+
+def distill(
+    student: MLPStudent,
+    features: torch.Tensor,
+    teacher_logits: torch.Tensor,
+    y: torch.Tensor,
+    train_mask: torch.Tensor,
+    val_mask: torch.Tensor,
+    temperature: float = 2.0,
+    alpha: float = 0.7,
+    pos_weight: float = 10.0,
+    lr: float = 0.001,
+    weight_decay: float = 1e-5,
+    batch_size: int = 4096,
+    max_epochs: int = 100,
+    patience: int = 15,
+    seed: int = 42
+) -> dict:
+    """
+    Train the student on teacher soft labels and hard labels.
+
+    Loss = alpha * T^2 * BCE(s / T, sigmoid(t / T))            (all train rows)
+         + (1 - alpha) * BCE_pos_weight(s, y)                  (labeled train rows)
+
+    Args:
+        student: Student model (normalization is fit on train rows)
+        features: [N, D] student inputs
+        teacher_logits: [N] teacher logits
+        y: [N] labels (1=fraud, 0=legit, -1=unknown)
+        train_mask: [N] rows used for distillation
+        val_mask: [N] rows for early stopping (val PR-AUC on labeled rows)
+        temperature: Softening temperature T
+        alpha: Weight of the soft-label term
+
+    Returns:
+        Dict with best_val_pr_auc, best_epoch and per-epoch history
+    """
+    generator = torch.Generator().manual_seed(seed)
+    train_idx = train_mask.nonzero().view(-1)
+    val_idx = (val_mask & (y >= 0)).nonzero().view(-1)
+    y_val = y[val_idx]
+    soft_targets = torch.sigmoid(teacher_logits / temperature)
+
+    student.set_normalization(features[train_idx])
+    optimizer = torch.optim.Adam(student.parameters(), lr=lr, weight_decay=weight_decay)
+    weight = torch.tensor(pos_weight)
+
+    best_val_pr_auc, best_epoch, patience_counter = 0.0, 0, 0
+    best_state = {k: v.clone() for k, v in student.state_dict().items()}
+    history = {'train_loss': [], 'val_pr_auc': []}
+
+    for epoch in range(max_epochs):
+        student.train()
+        perm = train_idx[torch.randperm(train_idx.numel(), generator=generator)]
+        total_loss = 0.0
+        for batch in perm.split(batch_size):
+            optimizer.zero_grad()
+            logits = student(features[batch])
+            loss = alpha * temperature ** 2 * F.binary_cross_entropy_with_logits(
+                logits / temperature, soft_targets[batch])
+            labeled = y[batch] >= 0
+            if labeled.any():
+                loss = loss + (1 - alpha) * F.binary_cross_entropy_with_logits(
+                    logits[labeled], y[batch][labeled].float(), pos_weight=weight)
+            loss.backward()
+            optimizer.step()
+            total_loss += loss.item() * batch.numel()
+
+        student.eval()
+        with torch.no_grad():
+            val_pr_auc = pr_auc(y_val, torch.sigmoid(student(features[val_idx])))
+
+        history['train_loss'].append(total_loss / max(train_idx.numel(), 1))
+        history['val_pr_auc'].append(val_pr_auc)
+
+        if val_pr_auc > best_val_pr_auc:
+            best_val_pr_auc, best_epoch, patience_counter = val_pr_auc, epoch, 0
+            best_state = {k: v.clone() for k, v in student.state_dict().items()}
+        else:
+            patience_counter += 1
+
+        if (epoch + 1) % 10 == 0:
+            print(f"Epoch {epoch+1:3d} | Loss: {history['train_loss'][-1]:.4f} | "
+                  f"Val PR-AUC: {val_pr_auc:.4f} | Best: {best_val_pr_auc:.4f}")
+
+        if patience_counter >= patience:
+            print(f"Early stopping at epoch {epoch+1}")
+            break
+
+    student.load_state_dict(best_state)
+    student.eval()
+    return {'best_val_pr_auc': best_val_pr_auc, 'best_epoch': best_epoch, 'history': history}
+
+
+def save_student(
+    student: MLPStudent,
+    aggregates: torch.Tensor,
+    output_dir: PathLike,
+    feature_names: Optional[List[str]] = None,
+    meta: Optional[dict] = None
+) -> Path:
+    """
+    Write the student scoring artifact.
+
+    Args:
+        student: Trained student
+        aggregates: [N_tx, D_agg] precomputed aggregates of indexed transactions
+        output_dir: Artifact directory
+        feature_names: Aggregate column names (stored in meta.json)
+        meta: Extra metadata (teacher, report, ...)
+
+    Returns:
+        Artifact directory
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    torch.save({'config': student.config, 'state_dict': student.state_dict()}, output_dir / 'student.pt')
+    np.save(output_dir / 'aggregates.npy', aggregates.numpy().astype(np.float32))
+    with open(output_dir / 'meta.json', 'w') as f:
+        json.dump({'aggregate_names': feature_names or [], **(meta or {})}, f, indent=2)
+    print(f" Saved student artifact: {output_dir}")
+    return output_dir
+
+
+class StudentScorer:
+    """
+    Graph-free scorer loaded from a student artifact.
+
+    Indexed transactions are scored from their stored aggregates; new
+    transactions pass raw features plus aggregates from the feature pipeline.
+    """
+
+    def __init__(self, artifact_dir: PathLike):
+        artifact_dir = Path(artifact_dir)
+        checkpoint = torch.load(artifact_dir / 'student.pt', map_location='cpu', weights_only=False)
+        self.student = MLPStudent(**checkpoint['config'])
+        self.student.load_state_dict(checkpoint['state_dict'])
+        self.student.eval()
+        self.aggregates = np.load(artifact_dir / 'aggregates.npy', mmap_mode='r')
+
+    @torch.no_grad()
+    def score(self, x: torch.Tensor, tx_ids: Optional[torch.Tensor] = None,
+              aggregates: Optional[torch.Tensor] = None) -> torch.Tensor:
+        """
+        Fraud probabilities for a batch of transactions.
+
+        Args:
+            x: [B, F] raw transaction features
+            tx_ids: [B] ids of indexed transactions (aggregates looked up)
+            aggregates: [B, D_agg] aggregates for new transactions (instead of tx_ids)
+        """
+        if aggregates is None:
+            aggregates = torch.from_numpy(self.aggregates[np.asarray(tx_ids)])
+        return torch.sigmoid(self.student(torch.cat([x, aggregates], dim=1)))
@@ -0,0 +1,143 @@
+"""
+Data-Parallel Multi-Process CPU Training (torch.distributed, gloo)
+
+One process per rank, each with a slice of the cores. Every rank:
+- maps the shared graph and TRD adjacency index from disk (no copies),
+- trains on a disjoint shard of the labeled train transactions,
+- samples its own TRD neighbor mini-batches,
+- all-reduces gradients every step through DistributedDataParallel.
+
+Rank 0 evaluates val PR-AUC on the full graph after each epoch and
+writes the result file.
+"""
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional, Union
+
+import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
+from torch.nn.parallel import DistributedDataParallel
+
+from src.data.adjacency import HeteroAdjacency
+from src.models.hhgtn import ALL_EDGE_TYPES
+
+
+PathLike = Union[str, Path]
+
+
+def shard_targets(targets: torch.Tensor, rank: int, world_size: int, seed: int = 42) -> torch.Tensor:
+    """
+    Disjoint, equally sized shard of `targets` for one rank.
+
+    Targets are permuted once with a seed shared by all ranks and truncated
+    to a multiple of world_size, so every rank runs the same number of steps.
+    """
+    perm = targets[torch.randperm(targets.numel(), generator=torch.Generator().manual_seed(seed))]
+    usable = perm.numel() - perm.numel() % world_size
+    return perm[:usable][rank::world_size]
+
+
+def _train_rank(rank: int, world_size: int, config: dict, graph_path: str, adjacency_path: str,
+                init_file: str, result_path: str, threads: int):
+    from src.models.trainer import trainer_from_config
+    from src.utils.sweep import load_shared_graph
+
+    dist.init_process_group('gloo', init_method=f'file://{init_file}', rank=rank, world_size=world_size)
+    torch.set_num_threads(threads)
+    try:
+        adjacency = HeteroAdjacency.load(adjacency_path)
+        # Full-graph evaluation uses the same TRD message edges as training
+        graph = {**load_shared_graph(graph_path), 'edge_index_dict': adjacency.to_edge_index_dict()}
+        used = {tuple(et) for et in config.get('edge_types', ALL_EDGE_TYPES)}
+        # Same seed on every rank -> same initial weights (DDP also broadcasts rank 0's)
+        trainer = trainer_from_config(config, graph)
+        model = DistributedDataParallel(trainer.model, find_unused_parameters=True)
+        optimizer = trainer.optimizer
+        criterion = trainer.criterion
+
+        y, x_dict = graph['y'], graph['x_dict']
+        shard = shard_targets(trainer.masks['train'].nonzero().view(-1), rank, world_size, config.get('seed', 42))
+        batch_size, fanouts = config.get('batch_size', 1024), config.get('fanouts', [10, 10])
+        generator = torch.Generator().manual_seed(config.get('seed', 42) + rank)
+
+        history = {'epoch_seconds': [], 'train_loss': [], 'val_pr_auc': []}
+        for epoch in range(config.get('epochs', 5)):
+            model.train()
+            order = shard[torch.randperm(shard.numel(), generator=generator)]
+            losses = []
+            dist.barrier()
+            start = time.perf_counter()
+            for batch in order.split(batch_size):
+                nodes, edge_index_dict = adjacency.sample({'transaction': batch}, fanouts, generator)
+                edge_index_dict = {et: e if et in used else e[:, :0] for et, e in edge_index_dict.items()}
+                local = torch.searchsorted(nodes['transaction'], batch)
+                optimizer.zero_grad()
+                logits = model({t: x_dict[t][idx] for t, idx in nodes.items()}, edge_index_dict)[local]
+                loss = criterion(logits, y[batch].float())
+                loss.backward()  # gradient all-reduce happens here
+                optimizer.step()
+                losses.append(loss.item())
+            dist.barrier()
+            history['epoch_seconds'].append(time.perf_counter() - start)
+            history['train_loss'].append(sum(losses) / max(len(losses), 1))
+
+            if rank == 0:
+                val_pr_auc = trainer.val_pr_auc()
+                history['val_pr_auc'].append(val_pr_auc)
+                print(f"Epoch {epoch+1:3d} | Loss: {history['train_loss'][-1]:.4f} | "
+                      f"Val PR-AUC: {val_pr_auc:.4f} | {history['epoch_seconds'][-1]:.2f}s")
+            dist.barrier()
+
+        checksum = torch.stack([p.detach().double().sum() for p in trainer.model.parameters()]).sum()
+        checksums = [torch.zeros(1, dtype=torch.float64) for _ in range(world_size)]
+        dist.all_gather(checksums, checksum.view(1))
+
+        if rank == 0:
+            with open(result_path, 'w') as f:
+                json.dump({
+                    'world_size': world_size,
+                    'threads_per_rank': threads,
+                    'targets_per_epoch': int(shard.numel() * world_size),
+                    'param_checksums': [float(c) for c in checksums],
+                    'history': history
+                }, f, indent=2)
+            torch.save(trainer.model.state_dict(), Path(result_path).with_suffix('.pt'))
+    finally:
+        dist.destroy_process_group()
+
+
+def train_data_parallel(
+    config: dict,
+    graph_path: PathLike,
+    adjacency_path: PathLike,
+    world_size: int,
+    threads_per_rank: Optional[int] = None,
+    result_path: Optional[PathLike] = None
+) -> dict:
+    """
+    Launch `world_size` gloo ranks on this machine and train one config.
+
+    Args:
+        config: Model/trainer config (see `trainer_from_config`) plus
+            epochs, batch_size, fanouts (per hop)
+        graph_path: File written by `sweep.share_graph`
+        adjacency_path: TRD `HeteroAdjacency` saved with `.save()`
+        world_size: Number of processes
+        threads_per_rank: Intra-op threads per rank (default: #cores // world_size)
+        result_path: JSON result file (weights go next to it as .pt)
+
+    Returns:
+        Result dict written by rank 0 (history, per-epoch seconds, checksums)
+    """
+    threads = threads_per_rank or max(1, (os.cpu_count() or 1) // world_size)
+    with tempfile.TemporaryDirectory() as tmp:
+        init_file = os.path.join(tmp, 'rendezvous')
+        result_path = str(result_path or os.path.join(tmp, 'result.json'))
+        mp.spawn(_train_rank, nprocs=world_size, join=True,
+                 args=(world_size, config, str(graph_path), str(adjacency_path), init_file, result_path, threads))
+        with open(result_path) as f:
+            return json.load(f)
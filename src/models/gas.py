@@ -0,0 +1,269 @@
+"""
+Historical-Embedding (GNNAutoScale-style) Training for Hetero Models
+
+Full-graph training of `SimplifiedHHGTN` / `E7_A3_Model` with all 823K
+addresses does not fit in CPU memory, while neighbor sampling drops most of
+an address hub's neighbors. Here every mini-batch keeps *all* 1-hop
+in-neighbors: in-batch nodes are computed exactly, out-of-batch (halo)
+nodes are filled in from per-layer historical embeddings, and fresh values
+are pushed back after each step.
+
+Models must expose `encode`, `propagate(layer, ...)`, `num_layers`,
+`hidden_dim` and `classifier` (see `src.models.hhgtn`).
+"""
+import numpy as np
+import torch
+import torch.nn as nn
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from src.data.adjacency import build_csr, gather_rows, relabel
+from src.models.hhgtn import EdgeType
+from src.utils.metrics import pr_auc
+
+
+class HistoryBuffer:
+    """
+    Per-node-type, per-layer embedding history.
+
+    Backed by `.npy` memory maps when `path` is given, so only the rows
+    touched by a batch are paged into RAM.
+
+    Args:
+        num_nodes: {node_type: N}
+        dim: Embedding size
+        num_layers: Number of intermediate layers to keep
+        path: Directory for memory-mapped buffers (None = in memory)
+    """
+
+    def __init__(self, num_nodes: Dict[str, int], dim: int, num_layers: int,
+                 path: Optional[Union[str, Path]] = None):
+        self.num_layers = num_layers
+        self.buffers = {}
+        if path is not None:
+            path = Path(path)
+            path.mkdir(parents=True, exist_ok=True)
+        for node_type, n in num_nodes.items():
+            for layer in range(num_layers):
+                if path is None:
+                    buf = np.zeros((n, dim), dtype=np.float32)
+                else:
+                    buf = np.lib.format.open_memmap(
+                        path / f'{node_type}_layer{layer}.npy', mode='w+',
+                        dtype=np.float32, shape=(n, dim)
+                    )
+                self.buffers[(node_type, layer)] = buf
+
+    def pull(self, node_type: str, layer: int, idx: torch.Tensor) -> torch.Tensor:
+        """Historical embeddings of `idx` at `layer`."""
+        return torch.from_numpy(self.buffers[(node_type, layer)][idx.numpy()])
+
+    def push(self, node_type: str, layer: int, idx: torch.Tensor, values: torch.Tensor):
+        """Overwrite history of `idx` at `layer` with fresh (detached) values."""
+        self.buffers[(node_type, layer)][idx.numpy()] = values.detach().cpu().numpy()
+
+
+class GASTrainer:
+    """
+    Mini-batch trainer with historical embeddings for out-of-batch nodes.
+
+    Nodes of every type are split into `num_parts` batches per epoch, so
+    every history row is refreshed once per epoch.
+
+    Args:
+        model: Hetero model with the layer-wise interface
+        x_dict: {node_type: [N, F]} features
+        edge_index_dict: {edge_type: [2, E]} relations
+        y: [N_tx] labels (1=fraud, 0=legit, -1=unknown)
+        train_mask: [N_tx] bool mask of supervised targets
+        num_parts: Batches per epoch
+        history_dir: Directory for memory-mapped history (None = in memory)
+        lr: Adam learning rate
+        weight_decay: Adam weight decay
+        pos_weight: BCE positive-class weight (class imbalance)
+        target_type: Node type that is classified
+        seed: Seed for batch shuffling
+    """
+
+    def __init__(
+        self,
+        model: nn.Module,
+        x_dict: Dict[str, torch.Tensor],
+        edge_index_dict: Dict[EdgeType, torch.Tensor],
+        y: torch.Tensor,
+        train_mask: torch.Tensor,
+        num_parts: int = 32,
+        history_dir: Optional[Union[str, Path]] = None,
+        lr: float = 0.001,
+        weight_decay: float = 1e-5,
+        pos_weight: float = 10.0,
+        target_type: str = 'transaction',
+        seed: int = 42
+    ):
+        self.model = model
+        self.x_dict = x_dict
+        self.y = y
+        self.train_mask = train_mask
+        self.num_parts = num_parts
+        self.target_type = target_type
+        self.rng = np.random.default_rng(seed)
+        self.num_nodes = {t: x.shape[0] for t, x in x_dict.items()}
+
+        # In-adjacency (dst -> src) per relation
+        self.in_adj = {}
+        for edge_type, edge_index in edge_index_dict.items():
+            ptr, src, _ = build_csr(edge_index[1], edge_index[0], self.num_nodes[edge_type[2]])
+            self.in_adj[edge_type] = (ptr, src)
+
+        self.history = HistoryBuffer(
+            self.num_nodes, model.hidden_dim, model.num_layers - 1, history_dir
+        )
+        self.optimizer = torch.optim.Adam(model.parameters(), lr=lr, weight_decay=weight_decay)
+        self.criterion = nn.BCEWithLogitsLoss(pos_weight=torch.tensor([pos_weight]))
+
+    def partitions(self, shuffle: bool = True) -> List[Dict[str, torch.Tensor]]:
+        """Split every node type into `num_parts` sorted index batches."""
+        chunks = {}
+        for t, n in self.num_nodes.items():
+            order = self.rng.permutation(n) if shuffle else np.arange(n)
+            chunks[t] = np.array_split(order, self.num_parts)
+        return [
+            {t: torch.from_numpy(np.sort(chunks[t][i])).long() for t in self.num_nodes}
+            for i in range(self.num_parts)
+        ]
+
+    def subgraph(self, batch: Dict[str, torch.Tensor]):
+        """
+        Batch nodes plus their full 1-hop in-neighborhood (halo).
+
+        Returns:
+            nodes: {node_type: sorted global ids (batch + halo)}
+            edges: {edge_type: [2, k] local in-edges of batch nodes}
+            in_batch: {node_type: bool mask over `nodes`}
+        """
+        in_edges = {et: gather_rows(ptr, src, batch[et[2]]) for et, (ptr, src) in self.in_adj.items()}
+
+        nodes = {}
+        for t in self.num_nodes:
+            parts = [batch[t]] + [e[1] for et, e in in_edges.items() if et[0] == t]
+            nodes[t] = torch.cat(parts).unique()
+
+        edges = {}
+        for (src_type, rel, dst_type), (dst, src) in in_edges.items():
+            edges[(src_type, rel, dst_type)] = torch.stack([
+                relabel(nodes[src_type], src)[0], relabel(nodes[dst_type], dst)[0]
+            ])
+
+        in_batch = {t: relabel(batch[t], nodes[t])[1] for t in self.num_nodes}
+        return nodes, edges, in_batch
+
+    def _mix_history(self, layer: int, h_dict, nodes, in_batch):
+        """Push fresh in-batch rows; replace halo rows with history."""
+        mixed = {}
+        for t, h in h_dict.items():
+            mask = in_batch[t]
+            self.history.push(t, layer, nodes[t][mask], h[mask])
+            stale = h.new_zeros(h.shape)
+            stale[~mask] = self.history.pull(t, layer, nodes[t][~mask])
+            mixed[t] = torch.where(mask.unsqueeze(-1), h, stale)
+        return mixed
+
+    def train_epoch(self) -> float:
+        """One pass over all batches; returns mean training loss."""
+        self.model.train()
+        losses = []
+        tx = self.target_type
+
+        for batch in self.partitions(shuffle=True):
+            nodes, edges, in_batch = self.subgraph(batch)
+
+            h = self.model.encode({t: self.x_dict[t][idx] for t, idx in nodes.items()})
+            for layer in range(self.model.num_layers):
+                h = self.model.propagate(layer, h, edges)
+                if layer < self.model.num_layers - 1:
+                    h = self._mix_history(layer, h, nodes, in_batch)
+
+            targets = in_batch[tx] & self.train_mask[nodes[tx]]
+            if not targets.any():
+                continue
+
+            self.optimizer.zero_grad()
+            logits = self.model.classifier(h[tx][targets]).squeeze(-1)
+            loss = self.criterion(logits, self.y[nodes[tx][targets]].float())
+            loss.backward()
+            self.optimizer.step()
+            losses.append(loss.item())
+
+        return float(np.mean(losses)) if losses else 0.0
+
+    @torch.no_grad()
+    def predict(self) -> torch.Tensor:
+        """
+        Exact full-graph probabilities via layer-wise batched inference.
+
+        Each layer is computed for all batches before the next starts, so
+        halo inputs are current rather than historical. Also refreshes the
+        history buffers.
+        """
+        self.model.eval()
+        tx = self.target_type
+        probs = torch.zeros(self.num_nodes[tx])
+        parts = self.partitions(shuffle=False)
+
+        for layer in range(self.model.num_layers):
+            for batch in parts:
+                nodes, edges, in_batch = self.subgraph(batch)
+                if layer == 0:
+                    h = self.model.encode({t: self.x_dict[t][idx] for t, idx in nodes.items()})
+                else:
+                    h = {t: self.history.pull(t, layer - 1, idx) for t, idx in nodes.items()
+                         if (t, layer - 1) in self.history.buffers}
+                h = self.model.propagate(layer, h, edges)
+
+                if layer < self.model.num_layers - 1:
+                    for t, emb in h.items():
+                        self.history.push(t, layer, nodes[t][in_batch[t]], emb[in_batch[t]])
+                else:
+                    mask = in_batch[tx]
+                    logits = self.model.classifier(h[tx][mask]).squeeze(-1)
+                    probs[nodes[tx][mask]] = torch.sigmoid(logits)
+
+        return probs
+
+    def fit(self, val_mask: torch.Tensor, max_epochs: int = 100, patience: int = 15) -> dict:
+        """
+        Train with early stopping on val PR-AUC (best weights restored).
+
+        Returns:
+            Dict with best_val_pr_auc, best_epoch and per-epoch history
+        """
+        # Warm-up: fill histories with current embeddings before training
+        self.predict()
+
+        y_val = self.y[val_mask]
+        best_val_pr_auc, best_epoch, patience_counter = 0.0, 0, 0
+        best_state = {k: v.clone() for k, v in self.model.state_dict().items()}
+        history = {'train_loss': [], 'val_pr_auc': []}
+
+        for epoch in range(max_epochs):
+            loss = self.train_epoch()
+            val_pr_auc = pr_auc(y_val, self.predict()[val_mask])
+
+            history['train_loss'].append(loss)
+            history['val_pr_auc'].append(val_pr_auc)
+
+            if val_pr_auc > best_val_pr_auc:
+                best_val_pr_auc, best_epoch, patience_counter = val_pr_auc, epoch, 0
+                best_state = {k: v.clone() for k, v in self.model.state_dict().items()}
+            else:
+                patience_counter += 1
+
+            if (epoch + 1) % 10 == 0:
+                print(f"Epoch {epoch+1:3d} | Loss: {loss:.4f} | Val PR-AUC: {val_pr_auc:.4f} | Best: {best_val_pr_auc:.4f}")
+
+            if patience_counter >= patience:
+                print(f"Early stopping at epoch {epoch+1}")
+                break
+
+        self.model.load_state_dict(best_state)
+        return {'best_val_pr_auc': best_val_pr_auc, 'best_epoch': best_epoch, 'history': history}
@@ -0,0 +1,321 @@
+"""
+Heterogeneous GNN models for the Elliptic++ transaction/address graph.
+
+Packaged versions of the models trained in the E6/E7 notebooks so that
+checkpoints can be reloaded outside Kaggle (fusion, scoring, benchmarks).
+"""
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+from pathlib import Path
+from typing import Dict, Tuple, Union
+from torch_geometric.nn import HeteroConv, SAGEConv, Linear
+
+from src.data.co_address import CO_ADDRESS
+
+
+EdgeType = Tuple[str, str, str]
+
+TX_TX = ('transaction', 'to', 'transaction')
+ADDR_TX = ('address', 'to', 'transaction')
+TX_ADDR = ('transaction', 'to', 'address')
+ADDR_ADDR = ('address', 'to', 'address')
+
+ALL_EDGE_TYPES = [TX_TX, ADDR_TX, TX_ADDR, ADDR_ADDR]
+
+# Derived relations a model can opt into via `edge_types_to_use`
+EXTRA_EDGE_TYPES = [CO_ADDRESS]
+
+
+class SimplifiedHHGTN(nn.Module):
+    """
+    Simplified heterogeneous GNN for ablation studies (E7 A1/A2/A3).
+
+    Args:
+        tx_in_dim: Transaction feature size
+        addr_in_dim: Address feature size
+        hidden_dim: Hidden size of projections and convolutions
+        edge_types_to_use: Relations kept for message passing (may include
+            EXTRA_EDGE_TYPES, e.g. the precomputed co-address relation)
+        dropout: Dropout after each convolution
+    """
+
+    num_layers = 2
+
+    def __init__(self, tx_in_dim, addr_in_dim, hidden_dim, edge_types_to_use, dropout=0.3):
+        super().__init__()
+
+        self.edge_types_to_use = edge_types_to_use
+        self.hidden_dim = hidden_dim
+
+        # Input projections
+        self.tx_proj = nn.Linear(tx_in_dim, hidden_dim)
+        self.addr_proj = nn.Linear(addr_in_dim, hidden_dim)
+
+        # Build convolution layers based on edge types
+        conv_dict = {}
+        for edge_type in ALL_EDGE_TYPES + EXTRA_EDGE_TYPES:
+            if edge_type in edge_types_to_use:
+                conv_dict[edge_type] = SAGEConv(hidden_dim, hidden_dim)
+
+        self.conv1 = HeteroConv(conv_dict, aggr='sum')
+        self.conv2 = HeteroConv(conv_dict, aggr='sum')
+
+        # Classifier for transactions
+        self.classifier = nn.Sequential(
+            nn.Linear(hidden_dim, hidden_dim // 2),
+            nn.ReLU(),
+            nn.Dropout(dropout),
+            nn.Linear(hidden_dim // 2, 1)
+        )
+
+        self.dropout = dropout
+
+    def encode(self, x_dict):
+        """Project raw node features (layer 0)."""
+        projs = {'transaction': self.tx_proj, 'address': self.addr_proj}
+        return {key: F.relu(projs[key](x)) for key, x in x_dict.items()}
+
+    def propagate(self, layer: int, x_dict, edge_index_dict):
+        """Run message-passing layer `layer` (0-based)."""
+        filtered_edges = {k: v for k, v in edge_index_dict.items() if k in self.edge_types_to_use}
+        conv = (self.conv1, self.conv2)[layer]
+        x_dict = conv(x_dict, filtered_edges)
+        return {key: F.dropout(F.relu(x), p=self.dropout, training=self.training)
+                for key, x in x_dict.items()}
+
+    def get_embeddings(self, x_dict, edge_index_dict):
+        x_dict = self.encode(x_dict)
+        for layer in range(self.num_layers):
+            x_dict = self.propagate(layer, x_dict, edge_index_dict)
+        return x_dict
+
+    def forward(self, x_dict, edge_index_dict):
+        x_dict = self.get_embeddings(x_dict, edge_index_dict)
+
+        # Classify transactions
+        logits = self.classifier(x_dict['transaction'])
+
+        return logits.squeeze(-1)
+
+
+class E7_A3_Model(nn.Module):
+    """
+    E7-A3 model (all four relations, single HeteroConv layer).
+
+    Architecture matches the `a3_best.pt` checkpoint used by E9 fusion.
+
+    Args:
+        hidden_dim: Embedding size (64 for the released checkpoint)
+        dropout: Dropout applied after message passing
+        tx_in_dim: Transaction feature size (Local AF1-AF93)
+        addr_in_dim: Address feature size
+    """
+
+    num_layers = 1
+
+    def __init__(self, hidden_dim: int = 64, dropout: float = 0.4,
+                 tx_in_dim: int = 93, addr_in_dim: int = 55):
+        super().__init__()
+
+        # Input projections (ModuleDict)
+        self.input_projs = nn.ModuleDict({
+            'transaction': nn.Linear(tx_in_dim, hidden_dim),
+            'address': nn.Linear(addr_in_dim, hidden_dim)
+        })
+
+        # Single HeteroConv layer over all relations
+        self.convs = HeteroConv({
+            edge_type: SAGEConv(hidden_dim, hidden_dim)
+            for edge_type in ALL_EDGE_TYPES
+        }, aggr='sum')
+
+        # Attention layer (kept for checkpoint compatibility)
+        self.attn = nn.Linear(hidden_dim, 1)
+
+        # Binary classifier (1 output for sigmoid)
+        self.classifier = nn.Linear(hidden_dim, 1)
+
+        self.hidden_dim = hidden_dim
+        self.dropout = dropout
+
+    def encode(self, x_dict):
+        """Project raw node features (layer 0)."""
+        return {key: self.input_projs[key](x) for key, x in x_dict.items()}
+
+    def propagate(self, layer: int, x_dict, edge_index_dict):
+        """Run the (single) message-passing layer."""
+        x_dict = self.convs(x_dict, edge_index_dict)
+        return {key: F.dropout(F.relu(x), p=self.dropout, training=self.training)
+                for key, x in x_dict.items()}
+
+    def get_embeddings(self, x_dict, edge_index_dict):
+        """Extract embeddings before classification."""
+        return self.propagate(0, self.encode(x_dict), edge_index_dict)
+
+    def forward(self, x_dict, edge_index_dict):
+        embeddings = self.get_embeddings(x_dict, edge_index_dict)
+        return self.classifier(embeddings['transaction']).squeeze(-1)
+
+
+class TRD_HHGTN(nn.Module):
+    """
+    Temporal Heterogeneous Graph Transformer Network (E6).
+
+    Features:
+    - Per-node-type input projections
+    - Per-relation message passing (HeteroConv)
+    - Semantic attention across relations (defined, not applied in forward
+      unless `apply_semantic_attention`; kept so E6 checkpoints load
+      unchanged). See `SegmentHHGTN` for a lightweight replacement.
+    - Transaction-level binary classification
+
+    Args:
+        metadata: (node_types, edge_types) as returned by HeteroData.metadata()
+        hidden_dim: Hidden size
+        num_layers: Number of HeteroConv layers
+        dropout: Dropout rate
+        num_heads: Heads of the semantic attention block
+        apply_semantic_attention: Run the attention block over the stacked
+            per-relation outputs of every node (mean over relations)
+            instead of summing them
+    """
+
+    def __init__(self, metadata, hidden_dim=128, num_layers=2, dropout=0.3, num_heads=4,
+                 apply_semantic_attention=False):
+        super().__init__()
+
+        self.metadata = metadata
+        self.hidden_dim = hidden_dim
+        self.num_layers = num_layers
+        self.dropout = dropout
+        self.apply_semantic_attention = apply_semantic_attention
+
+        # Node type feature dimensions (from HeteroData)
+        self.node_dims = {
+            'transaction': 93,  # Local features
+            'address': 55       # Address features
+        }
+
+        # Input projections (per node type)
+        self.input_projections = nn.ModuleDict({
+            node_type: Linear(self.node_dims[node_type], hidden_dim)
+            for node_type in ['transaction', 'address']
+        })
+
+        # Heterogeneous convolution layers
+        self.convs = nn.ModuleList()
+        for _ in range(num_layers):
+            conv = HeteroConv({
+                edge_type: SAGEConv(hidden_dim, hidden_dim)
+                for edge_type in metadata[1]  # All edge types
+            }, aggr=None if apply_semantic_attention else 'sum')  # Stack or sum across relations
+            self.convs.append(conv)
+
+        # Semantic attention (attention across edge types)
+        self.semantic_attention = nn.MultiheadAttention(
+            embed_dim=hidden_dim,
+            num_heads=num_heads,
+            dropout=dropout,
+            batch_first=True
+        )
+
+        # Transaction classification head
+        self.classifier = nn.Sequential(
+            Linear(hidden_dim, hidden_dim // 2),
+            nn.ReLU(),
+            nn.Dropout(dropout),
+            Linear(hidden_dim // 2, 1)
+        )
+
+        self.dropout_layer = nn.Dropout(dropout)
+
+    def encode(self, x_dict):
+        """Project input features per node type (layer 0)."""
+        return {
+            node_type: self.input_projections[node_type](x)
+            for node_type, x in x_dict.items()
+        }
+
+    def propagate(self, layer: int, h_dict, edge_index_dict):
+        """Run message-passing layer `layer` (0-based)."""
+        h_dict = self.convs[layer](h_dict, edge_index_dict)
+        if self.apply_semantic_attention:
+            # [N, R, H] relation outputs -> attention across relations -> mean
+            h_dict = {key: self.semantic_attention(h, h, h, need_weights=False)[0].mean(dim=1)
+                      for key, h in h_dict.items()}
+        return {key: self.dropout_layer(F.relu(h)) for key, h in h_dict.items()}
+
+    def get_embeddings(self, x_dict, edge_index_dict):
+        """Get node embeddings without classification."""
+        h_dict = self.encode(x_dict)
+        for layer in range(self.num_layers):
+            h_dict = self.propagate(layer, h_dict, edge_index_dict)
+        return h_dict
+
+    def forward(self, x_dict, edge_index_dict):
+        """
+        Forward pass.
+
+        Args:
+            x_dict: Dict of node features {node_type: Tensor}
+            edge_index_dict: Dict of edge indices {edge_type: Tensor}
+
+        Returns:
+            logits: Transaction node predictions [N_tx]
+        """
+        h_tx = self.get_embeddings(x_dict, edge_index_dict)['transaction']
+        return self.classifier(h_tx).squeeze(-1)
+
+
+def build_model(name: str, **kwargs) -> nn.Module:
+    """
+    Instantiate a hetero model by name with the notebook defaults.
+
+    Args:
+        name: 'e7_a3', 'simplified_hhgtn', 'trd_hhgtn' or 'segment_hhgtn'
+        **kwargs: Overrides for the model constructor
+
+    Returns:
+        Untrained model
+    """
+    if name == 'e7_a3':
+        return E7_A3_Model(**{'hidden_dim': 64, 'dropout': 0.4, **kwargs})
+    if name == 'simplified_hhgtn':
+        return SimplifiedHHGTN(**{
+            'tx_in_dim': 93, 'addr_in_dim': 55, 'hidden_dim': 128,
+            'edge_types_to_use': ALL_EDGE_TYPES, 'dropout': 0.4, **kwargs
+        })
+    if name == 'trd_hhgtn':
+        return TRD_HHGTN(**{
+            'metadata': (['transaction', 'address'], ALL_EDGE_TYPES),
+            'hidden_dim': 128, 'num_layers': 2, 'dropout': 0.3, **kwargs
+        })
+    if name == 'segment_hhgtn':
+        from src.models.segment_hhgtn import SegmentHHGTN
+
+        return SegmentHHGTN(**{'hidden_dim': 128, 'num_layers': 2, 'dropout': 0.3, **kwargs})
+    raise ValueError(f"Unknown model: {name}")
+
+
+def load_checkpoint(model: nn.Module, path: Union[str, Path],
+                    map_location: Union[str, torch.device] = 'cpu') -> nn.Module:
+    """
+    Load a training checkpoint into `model` and switch it to eval mode.
+
+    Accepts both raw state dicts (E7 `a*_best.pt`) and the
+    `{'model_state_dict': ...}` dicts written by the E3/E6 notebooks.
+
+    Args:
+        model: Model instance with a matching architecture
+        path: Checkpoint file
+        map_location: Device to load tensors onto
+
+    Returns:
+        The model, in eval mode
+    """
+    checkpoint = torch.load(path, map_location=map_location, weights_only=False)
+    state_dict = checkpoint.get('model_state_dict', checkpoint)
+    model.load_state_dict(state_dict)
+    model.eval()
+    return model
@@ -0,0 +1,277 @@
+"""
+Incremental GNN Rescoring for New Time Steps
+
+When a new block of transactions lands at time t+1, the TRD rule guarantees
+that no existing node's valid neighborhood gains future nodes. Only the
+nodes reached by new messages need fresh embeddings; everything else is
+served from the embedding cache. Recompute cost therefore scales with the
+L-hop in-neighborhood of the delta, not with the graph.
+"""
+import numpy as np
+import torch
+from collections import defaultdict
+from typing import Dict, Optional, Tuple
+
+from src.data.adjacency import build_csr, gather_rows, relabel, trd_edge_index_dict
+from src.models.hhgtn import EdgeType
+
+
+class _RelationIndex:
+    """
+    Two-way adjacency of one relation with an append-only delta buffer.
+
+    New edges go to the delta and are merged into the CSR arrays only when
+    the delta grows past `compact_ratio` of the base, so per-step updates
+    cost O(delta) amortized.
+    """
+
+    def __init__(self, edge_index: torch.Tensor, num_src: int, num_dst: int,
+                 compact_ratio: float = 0.1):
+        self.num_src = num_src
+        self.num_dst = num_dst
+        self.compact_ratio = compact_ratio
+        self.delta = torch.zeros((2, 0), dtype=torch.long)
+        self._build(edge_index)
+
+    def _build(self, edge_index: torch.Tensor):
+        self.base = edge_index
+        self.in_ptr, self.in_src, _ = build_csr(edge_index[1], edge_index[0], self.num_dst)
+        self.out_ptr, self.out_dst, _ = build_csr(edge_index[0], edge_index[1], self.num_src)
+        self.delta = torch.zeros((2, 0), dtype=torch.long)
+
+    @property
+    def edge_index(self) -> torch.Tensor:
+        return torch.cat([self.base, self.delta], dim=1)
+
+    def add(self, edge_index: torch.Tensor, num_src: int, num_dst: int):
+        self.num_src, self.num_dst = num_src, num_dst
+        self.delta = torch.cat([self.delta, edge_index], dim=1)
+        if self.delta.shape[1] > self.compact_ratio * max(self.base.shape[1], 1):
+            self._build(self.edge_index)
+
+    def in_edges(self, dst_nodes: torch.Tensor) -> torch.Tensor:
+        """[2, k] message edges (src, dst) ending at `dst_nodes`."""
+        dst, src = gather_rows(self.in_ptr, self.in_src, dst_nodes)
+        in_delta = torch.isin(self.delta[1], dst_nodes)
+        return torch.cat([torch.stack([src, dst]), self.delta[:, in_delta]], dim=1)
+
+    def out_edges(self, src_nodes: torch.Tensor) -> torch.Tensor:
+        """[2, k] message edges (src, dst) starting at `src_nodes`."""
+        edges = gather_rows(self.out_ptr, self.out_dst, src_nodes)
+        in_delta = torch.isin(self.delta[0], src_nodes)
+        return torch.cat([edges, self.delta[:, in_delta]], dim=1)
+
+
+class IncrementalScorer:
+    """
+    Keeps full-graph embeddings/scores current as new time steps arrive.
+
+    The model must expose `get_embeddings(x_dict, edge_index_dict)` and a
+    `classifier` head over transaction embeddings (e.g. `E7_A3_Model`).
+    Supplied `embeddings` must have been computed on the same TRD message
+    graph (see `trd_edge_index_dict`); otherwise one full pass is run.
+
+    Args:
+        model: Trained hetero model
+        x_dict: {node_type: [N, F]} node features
+        edge_index_dict: {edge_type: [2, E]} raw relations
+        time_dict: {node_type: [N]} node timestamps
+        num_layers: Message-passing depth of the model
+        directed: TRD out-neighbor rule (see `TRDSampler`)
+        embeddings: Optional cached {node_type: [N, D]} (e.g. `EmbeddingStore.load`)
+        target_type: Node type that is scored
+    """
+
+    def __init__(
+        self,
+        model: torch.nn.Module,
+        x_dict: Dict[str, torch.Tensor],
+        edge_index_dict: Dict[EdgeType, torch.Tensor],
+        time_dict: Dict[str, torch.Tensor],
+        num_layers: int = 1,
+        directed: bool = True,
+        embeddings: Optional[Dict[str, torch.Tensor]] = None,
+        target_type: str = 'transaction'
+    ):
+        self.model = model.eval()
+        self.num_layers = num_layers
+        self.directed = directed
+        self.target_type = target_type
+
+        self.x_dict = {k: v.cpu() for k, v in x_dict.items()}
+        self.time_dict = {k: v.cpu() for k, v in time_dict.items()}
+        self.edge_types = list(edge_index_dict)
+
+        message_edges = trd_edge_index_dict(
+            {k: v.cpu() for k, v in edge_index_dict.items()}, self.time_dict, directed
+        )
+        self.relations = {
+            edge_type: _RelationIndex(
+                message_edges[edge_type],
+                self.num_nodes(edge_type[0]), self.num_nodes(edge_type[2])
+            )
+            for edge_type in self.edge_types
+        }
+
+        if embeddings is None:
+            self.refresh()
+        else:
+            self.embeddings = {
+                k: torch.as_tensor(np.asarray(v)).clone() for k, v in embeddings.items()
+            }
+            self.scores = self._score(self.embeddings[target_type])
+
+    def num_nodes(self, node_type: str) -> int:
+        return self.x_dict[node_type].shape[0]
+
+    @property
+    def message_edge_index_dict(self) -> Dict[EdgeType, torch.Tensor]:
+        return {k: rel.edge_index for k, rel in self.relations.items()}
+
+    @torch.no_grad()
+    def _score(self, h: torch.Tensor) -> torch.Tensor:
+        return torch.sigmoid(self.model.classifier(h).squeeze(-1))
+
+    @torch.no_grad()
+    def refresh(self):
+        """Recompute every embedding and score (full-graph pass)."""
+        embeddings = self.model.get_embeddings(self.x_dict, self.message_edge_index_dict)
+        self.embeddings = {k: v.cpu() for k, v in embeddings.items()}
+        self.scores = self._score(self.embeddings[self.target_type])
+
+    def affected_nodes(self, seeds: Dict[str, torch.Tensor]) -> Dict[str, torch.Tensor]:
+        """
+        Nodes whose embeddings change when `seeds` change.
+
+        Expands `num_layers` hops along message edges (src -> dst).
+        """
+        affected = {t: seeds.get(t, torch.zeros(0, dtype=torch.long)).unique()
+                    for t in self.x_dict}
+        frontier = dict(affected)
+        for _ in range(self.num_layers):
+            reached = defaultdict(list)
+            for (src_type, _, dst_type), rel in self.relations.items():
+                if frontier[src_type].numel():
+                    reached[dst_type].append(rel.out_edges(frontier[src_type])[1])
+            frontier = {}
+            for t in self.x_dict:
+                new = torch.cat(reached[t]).unique() if reached[t] else torch.zeros(0, dtype=torch.long)
+                new = new[~torch.isin(new, affected[t])]
+                frontier[t] = new
+                affected[t] = torch.cat([affected[t], new])
+        return affected
+
+    def receptive_field(self, nodes: Dict[str, torch.Tensor]) -> Dict[str, torch.Tensor]:
+        """`num_layers`-hop in-neighborhood closure of `nodes` (sorted)."""
+        closure = {t: nodes[t].unique() for t in self.x_dict}
+        frontier = dict(closure)
+        for _ in range(self.num_layers):
+            reached = defaultdict(list)
+            for (src_type, _, dst_type), rel in self.relations.items():
+                if frontier[dst_type].numel():
+                    reached[src_type].append(rel.in_edges(frontier[dst_type])[0])
+            frontier = {}
+            for t in self.x_dict:
+                new = torch.cat(reached[t]).unique() if reached[t] else torch.zeros(0, dtype=torch.long)
+                new = new[~torch.isin(new, closure[t])]
+                frontier[t] = new
+                closure[t] = torch.cat([closure[t], new]).sort().values
+        return closure
+
+    @torch.no_grad()
+    def recompute(self, nodes: Dict[str, torch.Tensor]) -> Tuple[Dict[str, torch.Tensor], Dict[str, torch.Tensor]]:
+        """
+        Exact embeddings for `nodes` from their induced receptive field.
+
+        All in-edges of nodes within `num_layers - 1` hops are inside the
+        closure, so outputs for `nodes` equal a full-graph pass.
+
+        Returns:
+            (embeddings of `nodes`, receptive field used)
+        """
+        closure = self.receptive_field(nodes)
+
+        x_sub = {t: self.x_dict[t][idx] for t, idx in closure.items()}
+        edges_sub = {}
+        for edge_type, rel in self.relations.items():
+            src_type, _, dst_type = edge_type
+            src, dst = rel.in_edges(closure[dst_type])
+            src_local, keep = relabel(closure[src_type], src)
+            dst_local, _ = relabel(closure[dst_type], dst)
+            edges_sub[edge_type] = torch.stack([src_local[keep], dst_local[keep]])
+
+        embeddings = self.model.get_embeddings(x_sub, edges_sub)
+        fresh = {
+            t: embeddings[t][relabel(closure[t], idx)[0]].cpu()
+            for t, idx in nodes.items() if idx.numel()
+        }
+        return fresh, closure
+
+    def add_time_step(
+        self,
+        new_x_dict: Dict[str, torch.Tensor],
+        new_time_dict: Dict[str, torch.Tensor],
+        new_edge_index_dict: Dict[EdgeType, torch.Tensor]
+    ) -> Dict[str, object]:
+        """
+        Ingest a new time step and rescore only the affected nodes.
+
+        New nodes are appended after the existing ones, so node i of
+        `new_x_dict[t]` gets global index `num_nodes(t) + i`. Edges in
+        `new_edge_index_dict` use global indices and may touch old nodes.
+
+        Args:
+            new_x_dict: {node_type: [n, F]} features of new nodes
+            new_time_dict: {node_type: [n]} timestamps of new nodes
+            new_edge_index_dict: {edge_type: [2, e]} new raw edges
+
+        Returns:
+            Dict with 'affected' ({node_type: global indices}),
+            'scores' (fresh probabilities of affected target nodes) and
+            'receptive_field' (closure size per node type)
+        """
+        seeds = {}
+        for t in self.x_dict:
+            new_x = new_x_dict.get(t)
+            if new_x is None or new_x.shape[0] == 0:
+                continue
+            start = self.num_nodes(t)
+            seeds[t] = torch.arange(start, start + new_x.shape[0])
+            self.x_dict[t] = torch.cat([self.x_dict[t], new_x.cpu()])
+            self.time_dict[t] = torch.cat([self.time_dict[t], new_time_dict[t].cpu()])
+
+        new_messages = trd_edge_index_dict(
+            {k: new_edge_index_dict.get(k, torch.zeros((2, 0), dtype=torch.long)).cpu()
+             for k in self.edge_types},
+            self.time_dict, self.directed
+        )
+        for edge_type, rel in self.relations.items():
+            edges = new_messages[edge_type]
+            rel.add(edges, self.num_nodes(edge_type[0]), self.num_nodes(edge_type[2]))
+            # Receivers of new messages change even if they are old nodes
+            dst_type = edge_type[2]
+            seeds[dst_type] = torch.cat([seeds.get(dst_type, torch.zeros(0, dtype=torch.long)), edges[1]])
+
+        affected = self.affected_nodes(seeds)
+        fresh, closure = self.recompute(affected)
+
+        for t, emb in self.embeddings.items():
+            grow = self.num_nodes(t) - emb.shape[0]
+            if grow > 0:
+                emb = torch.cat([emb, emb.new_zeros(grow, emb.shape[1])])
+            if t in fresh:
+                emb[affected[t]] = fresh[t]
+            self.embeddings[t] = emb
+
+        target_idx = affected[self.target_type]
+        grow = self.num_nodes(self.target_type) - self.scores.numel()
+        if grow > 0:
+            self.scores = torch.cat([self.scores, self.scores.new_zeros(grow)])
+        fresh_scores = self._score(self.embeddings[self.target_type][target_idx])
+        self.scores[target_idx] = fresh_scores
+
+        return {
+            'affected': affected,
+            'scores': fresh_scores,
+            'receptive_field': {t: int(v.numel()) for t, v in closure.items()}
+        }
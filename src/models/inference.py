@@ -0,0 +1,206 @@
+"""
+CPU-Optimized Inference for the Hetero Models
+
+Wraps `TRD_HHGTN`, `SimplifiedHHGTN` and `E7_A3_Model` for CPU scoring:
+- backend='trace':   TorchScript trace (removes per-relation Python dispatch)
+- backend='compile': torch.compile (inductor), dynamic shapes
+- backend='eager':   reference path
+Any backend can run under bf16 autocast when the CPU supports it.
+"""
+import time
+import warnings
+import numpy as np
+import torch
+import torch.nn as nn
+from typing import Dict, List, Optional
+
+from src.models.hhgtn import EdgeType
+from src.utils.metrics import pr_auc, roc_auc
+
+
+BACKENDS = ('eager', 'trace', 'compile')
+
+
+def bf16_supported() -> bool:
+    """Whether this CPU has native bf16 kernels (AVX512-BF16 / AMX)."""
+    try:
+        return bool(torch.ops.mkldnn._is_mkldnn_bf16_supported())
+    except (AttributeError, RuntimeError):
+        return False
+
+
+class _FlatForward(nn.Module):
+    """
+    Positional-tensor adapter around a hetero model.
+
+    TorchScript cannot take dicts keyed by edge-type tuples, so inputs are
+    passed as (x tensors..., edge_index tensors...) in a fixed order.
+    """
+
+    def __init__(self, model: nn.Module, node_types: List[str], edge_types: List[EdgeType], bf16: bool):
+        super().__init__()
+        self.model = model
+        self.node_types = node_types
+        self.edge_types = edge_types
+        self.bf16 = bf16
+
+    def forward(self, *tensors):
+        n = len(self.node_types)
+        x_dict = {t: tensors[i] for i, t in enumerate(self.node_types)}
+        edge_index_dict = {et: tensors[n + i] for i, et in enumerate(self.edge_types)}
+        with torch.autocast('cpu', dtype=torch.bfloat16, enabled=self.bf16):
+            return self.model(x_dict, edge_index_dict).float()
+
+
+class InferenceSession:
+    """
+    Fraud-probability scorer with an optimized CPU execution path.
+
+    The optimized module is built lazily on the first call, since tracing
+    needs example inputs. If the backend fails to build, the session falls
+    back to eager and records it in `backend_used`.
+
+    Args:
+        model: Trained hetero model (put into eval mode)
+        backend: One of 'eager', 'trace', 'compile'
+        bf16: Use bf16 autocast; None = only if the CPU supports it
+    """
+
+    def __init__(self, model: nn.Module, backend: str = 'trace', bf16: Optional[bool] = None):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend: {backend} (expected one of {BACKENDS})")
+        self.model = model.eval()
+        self.backend = backend
+        self.bf16 = bf16_supported() if bf16 is None else bf16
+        self.backend_used = None
+        self._fn = None
+        self._signature = None
+
+    def _build(self, x_dict, edge_index_dict):
+        node_types, edge_types = list(x_dict), list(edge_index_dict)
+        flat = _FlatForward(self.model, node_types, edge_types, self.bf16)
+        args = self._flatten(x_dict, edge_index_dict, node_types, edge_types)
+
+        fn, used = flat, 'eager'
+        try:
+            if self.backend == 'trace':
+                with warnings.catch_warnings():
+                    warnings.simplefilter('ignore')
+                    fn = torch.jit.trace(flat, args, check_trace=False)
+                used = 'trace'
+            elif self.backend == 'compile':
+                fn = torch.compile(flat, dynamic=True)
+                fn(*args)  # compile now, not on the first scored request
+                used = 'compile'
+        except Exception as e:
+            print(f"   {self.backend} backend unavailable ({type(e).__name__}: {e}); using eager")
+            fn, used = flat, 'eager'
+
+        self._fn = fn
+        self._signature = (node_types, edge_types)
+        self.backend_used = used + ('+bf16' if self.bf16 else '')
+
+    @staticmethod
+    def _flatten(x_dict, edge_index_dict, node_types, edge_types):
+        return tuple(x_dict[t] for t in node_types) + tuple(edge_index_dict[et] for et in edge_types)
+
+    @torch.no_grad()
+    def logits(self, x_dict: Dict[str, torch.Tensor], edge_index_dict: Dict[EdgeType, torch.Tensor]) -> torch.Tensor:
+        """Transaction logits [N_tx] (fp32)."""
+        if self._fn is None or self._signature != (list(x_dict), list(edge_index_dict)):
+            self._build(x_dict, edge_index_dict)
+        return self._fn(*self._flatten(x_dict, edge_index_dict, *self._signature))
+
+    def __call__(self, x_dict, edge_index_dict) -> torch.Tensor:
+        """Transaction fraud probabilities [N_tx] (fp32)."""
+        return torch.sigmoid(self.logits(x_dict, edge_index_dict))
+
+
+def benchmark_session(
+    session: InferenceSession,
+    x_dict: Dict[str, torch.Tensor],
+    edge_index_dict: Dict[EdgeType, torch.Tensor],
+    num_scored: int,
+    warmup: int = 3,
+    repeats: int = 20
+) -> Dict[str, float]:
+    """
+    Latency/throughput of one scoring call on a fixed batch.
+
+    Args:
+        session: Scorer to time
+        x_dict, edge_index_dict: Fixed input batch
+        num_scored: Transactions scored per call (for throughput)
+        warmup: Untimed calls (includes trace/compile)
+        repeats: Timed calls
+
+    Returns:
+        Dict with p50_ms, p90_ms, mean_ms and tx_per_sec
+    """
+    for _ in range(warmup):
+        session(x_dict, edge_index_dict)
+
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        session(x_dict, edge_index_dict)
+        times.append(time.perf_counter() - start)
+
+    times_ms = np.array(times) * 1000
+    return {
+        'p50_ms': float(np.percentile(times_ms, 50)),
+        'p90_ms': float(np.percentile(times_ms, 90)),
+        'mean_ms': float(times_ms.mean()),
+        'tx_per_sec': float(num_scored / (times_ms.mean() / 1000))
+    }
+
+
+def compare_backends(
+    model: nn.Module,
+    x_dict: Dict[str, torch.Tensor],
+    edge_index_dict: Dict[EdgeType, torch.Tensor],
+    y: torch.Tensor,
+    mask: torch.Tensor,
+    configs=(('eager', False), ('trace', False), ('trace', True), ('compile', False), ('compile', True)),
+    warmup: int = 3,
+    repeats: int = 20
+) -> List[dict]:
+    """
+    Parity and speed of each (backend, bf16) config against fp32 eager.
+
+    Parity is measured on the scored rows selected by `mask` (e.g. val):
+    max absolute probability difference and PR-AUC / ROC-AUC deltas.
+
+    Returns:
+        One dict per config (first row is the fp32 eager reference)
+    """
+    y_true = y[mask]
+    num_scored = int(mask.sum())
+
+    reference = InferenceSession(model, 'eager', bf16=False)
+    ref_probs = reference(x_dict, edge_index_dict)[mask]
+    ref_pr_auc = pr_auc(y_true, ref_probs)
+    ref_roc_auc = roc_auc(y_true, ref_probs)
+
+    rows = []
+    for backend, bf16 in (('eager', False),) + tuple(c for c in configs if c != ('eager', False)):
+        if bf16 and not bf16_supported():
+            print(f"   Skipping {backend}+bf16 (no native bf16 on this CPU)")
+            continue
+        session = reference if (backend, bf16) == ('eager', False) else InferenceSession(model, backend, bf16)
+        probs = session(x_dict, edge_index_dict)[mask]
+        timing = benchmark_session(session, x_dict, edge_index_dict, num_scored, warmup, repeats)
+        rows.append({
+            'backend': session.backend_used,
+            'max_abs_diff': float((probs - ref_probs).abs().max()),
+            'pr_auc': pr_auc(y_true, probs),
+            'pr_auc_delta': pr_auc(y_true, probs) - ref_pr_auc,
+            'roc_auc_delta': roc_auc(y_true, probs) - ref_roc_auc,
+            **timing,
+            'speedup': None
+        })
+
+    base_ms = rows[0]['mean_ms']
+    for row in rows:
+        row['speedup'] = base_ms / row['mean_ms']
+    return rows
@@ -0,0 +1,318 @@
+"""
+Three-Stage Pipelined Mini-Batch Training (sample -> gather -> compute)
+
+Stages run concurrently, connected by bounded queues:
+1. Sampling: worker processes map the TRD adjacency index and draw
+   fanout-sampled subgraphs (pure Python index work, so processes avoid
+   the GIL).
+2. Gather: a thread slices node features and labels from the (memory-
+   mapped) feature store; torch indexing releases the GIL.
+3. Compute: the calling thread runs forward/backward/step.
+
+Bounded queues give backpressure, so at most `queue_size` batches are in
+flight between two stages. Every stage records busy time; utilization =
+busy / wall time (sampling: averaged over workers). The stage closest to
+100% is the bottleneck.
+
+With a `ClassAwareScheduler`, batches come from the scheduler and carry
+per-target loss weights; step functions that return (loss, scores) feed
+the scheduler's hard-negative mining.
+"""
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import torch
+import torch.multiprocessing as mp
+import torch.nn.functional as F
+
+from src.data.adjacency import HeteroAdjacency
+from src.data.leakage_audit import LeakageAudit
+from src.data.target_scheduler import ClassAwareScheduler
+
+
+PathLike = Union[str, Path]
+StepFn = Callable[..., Union[float, Tuple[float, torch.Tensor]]]
+
+
+def _sample_worker(adjacency_path: str, fanouts: List[int], target_type: str, tasks, results, ready):
+    torch.set_num_threads(1)
+    adjacency = HeteroAdjacency.load(adjacency_path)
+    ready.put(True)
+    while (task := tasks.get()) is not None:
+        batch_id, seeds, seed = task
+        try:
+            start = time.perf_counter()
+            nodes, edges = adjacency.sample({target_type: seeds}, fanouts, torch.Generator().manual_seed(seed))
+            busy = time.perf_counter() - start
+            results.put((batch_id, seeds, nodes, edges, busy))
+        except Exception as e:
+            results.put(e)
+
+
+class PipelineExecutor:
+    """
+    Pipelined sample/gather/compute executor for TRD mini-batch training.
+
+    Args:
+        adjacency_path: TRD `HeteroAdjacency` saved with `.save()`
+        x_dict: {node_type: [N, F]} feature store (e.g. memory-mapped)
+        y: [N_target] labels
+        fanouts: Sampled in-edges per node and relation, per hop
+        batch_size: Targets per mini-batch
+        num_samplers: Sampling worker processes
+        queue_size: Max batches buffered between consecutive stages
+        target_type: Node type of the training targets
+        time_dict: {node_type: [N]} node times; enables the per-batch TRD
+            leakage audit (counters in the epoch report)
+    """
+
+    def __init__(
+        self,
+        adjacency_path: PathLike,
+        x_dict: Dict[str, torch.Tensor],
+        y: torch.Tensor,
+        fanouts: List[int],
+        batch_size: int = 1024,
+        num_samplers: int = 2,
+        queue_size: int = 4,
+        target_type: str = 'transaction',
+        time_dict: Optional[Dict[str, torch.Tensor]] = None
+    ):
+        self.adjacency_path = str(adjacency_path)
+        self.x_dict = x_dict
+        self.y = y
+        self.fanouts = list(fanouts)
+        self.batch_size = batch_size
+        self.num_samplers = num_samplers
+        self.queue_size = queue_size
+        self.target_type = target_type
+        self.audit = LeakageAudit(time_dict) if time_dict is not None else None
+        self._workers = []
+
+    def start(self):
+        """Start the sampling processes (spawn: no inherited OpenMP state) and wait until ready."""
+        ctx = mp.get_context('spawn')
+        self._tasks = ctx.Queue()
+        self._sampled = ctx.Queue(maxsize=self.queue_size)
+        ready = ctx.Queue()
+        self._workers = [
+            ctx.Process(target=_sample_worker, daemon=True,
+                        args=(self.adjacency_path, self.fanouts, self.target_type, self._tasks, self._sampled, ready))
+            for _ in range(self.num_samplers)
+        ]
+        for w in self._workers:
+            w.start()
+        for _ in self._workers:
+            ready.get()
+        return self
+
+    def close(self):
+        for _ in self._workers:
+            self._tasks.put(None)
+        for w in self._workers:
+            w.join(timeout=10)
+            if w.is_alive():
+                w.terminate()
+        self._workers = []
+
+    def _restart(self):
+        """Replace the sampling processes and queues after a failed epoch."""
+        for w in self._workers:
+            w.terminate()
+            w.join()
+        self._workers = []
+        self.start()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _batches(self, targets: Optional[torch.Tensor], seed: int, scheduler: Optional[ClassAwareScheduler]):
+        """[(batch_id, seeds, sampling seed)] and {batch_id: loss weights} (scheduler only)."""
+        if scheduler is None:
+            order = targets[torch.randperm(targets.numel(), generator=torch.Generator().manual_seed(seed))]
+            return [(i, batch, seed * 100003 + i) for i, batch in enumerate(order.split(self.batch_size))], {}
+        planned = scheduler.epoch(seed)
+        return ([(i, ids, seed * 100003 + i) for i, (ids, _) in enumerate(planned)],
+                {i: weights for i, (_, weights) in enumerate(planned)})
+
+    @staticmethod
+    def _step(step_fn: StepFn, item: tuple, weights: dict, scheduler: Optional[ClassAwareScheduler]) -> float:
+        batch_id, seeds, features, edges, local, labels = item
+        if scheduler is None:
+            out = step_fn(features, edges, local, labels)
+        else:
+            out = step_fn(features, edges, local, labels, weights[batch_id])
+        if isinstance(out, tuple):
+            out, scores = out
+            if scheduler is not None:
+                scheduler.update_scores(seeds, scores)
+        return out
+
+    def _gather(self, seeds: torch.Tensor, nodes: Dict[str, torch.Tensor]):
+        features = {t: self.x_dict[t][idx] for t, idx in nodes.items()}
+        return features, torch.searchsorted(nodes[self.target_type], seeds), self.y[seeds]
+
+    def run_epoch(self, targets: Optional[torch.Tensor], step_fn: StepFn, seed: int = 0,
+                  scheduler: Optional[ClassAwareScheduler] = None) -> dict:
+        """
+        Train one epoch over `targets` through the pipeline.
+
+        Args:
+            targets: [M] global target ids (ignored when `scheduler` is given)
+            step_fn: step_fn(features, edge_index_dict, local_targets, labels[, weights])
+                -> loss or (loss, scores); runs forward/backward/optimizer step
+            seed: Shuffle / sampling seed (batches match `run_sequential`)
+            scheduler: Class-aware batches with loss weights (passed to step_fn)
+
+        Returns:
+            Dict with loss, batches, wall_seconds and per-stage busy seconds,
+            utilization and the bottleneck stage
+        """
+        if not self._workers:
+            raise RuntimeError("PipelineExecutor not started; use `with executor:` or .start()")
+        batches, weights = self._batches(targets, seed, scheduler)
+        for task in batches:
+            self._tasks.put(task)
+
+        gathered = queue.Queue(maxsize=self.queue_size)
+        busy = {'sample': 0.0, 'gather': 0.0, 'compute': 0.0}
+        cancel = threading.Event()
+
+        def get_sampled():
+            while not cancel.is_set():
+                try:
+                    return self._sampled.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+            return None
+
+        def put_gathered(item):
+            while not cancel.is_set():
+                try:
+                    gathered.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def gather_stage():
+            try:
+                for _ in batches:
+                    item = get_sampled()
+                    if item is None:
+                        return
+                    if isinstance(item, Exception):
+                        raise item
+                    batch_id, seeds, nodes, edges, sample_seconds = item
+                    busy['sample'] += sample_seconds
+                    if self.audit is not None:
+                        self.audit.check(nodes, edges, sample_seconds)
+                    start = time.perf_counter()
+                    features, local, labels = self._gather(seeds, nodes)
+                    busy['gather'] += time.perf_counter() - start
+                    put_gathered((batch_id, seeds, features, edges, local, labels))
+            except Exception as e:
+                put_gathered(e)
+
+        start = time.perf_counter()
+        thread = threading.Thread(target=gather_stage, daemon=True)
+        thread.start()
+        losses = []
+        finished = False
+        try:
+            for _ in batches:
+                item = gathered.get()
+                if isinstance(item, Exception):
+                    raise item
+                t0 = time.perf_counter()
+                losses.append(self._step(step_fn, item, weights, scheduler))
+                busy['compute'] += time.perf_counter() - t0
+            finished = True
+        finally:
+            if not finished:
+                # Unblock the gather thread; queued tasks and results belong to the failed epoch
+                cancel.set()
+            thread.join()
+            if not finished:
+                self._restart()
+        wall = time.perf_counter() - start
+        return self._report(busy, wall, losses, self.num_samplers, self.audit, batches)
+
+    def run_sequential(self, targets: Optional[torch.Tensor], step_fn: StepFn, seed: int = 0,
+                       scheduler: Optional[ClassAwareScheduler] = None) -> dict:
+        """Same epoch without overlap (baseline for the pipeline speedup)."""
+        adjacency = HeteroAdjacency.load(self.adjacency_path)
+        busy = {'sample': 0.0, 'gather': 0.0, 'compute': 0.0}
+        losses = []
+        start = time.perf_counter()
+        batches, weights = self._batches(targets, seed, scheduler)
+        for batch_id, seeds, batch_seed in batches:
+            t0 = time.perf_counter()
+            nodes, edges = adjacency.sample({self.target_type: seeds}, self.fanouts,
+                                            torch.Generator().manual_seed(batch_seed))
+            sample_seconds = time.perf_counter() - t0
+            busy['sample'] += sample_seconds
+            if self.audit is not None:
+                self.audit.check(nodes, edges, sample_seconds)
+            t1 = time.perf_counter()
+            features, local, labels = self._gather(seeds, nodes)
+            t2 = time.perf_counter()
+            losses.append(self._step(step_fn, (batch_id, seeds, features, edges, local, labels), weights, scheduler))
+            busy['gather'] += t2 - t1
+            busy['compute'] += time.perf_counter() - t2
+        return self._report(busy, time.perf_counter() - start, losses, 1, self.audit, batches)
+
+    @staticmethod
+    def _report(busy: dict, wall: float, losses: list, workers: int, audit: Optional[LeakageAudit],
+                batches: list) -> dict:
+        utilization = {
+            'sample': busy['sample'] / (wall * workers),
+            'gather': busy['gather'] / wall,
+            'compute': busy['compute'] / wall
+        }
+        return {
+            'loss': sum(losses) / max(len(losses), 1),
+            'batches': len(losses),
+            'targets_processed': sum(seeds.numel() for _, seeds, _ in batches),
+            'wall_seconds': wall,
+            'busy_seconds': busy,
+            'utilization': utilization,
+            'bottleneck': max(utilization, key=utilization.get),
+            **(audit.metrics() if audit is not None else {})
+        }
+
+
+def make_step_fn(model: torch.nn.Module, optimizer: torch.optim.Optimizer,
+                 criterion: torch.nn.Module, edge_types: Optional[set] = None,
+                 return_scores: bool = False) -> StepFn:
+    """
+    Standard supervised step for the hetero models.
+
+    Relations outside `edge_types` (if given) are passed with no edges.
+    With scheduler `weights`, the loss is the weighted mean of per-target
+    BCE terms (using the criterion's `pos_weight`). `return_scores` also
+    returns the batch fraud probabilities (for hard-negative mining).
+    """
+    def step(features, edge_index_dict, local, labels, weights=None):
+        if edge_types is not None:
+            edge_index_dict = {et: e if et in edge_types else e[:, :0] for et, e in edge_index_dict.items()}
+        model.train()
+        optimizer.zero_grad()
+        logits = model(features, edge_index_dict)[local]
+        if weights is None:
+            loss = criterion(logits, labels.float())
+        else:
+            loss = (F.binary_cross_entropy_with_logits(
+                logits, labels.float(), pos_weight=getattr(criterion, 'pos_weight', None), reduction='none'
+            ) * weights).mean()
+        loss.backward()
+        optimizer.step()
+        if return_scores:
+            return loss.item(), torch.sigmoid(logits.detach())
+        return loss.item()
+    return step
@@ -0,0 +1,166 @@
+"""
+Int8 Dynamic Quantization for CPU Scoring (E7-A3)
+
+The E7-A3 input projections, SAGE linear layers and classifier are all
+linear maps, so dynamic int8 quantization (int8 weights, activations
+quantized on the fly) shrinks the model ~4x and speeds up CPU matmuls.
+
+SAGEConv uses `torch_geometric.nn.Linear`, which PyTorch's quantizer does
+not recognize; those layers are swapped for `nn.Linear` (same math) first.
+
+Artifact layout:
+    <dir>/model_int8.pt   quantized state dict
+    <dir>/meta.json       architecture, source checkpoint hash, report
+"""
+import copy
+import io
+import json
+import warnings
+import torch
+import torch.nn as nn
+from pathlib import Path
+from typing import Dict, Optional, Union
+from torch_geometric.nn import Linear as PyGLinear
+
+from src.data.embedding_store import file_sha256
+from src.models.hhgtn import E7_A3_Model, load_checkpoint
+from src.models.inference import InferenceSession, benchmark_session
+from src.utils.metrics import pr_auc, roc_auc
+
+
+PathLike = Union[str, Path]
+
+
+def swap_pyg_linear(model: nn.Module) -> nn.Module:
+    """Replace every `torch_geometric.nn.Linear` with an equivalent `nn.Linear` (in place)."""
+    for name, child in model.named_children():
+        if isinstance(child, PyGLinear):
+            linear = nn.Linear(child.in_channels, child.out_channels, bias=child.bias is not None)
+            linear.weight.data.copy_(child.weight.data)
+            if child.bias is not None:
+                linear.bias.data.copy_(child.bias.data)
+            setattr(model, name, linear)
+        else:
+            swap_pyg_linear(child)
+    return model
+
+
+def quantize_dynamic_int8(model: nn.Module) -> nn.Module:
+    """Int8 dynamic-quantized copy of `model` (original is left untouched)."""
+    model = swap_pyg_linear(copy.deepcopy(model).eval())
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+
+
+def model_size_bytes(model: nn.Module) -> int:
+    """
+    Serialized state-dict size (weights incl. quantization params).
+
+    This is the artifact file size, not the scoring footprint; peak RSS
+    while scoring is measured per precision in a fresh process by
+    `scripts/export_quantized_e7_a3.py`.
+    """
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.getbuffer().nbytes
+
+
+def export_quantized_e7_a3(
+    checkpoint: PathLike,
+    output_dir: PathLike,
+    hidden_dim: int = 64,
+    dropout: float = 0.4,
+    report: Optional[dict] = None
+) -> Path:
+    """
+    Write an int8 scoring artifact from a trained E7-A3 checkpoint.
+
+    Args:
+        checkpoint: fp32 checkpoint (`a3_best.pt`)
+        output_dir: Artifact directory
+        hidden_dim, dropout: Architecture of the checkpoint
+        report: Optional evaluation/benchmark results stored in meta.json
+
+    Returns:
+        Artifact directory
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    model = load_checkpoint(E7_A3_Model(hidden_dim=hidden_dim, dropout=dropout), checkpoint)
+    qmodel = quantize_dynamic_int8(model)
+    torch.save(qmodel.state_dict(), output_dir / 'model_int8.pt')
+
+    meta = {
+        'model': 'E7-A3',
+        'quantization': 'dynamic int8 (nn.Linear)',
+        'hidden_dim': hidden_dim,
+        'dropout': dropout,
+        'source_checkpoint': str(checkpoint),
+        'source_sha256': file_sha256(checkpoint),
+        'size_bytes': {'fp32': model_size_bytes(model), 'int8': model_size_bytes(qmodel)},
+        'report': report or {}
+    }
+    with open(output_dir / 'meta.json', 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    print(f" Saved int8 artifact: {output_dir}")
+    return output_dir
+
+
+def load_quantized_e7_a3(artifact_dir: PathLike) -> nn.Module:
+    """Rebuild the quantized E7-A3 scorer from an exported artifact."""
+    artifact_dir = Path(artifact_dir)
+    with open(artifact_dir / 'meta.json') as f:
+        meta = json.load(f)
+    qmodel = quantize_dynamic_int8(E7_A3_Model(hidden_dim=meta['hidden_dim'], dropout=meta['dropout']))
+    state_dict = torch.load(artifact_dir / 'model_int8.pt', map_location='cpu', weights_only=False)
+    qmodel.load_state_dict(state_dict)
+    return qmodel.eval()
+
+
+@torch.no_grad()
+def compare_quantized(
+    fp32_model: nn.Module,
+    int8_model: nn.Module,
+    x_dict: Dict[str, torch.Tensor],
+    edge_index_dict,
+    y: torch.Tensor,
+    mask: torch.Tensor,
+    repeats: int = 20
+) -> Dict[str, dict]:
+    """
+    Metric deltas and scoring latency/file size of int8 vs fp32.
+
+    Args:
+        fp32_model, int8_model: Models to compare
+        x_dict, edge_index_dict: Scoring graph
+        y: Transaction labels
+        mask: Rows to evaluate (e.g. test split)
+        repeats: Timed scoring calls per model
+
+    Returns:
+        {'fp32': {...}, 'int8': {...}, 'delta': {...}}
+    """
+    y_true = y[mask]
+    num_scored = int(mask.sum())
+    results = {}
+    for name, model in (('fp32', fp32_model), ('int8', int8_model)):
+        session = InferenceSession(model, backend='eager', bf16=False)
+        probs = session(x_dict, edge_index_dict)[mask]
+        results[name] = {
+            'pr_auc': pr_auc(y_true, probs),
+            'roc_auc': roc_auc(y_true, probs),
+            'size_bytes': model_size_bytes(model),
+            **benchmark_session(session, x_dict, edge_index_dict, num_scored, warmup=2, repeats=repeats)
+        }
+
+    fp32, int8 = results['fp32'], results['int8']
+    results['delta'] = {
+        'pr_auc': int8['pr_auc'] - fp32['pr_auc'],
+        'roc_auc': int8['roc_auc'] - fp32['roc_auc'],
+        'speedup': fp32['mean_ms'] / int8['mean_ms'],
+        'size_ratio': int8['size_bytes'] / fp32['size_bytes']
+    }
+    return results
@@ -0,0 +1,326 @@
+"""
+Async Micro-Batching Scoring Service
+
+Concurrent scoring requests are queued and coalesced into micro-batches:
+a batch is closed when it reaches `max_batch_size` or when the oldest
+request has waited `max_wait_ms`. Each batch is scored with one model call
+on the union of the requests' TRD neighborhoods, looked up in a persistent
+`HeteroAdjacency` index of time-valid message edges.
+
+Requests are either
+- an existing transaction id, or
+- a feature row for a new transaction plus the ids of its known
+  in-neighbors per relation. Keys are edge types, or a node type as
+  shorthand for its raw `(node_type, 'to', transaction)` relation
+  ({'transaction': [...], 'address': [...]}); derived relations such as
+  co-address are only wired when named explicitly (on the wire as
+  "transaction__co_address__transaction"). A new transaction is the
+  latest node, so all existing neighbors satisfy the TRD rule.
+
+Wire protocol (JSON lines over TCP):
+    {"tx_id": 123}                                  -> {"prob": 0.03}
+    {"features": [...], "neighbors": {"address": [7]}} -> {"prob": 0.81}
+    {"op": "stats"}                                 -> latency / batch stats
+"""
+import asyncio
+import json
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from src.data.adjacency import HeteroAdjacency, relabel
+from src.models.inference import InferenceSession
+
+
+class ServingStats:
+    """
+    Rolling request-latency and batch-size statistics.
+
+    Args:
+        window: Number of most recent requests kept for percentiles
+    """
+
+    def __init__(self, window: int = 100_000):
+        self.latencies_ms = deque(maxlen=window)
+        self.batch_sizes = Counter()
+        self.model_ms = deque(maxlen=window)
+        self.num_requests = 0
+        self.num_errors = 0
+
+    def record_batch(self, size: int, model_ms: float, latencies_ms: Sequence[float]):
+        self.batch_sizes[size] += 1
+        self.model_ms.append(model_ms)
+        self.latencies_ms.extend(latencies_ms)
+        self.num_requests += size
+
+    def summary(self) -> dict:
+        """p50/p99 latency, mean model time and a power-of-two batch-size histogram."""
+        latencies = np.array(self.latencies_ms) if self.latencies_ms else np.zeros(1)
+        histogram = Counter()
+        for size, count in self.batch_sizes.items():
+            histogram[1 << (size - 1).bit_length()] += count
+        num_batches = sum(self.batch_sizes.values())
+        return {
+            'requests': self.num_requests,
+            'errors': self.num_errors,
+            'batches': num_batches,
+            'p50_ms': float(np.percentile(latencies, 50)),
+            'p99_ms': float(np.percentile(latencies, 99)),
+            'mean_model_ms': float(np.mean(self.model_ms)) if self.model_ms else 0.0,
+            'mean_batch_size': self.num_requests / max(num_batches, 1),
+            'batch_size_histogram': {f'<={k}': histogram[k] for k in sorted(histogram)}
+        }
+
+
+class _Request:
+    __slots__ = ('tx_id', 'features', 'neighbors', 'future', 'start')
+
+    def __init__(self, tx_id, features, neighbors, future):
+        self.tx_id = tx_id
+        self.features = features
+        self.neighbors = neighbors
+        self.future = future
+        self.start = time.perf_counter()
+
+
+class ScoringServer:
+    """
+    Micro-batching fraud scorer for transactions.
+
+    Args:
+        model: Trained hetero model (`num_layers` attribute required)
+        x_dict: {node_type: [N, F]} node features of the indexed graph
+        adjacency: TRD message-edge index (see `trd_edge_index_dict`)
+        max_batch_size: Upper bound on requests per model call
+        max_wait_ms: Max time the first request of a batch waits for company
+        backend: InferenceSession backend ('eager', 'trace', 'compile')
+        target_type: Node type being scored
+    """
+
+    def __init__(
+        self,
+        model: nn.Module,
+        x_dict: Dict[str, torch.Tensor],
+        adjacency: HeteroAdjacency,
+        max_batch_size: int = 256,
+        max_wait_ms: float = 5.0,
+        backend: str = 'eager',
+        target_type: str = 'transaction'
+    ):
+        self.session = InferenceSession(model, backend=backend, bf16=False)
+        self.num_layers = model.num_layers
+        self.x_dict = x_dict
+        self.adjacency = adjacency
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.target_type = target_type
+        self.stats = ServingStats()
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def num_targets(self) -> int:
+        return self.adjacency.num_nodes[self.target_type]
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self):
+        self._executor = ThreadPoolExecutor(max_workers=1)  # model calls stay serialized
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._batch_loop())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._queue = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+
+    async def score(
+        self,
+        tx_id: Optional[int] = None,
+        features: Optional[Sequence[float]] = None,
+        neighbors: Optional[Dict[str, Sequence[int]]] = None
+    ) -> float:
+        """
+        Fraud probability of one transaction.
+
+        Args:
+            tx_id: Id of an indexed transaction
+            features: Feature row of a new transaction (instead of tx_id)
+            neighbors: {edge_type or node_type: ids} known in-neighbors of
+                the new transaction (a node type means its 'to' relation)
+
+        Returns:
+            Fraud probability
+        """
+        if self._queue is None:
+            raise RuntimeError("ScoringServer is not running; call start() first")
+        if (tx_id is None) == (features is None):
+            raise ValueError("Pass exactly one of tx_id or features")
+        if tx_id is not None:
+            if not 0 <= tx_id < self.num_targets:
+                raise ValueError(f"Unknown {self.target_type} id: {tx_id}")
+        else:
+            features = torch.as_tensor(features, dtype=torch.float32)
+            if features.shape != (self.x_dict[self.target_type].shape[1],):
+                raise ValueError(f"Expected {self.x_dict[self.target_type].shape[1]} features, "
+                                 f"got {tuple(features.shape)}")
+            neighbors = {self._neighbor_relation(key): torch.as_tensor(ids, dtype=torch.long).view(-1)
+                         for key, ids in (neighbors or {}).items()}
+            for (t, _, _), ids in neighbors.items():
+                if ids.numel() and not (0 <= int(ids.min()) and int(ids.max()) < self.adjacency.num_nodes[t]):
+                    raise ValueError(f"Unknown {t} id in neighbors")
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_Request(tx_id, features, neighbors, future))
+        return await future
+
+    def _neighbor_relation(self, key) -> tuple:
+        """Edge type of a `neighbors` key (edge type, 'src__rel__dst' or node type)."""
+        if isinstance(key, str):
+            key = tuple(key.split('__')) if '__' in key else (key, 'to', self.target_type)
+        edge_type = tuple(key)
+        if edge_type not in self.adjacency.edge_types or edge_type[2] != self.target_type:
+            raise ValueError(f"Unknown relation into {self.target_type}: {key}")
+        return edge_type
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = batch[0].start + self.max_wait
+            while len(batch) < self.max_batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            start = time.perf_counter()
+            try:
+                probs = await loop.run_in_executor(self._executor, self.score_batch, batch)
+            except Exception as e:
+                self.stats.num_errors += len(batch)
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+                continue
+
+            end = time.perf_counter()
+            for request, prob in zip(batch, probs.tolist()):
+                if not request.future.done():
+                    request.future.set_result(prob)
+            self.stats.record_batch(len(batch), (end - start) * 1000,
+                                    [(end - r.start) * 1000 for r in batch])
+
+    # ------------------------------------------------------------------
+    # Batch scoring
+    # ------------------------------------------------------------------
+
+    def score_batch(self, batch: List[_Request]) -> torch.Tensor:
+        """Score a micro-batch with one model call on its merged neighborhood."""
+        target = self.target_type
+        empty = torch.zeros(0, dtype=torch.long)
+        existing = [r for r in batch if r.tx_id is not None]
+        new = [r for r in batch if r.tx_id is None]
+
+        # Existing targets need L hops; neighbors of new targets need L - 1
+        existing_ids = torch.tensor([r.tx_id for r in existing], dtype=torch.long)
+        nodes = self.adjacency.khop_in({target: existing_ids}, self.num_layers)
+        if new:
+            neighbor_seeds = {
+                t: torch.cat([empty] + [ids for r in new for (src_type, _, _), ids in r.neighbors.items()
+                                        if src_type == t])
+                for t in self.adjacency.num_nodes
+            }
+            extra = self.adjacency.khop_in(neighbor_seeds, self.num_layers - 1)
+            nodes = {t: torch.cat([nodes[t], extra[t]]).unique() for t in nodes}
+
+        edge_index_dict = self.adjacency.induced(nodes)
+        x_dict = {t: self.x_dict[t][idx] for t, idx in nodes.items()}
+
+        # Append new targets after the indexed ones, wired to their in-neighbors
+        num_local = nodes[target].numel()
+        if new:
+            x_dict[target] = torch.cat([x_dict[target], torch.stack([r.features for r in new])])
+            for edge_type in edge_index_dict:
+                src_type, _, dst_type = edge_type
+                if dst_type != target:
+                    continue
+                src = [r.neighbors.get(edge_type, empty) for r in new]
+                dst = torch.repeat_interleave(
+                    torch.arange(len(new)) + num_local, torch.tensor([s.numel() for s in src]))
+                src_local, _ = relabel(nodes[src_type], torch.cat(src))
+                edge_index_dict[edge_type] = torch.cat(
+                    [edge_index_dict[edge_type], torch.stack([src_local, dst])], dim=1)
+
+        probs = torch.sigmoid(self.session.logits(x_dict, edge_index_dict))
+
+        positions = torch.empty(len(batch), dtype=torch.long)
+        is_existing = torch.tensor([r.tx_id is not None for r in batch])
+        positions[is_existing] = relabel(nodes[target], existing_ids)[0]
+        positions[~is_existing] = torch.arange(len(new)) + num_local
+        return probs[positions]
+
+    # ------------------------------------------------------------------
+    # TCP front end
+    # ------------------------------------------------------------------
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while line := await reader.readline():
+                try:
+                    message = json.loads(line)
+                    if message.get('op') == 'stats':
+                        response = {**self.stats.summary(), 'num_targets': self.num_targets}
+                    else:
+                        prob = await self.score(message.get('tx_id'), message.get('features'),
+                                                message.get('neighbors'))
+                        response = {'prob': prob}
+                except Exception as e:
+                    # Bad requests and model/runtime failures both get a reply
+                    response = {'error': f'{type(e).__name__}: {e}'}
+                writer.write((json.dumps(response) + '\n').encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve_tcp(self, host: str = '127.0.0.1', port: int = 8765) -> asyncio.AbstractServer:
+        """Start the JSON-lines TCP endpoint (call `start()` first)."""
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        print(f" Scoring server listening on {host}:{port} "
+              f"(max_batch_size={self.max_batch_size}, max_wait_ms={self.max_wait * 1000:g})")
+        return server
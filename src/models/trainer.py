@@ -0,0 +1,199 @@
+"""
+Full-Graph Trainer for the Hetero Models
+
+Packaged version of `train_ablation_model` from the E7 notebook: Adam,
+class-weighted BCE on labeled train transactions, early stopping on val
+PR-AUC with the best weights restored. Split into `train_epoch` /
+`evaluate` steps so sweep runners and schedulers can drive it epoch by
+epoch.
+"""
+import torch
+import torch.nn as nn
+from typing import Dict, Optional, Sequence
+
+from src.data.adjacency import sample_in_edges
+from src.models.hhgtn import ALL_EDGE_TYPES, EdgeType, build_model
+from src.utils.metrics import binary_metrics, pr_auc
+
+
+class FullGraphTrainer:
+    """
+    Full-batch trainer for a hetero model on one transaction graph.
+
+    Args:
+        model: Hetero model returning transaction logits
+        x_dict: {node_type: [N, F]} features
+        edge_index_dict: {edge_type: [2, E]} relations used for message passing
+        y: [N_tx] labels (1=fraud, 0=legit, -1=unknown)
+        train_mask, val_mask, test_mask: [N_tx] split masks
+        lr: Adam learning rate
+        weight_decay: Adam weight decay
+        pos_weight: BCE positive-class weight (class imbalance)
+        fanout: Max in-edges per node and relation, resampled every epoch
+            (None = all edges)
+        seed: Seed for edge sampling
+    """
+
+    def __init__(
+        self,
+        model: nn.Module,
+        x_dict: Dict[str, torch.Tensor],
+        edge_index_dict: Dict[EdgeType, torch.Tensor],
+        y: torch.Tensor,
+        train_mask: torch.Tensor,
+        val_mask: torch.Tensor,
+        test_mask: torch.Tensor,
+        lr: float = 0.001,
+        weight_decay: float = 1e-5,
+        pos_weight: float = 10.0,
+        fanout: Optional[int] = None,
+        seed: int = 42
+    ):
+        self.model = model
+        self.x_dict = x_dict
+        self.edge_index_dict = edge_index_dict
+        self.y = y
+        # Only labeled transactions are supervised / evaluated
+        self.masks = {
+            'train': train_mask & (y >= 0),
+            'val': val_mask & (y >= 0),
+            'test': test_mask & (y >= 0)
+        }
+        self.fanout = fanout
+        self.generator = torch.Generator().manual_seed(seed)
+        self.num_nodes = {t: x.shape[0] for t, x in x_dict.items()}
+        self.optimizer = torch.optim.Adam(model.parameters(), lr=lr, weight_decay=weight_decay)
+        self.criterion = nn.BCEWithLogitsLoss(pos_weight=torch.tensor([pos_weight]))
+        self.epoch = 0
+
+    def _train_edges(self) -> Dict[EdgeType, torch.Tensor]:
+        if self.fanout is None:
+            return self.edge_index_dict
+        return {
+            et: sample_in_edges(e, self.num_nodes[et[2]], self.fanout, self.generator)
+            for et, e in self.edge_index_dict.items()
+        }
+
+    def train_epoch(self) -> float:
+        """One full-graph optimization step; returns the training loss."""
+        self.model.train()
+        self.optimizer.zero_grad()
+        logits = self.model(self.x_dict, self._train_edges())
+        train = self.masks['train']
+        loss = self.criterion(logits[train], self.y[train].float())
+        loss.backward()
+        self.optimizer.step()
+        self.epoch += 1
+        return loss.item()
+
+    @torch.no_grad()
+    def predict(self) -> torch.Tensor:
+        """Fraud probabilities of all transactions (all edges, eval mode)."""
+        self.model.eval()
+        return torch.sigmoid(self.model(self.x_dict, self.edge_index_dict))
+
+    def evaluate(self, split: str = 'val', probs: Optional[torch.Tensor] = None) -> Dict[str, float]:
+        """PR-AUC, ROC-AUC, best F1 and recall@k% on a split."""
+        probs = self.predict() if probs is None else probs
+        mask = self.masks[split]
+        return binary_metrics(self.y[mask], probs[mask])
+
+    def val_pr_auc(self) -> float:
+        mask = self.masks['val']
+        return pr_auc(self.y[mask], self.predict()[mask])
+
+    def state_dict(self) -> dict:
+        return {k: v.clone() for k, v in self.model.state_dict().items()}
+
+    def checkpoint(self) -> dict:
+        """Everything needed to resume training (model, optimizer, epoch, RNG)."""
+        return {
+            'model': self.state_dict(),
+            'optimizer': self.optimizer.state_dict(),
+            'epoch': self.epoch,
+            'generator': self.generator.get_state()
+        }
+
+    def restore(self, checkpoint: dict):
+        """Resume from `checkpoint()` output."""
+        self.model.load_state_dict(checkpoint['model'])
+        self.optimizer.load_state_dict(checkpoint['optimizer'])
+        self.epoch = checkpoint['epoch']
+        self.generator.set_state(checkpoint['generator'])
+
+    def fit(self, max_epochs: int = 100, patience: int = 15, verbose: bool = True) -> dict:
+        """
+        Train with early stopping on val PR-AUC (best weights restored).
+
+        Returns:
+            Dict with train/val/test metrics, best_epoch and history
+        """
+        best_val_pr_auc, best_epoch, patience_counter = 0.0, 0, 0
+        best_state = self.state_dict()
+        history = {'train_loss': [], 'val_pr_auc': []}
+
+        for epoch in range(max_epochs):
+            loss = self.train_epoch()
+            val_pr_auc = self.val_pr_auc()
+
+            history['train_loss'].append(loss)
+            history['val_pr_auc'].append(val_pr_auc)
+
+            if val_pr_auc > best_val_pr_auc:
+                best_val_pr_auc, best_epoch, patience_counter = val_pr_auc, epoch, 0
+                best_state = self.state_dict()
+            else:
+                patience_counter += 1
+
+            if verbose and (epoch + 1) % 10 == 0:
+                print(f"Epoch {epoch+1:3d} | Loss: {loss:.4f} | Val PR-AUC: {val_pr_auc:.4f} | Best: {best_val_pr_auc:.4f}")
+
+            if patience_counter >= patience:
+                if verbose:
+                    print(f"Early stopping at epoch {epoch+1}")
+                break
+
+        self.model.load_state_dict(best_state)
+        probs = self.predict()
+        return {
+            **{split: self.evaluate(split, probs) for split in ('train', 'val', 'test')},
+            'best_epoch': best_epoch,
+            'history': history
+        }
+
+
+def trainer_from_config(config: dict, graph: dict) -> FullGraphTrainer:
+    """
+    Build model + trainer from a sweep config.
+
+    Config keys (all optional except `model`): model, edge_types,
+    hidden_dim, dropout, lr, weight_decay, pos_weight, fanout, seed.
+    Relations outside `edge_types` get no edges.
+
+    Args:
+        config: Run configuration
+        graph: Dict with x_dict, edge_index_dict, y, train_mask, val_mask, test_mask
+    """
+    seed = config.get('seed', 42)
+    torch.manual_seed(seed)
+
+    edge_types: Sequence[EdgeType] = [tuple(et) for et in config.get('edge_types', ALL_EDGE_TYPES)]
+    model_kwargs = {k: config[k] for k in ('hidden_dim', 'dropout') if k in config}
+    if config['model'] == 'simplified_hhgtn':
+        model_kwargs['edge_types_to_use'] = list(edge_types)
+    model = build_model(config['model'], **model_kwargs)
+
+    empty = torch.zeros((2, 0), dtype=torch.long)
+    edge_index_dict = {
+        et: e if et in edge_types else empty
+        for et, e in graph['edge_index_dict'].items()
+    }
+    return FullGraphTrainer(
+        model, graph['x_dict'], edge_index_dict, graph['y'],
+        graph['train_mask'], graph['val_mask'], graph['test_mask'],
+        lr=config.get('lr', 0.001),
+        weight_decay=config.get('weight_decay', 1e-5),
+        pos_weight=config.get('pos_weight', 10.0),
+        fanout=config.get('fanout'),
+        seed=seed
+    )
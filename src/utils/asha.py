@@ -0,0 +1,274 @@
+"""
+Asynchronous Successive Halving (ASHA) over the Hetero Trainers
+
+Every config starts with a `min_epochs` budget. At each rung
+(min_epochs * eta^k epochs, capped at max_epochs) a trial reports its best
+val PR-AUC so far. A trial is promoted to the next rung once it ranks in
+the top 1/eta of all trials that reported at its rung; the others are
+never resumed. Promotions are decided as results arrive, so workers never
+wait for a rung to fill up.
+
+Trial state (model, optimizer, best weights) is checkpointed between rungs,
+so any worker can resume any trial. All rung decisions are appended to
+`<output_dir>/<name>_rungs.jsonl`.
+"""
+import json
+import math
+import os
+import time
+import multiprocessing as mp
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import torch
+
+from src.utils import sweep
+
+
+PathLike = Union[str, Path]
+
+
+def rung_epochs(min_epochs: int, max_epochs: int, reduction_factor: int) -> List[int]:
+    """Epoch budgets of each rung: min_epochs * eta^k, ending exactly at max_epochs."""
+    num_rungs = int(math.floor(math.log(max_epochs / min_epochs, reduction_factor) + 1e-9)) + 1
+    rungs = [min_epochs * reduction_factor ** k for k in range(num_rungs)]
+    if rungs[-1] < max_epochs:
+        rungs.append(max_epochs)
+    return rungs
+
+
+class ASHAScheduler:
+    """
+    Promotion logic of ASHA, independent of how trials are executed.
+
+    Args:
+        trial_names: One name per trial
+        min_epochs: Budget of the first rung
+        max_epochs: Budget of the last rung
+        reduction_factor: eta; top 1/eta of each rung is promoted
+        log_path: JSONL file for rung decisions (None = no file)
+    """
+
+    def __init__(self, trial_names: List[str], min_epochs: int = 5, max_epochs: int = 100,
+                 reduction_factor: int = 3, log_path: Optional[PathLike] = None):
+        self.names = list(trial_names)
+        self.rungs = rung_epochs(min_epochs, max_epochs, reduction_factor)
+        self.eta = reduction_factor
+        self.results: List[Dict[int, float]] = [{} for _ in self.rungs]
+        self.promoted: List[set] = [set() for _ in self.rungs]
+        self.pending = deque(range(len(self.names)))
+        self.events = []
+        self.log_path = Path(log_path) if log_path else None
+        if self.log_path:
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            self.log_path.unlink(missing_ok=True)
+
+    def _log(self, event: str, trial: int, rung: int, **fields):
+        record = {'event': event, 'trial': self.names[trial], 'rung': rung,
+                  'epochs': self.rungs[rung], **fields}
+        self.events.append(record)
+        if self.log_path:
+            with open(self.log_path, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+
+    def next_job(self) -> Optional[Tuple[int, int]]:
+        """
+        Next (trial, rung) to run: a promotion if one is available (highest
+        rung first), else a new trial at rung 0, else None.
+        """
+        for rung in reversed(range(len(self.rungs) - 1)):
+            results = self.results[rung]
+            ranked = sorted(results, key=lambda t: -results[t])
+            for rank, trial in enumerate(ranked[:len(results) // self.eta]):
+                if trial not in self.promoted[rung]:
+                    self.promoted[rung].add(trial)
+                    self._log('promote', trial, rung, val_pr_auc=results[trial],
+                              rank=rank + 1, of=len(results), to_epochs=self.rungs[rung + 1])
+                    return trial, rung + 1
+        if self.pending:
+            return self.pending.popleft(), 0
+        return None
+
+    def flush(self) -> Optional[Tuple[int, int]]:
+        """
+        Once nothing else can run, promote the best trial of the highest
+        non-final rung so that at least one trial reaches max_epochs
+        (small searches would otherwise stop below the top rung).
+        """
+        top = max((r for r, results in enumerate(self.results) if results), default=None)
+        if top is None or top == len(self.rungs) - 1:
+            return None
+        results = self.results[top]
+        trial = max((t for t in results if t not in self.promoted[top]), key=lambda t: results[t], default=None)
+        if trial is None:
+            return None
+        self.promoted[top].add(trial)
+        self._log('promote', trial, top, val_pr_auc=results[trial], rank=1, of=len(results),
+                  to_epochs=self.rungs[top + 1], reason='flush')
+        return trial, top + 1
+
+    def report(self, trial: int, rung: int, val_pr_auc: float):
+        """Record a trial's score at the end of `rung`."""
+        self.results[rung][trial] = val_pr_auc
+        self._log('report', trial, rung, val_pr_auc=val_pr_auc)
+
+    def finalize(self) -> Dict[int, int]:
+        """Log a stop decision for every trial not promoted past its last rung."""
+        last_rung = {}
+        for rung, results in enumerate(self.results):
+            for trial in results:
+                last_rung[trial] = rung
+        for trial, rung in sorted(last_rung.items()):
+            if rung < len(self.rungs) - 1:
+                results = self.results[rung]
+                rank = sorted(results, key=lambda t: -results[t]).index(trial) + 1
+                self._log('stop', trial, rung, val_pr_auc=results[trial], rank=rank, of=len(results))
+        return last_rung
+
+
+def run_trial(config: dict, checkpoint_path: str, target_epochs: int, graph: Optional[dict] = None) -> dict:
+    """
+    Resume (or start) one trial and train it up to `target_epochs`.
+
+    Returns:
+        Dict with best_val_pr_auc, best_epoch and epochs_run (this segment)
+    """
+    from src.models.trainer import trainer_from_config
+
+    graph = sweep._GRAPH if graph is None else graph
+    trainer = trainer_from_config(config, graph)
+    state = {'best_val_pr_auc': 0.0, 'best_epoch': 0, 'best_model': trainer.state_dict(), 'history': []}
+    if os.path.exists(checkpoint_path):
+        state = torch.load(checkpoint_path, weights_only=False)
+        trainer.restore(state['trainer'])
+
+    start_epoch = trainer.epoch
+    while trainer.epoch < target_epochs:
+        trainer.train_epoch()
+        val_pr_auc = trainer.val_pr_auc()
+        state['history'].append(val_pr_auc)
+        if val_pr_auc > state['best_val_pr_auc']:
+            state['best_val_pr_auc'], state['best_epoch'] = val_pr_auc, trainer.epoch - 1
+            state['best_model'] = trainer.state_dict()
+
+    state['trainer'] = trainer.checkpoint()
+    torch.save(state, checkpoint_path)
+    return {'best_val_pr_auc': state['best_val_pr_auc'], 'best_epoch': state['best_epoch'],
+            'epochs_run': trainer.epoch - start_epoch}
+
+
+def evaluate_trial(config: dict, checkpoint_path: str, graph: Optional[dict] = None) -> dict:
+    """Val/test metrics of a trial's best weights."""
+    from src.models.trainer import trainer_from_config
+
+    graph = sweep._GRAPH if graph is None else graph
+    trainer = trainer_from_config(config, graph)
+    trainer.model.load_state_dict(torch.load(checkpoint_path, weights_only=False)['best_model'])
+    probs = trainer.predict()
+    return {split: trainer.evaluate(split, probs) for split in ('val', 'test')}
+
+
+def run_asha(
+    configs: List[dict],
+    graph_path: PathLike,
+    work_dir: PathLike,
+    output_dir: PathLike = 'reports/sweeps',
+    name: str = 'asha',
+    min_epochs: int = 5,
+    max_epochs: int = 100,
+    reduction_factor: int = 3,
+    workers: int = 1,
+    threads_per_worker: Optional[int] = None
+) -> dict:
+    """
+    Run an ASHA search over sweep configs.
+
+    Args:
+        configs: Run configs (see `trainer_from_config`), each with a unique name
+        graph_path: File written by `sweep.share_graph`
+        work_dir: Directory for per-trial checkpoints
+        output_dir: Where `<name>_rungs.jsonl` and `<name>.json` go
+        name: Search name
+        min_epochs, max_epochs, reduction_factor: Rung schedule
+        workers: Concurrent trial segments (process pool when > 1)
+        threads_per_worker: Intra-op threads per worker (default: #cores // workers)
+
+    Returns:
+        Summary with rungs, per-trial records, best trial and compute used
+    """
+    work_dir, output_dir = Path(work_dir), Path(output_dir)
+    work_dir.mkdir(parents=True, exist_ok=True)
+    for config in configs:
+        (work_dir / f"{config['name']}.pt").unlink(missing_ok=True)
+
+    scheduler = ASHAScheduler([c['name'] for c in configs], min_epochs, max_epochs,
+                              reduction_factor, output_dir / f'{name}_rungs.jsonl')
+    threads = threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+    checkpoint = {i: str(work_dir / f"{c['name']}.pt") for i, c in enumerate(configs)}
+    epochs_run = 0
+
+    print(f"ASHA '{name}': {len(configs)} trials, rungs {scheduler.rungs}, eta={reduction_factor}, "
+          f"{workers} workers x {threads} threads")
+    start = time.perf_counter()
+
+    def on_result(trial, rung, result):
+        nonlocal epochs_run
+        epochs_run += result['epochs_run']
+        scheduler.report(trial, rung, result['best_val_pr_auc'])
+        print(f"   rung {rung} ({scheduler.rungs[rung]:>3} ep) {configs[trial]['name']}: "
+              f"val PR-AUC {result['best_val_pr_auc']:.4f}")
+
+    if workers == 1:
+        graph = sweep.load_shared_graph(graph_path)
+        with sweep.num_threads(threads):
+            while (job := scheduler.next_job() or scheduler.flush()) is not None:
+                trial, rung = job
+                on_result(trial, rung, run_trial(configs[trial], checkpoint[trial], scheduler.rungs[rung], graph))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context('spawn'),
+                                 initializer=sweep._init_worker, initargs=(str(graph_path), threads)) as pool:
+            running = {}
+            while True:
+                while len(running) < workers and (
+                        job := scheduler.next_job() or (None if running else scheduler.flush())) is not None:
+                    trial, rung = job
+                    future = pool.submit(run_trial, configs[trial], checkpoint[trial], scheduler.rungs[rung])
+                    running[future] = job
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    on_result(*running.pop(future), future.result())
+
+    last_rung = scheduler.finalize()
+
+    # Final metrics for trials that reached the last rung
+    graph = sweep.load_shared_graph(graph_path)
+    trials = []
+    for trial, rung in last_rung.items():
+        record = {'name': configs[trial]['name'], 'config': configs[trial], 'last_rung': rung,
+                  'epochs': scheduler.rungs[rung], 'val_pr_auc': scheduler.results[rung][trial]}
+        if rung == len(scheduler.rungs) - 1:
+            record.update(evaluate_trial(configs[trial], checkpoint[trial], graph))
+        trials.append(record)
+    trials.sort(key=lambda r: (-r['last_rung'], -r['val_pr_auc']))
+
+    summary = {
+        'name': name,
+        'rungs': scheduler.rungs,
+        'reduction_factor': reduction_factor,
+        'epochs_run': epochs_run,
+        'epochs_full_budget': len(configs) * max_epochs,
+        'compute_fraction': epochs_run / (len(configs) * max_epochs),
+        'seconds': time.perf_counter() - start,
+        'best': trials[0]['name'] if trials else None,
+        'trials': trials
+    }
+    with open(output_dir / f'{name}.json', 'w') as f:
+        json.dump(summary, f, indent=2)
+
+    print(f" ASHA done in {summary['seconds']:.1f}s: {epochs_run} epochs "
+          f"({summary['compute_fraction']:.0%} of full budget), best: {summary['best']}")
+    return summary
@@ -0,0 +1,351 @@
+"""
+End-to-End Performance Benchmarks with Regression Baselines
+
+Runs on a generated temporal graph shaped like Elliptic++ (same CSV files,
+columns, label mix, 49 time steps, relation ratios), scaled to a
+configurable number of transactions. The generated data is for
+benchmarking only.
+
+Measured:
+- graph build time per `HeteroGraphBuilder` stage
+- `TRDSampler` throughput (targets/s) per fanout and batch size
+- full-graph training epoch time and inference time
+- single-request scoring latency (`ScoringServer`, p50 / p99)
+- peak RSS of the process
+- `python -m src` (trdgnn CLI) startup time of lightweight commands
+
+Results are flat {metric: {value, unit, higher_is_better}} dicts, so a
+run can be saved as a JSON baseline and later runs compared against it
+with a relative tolerance.
+"""
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import torch
+
+
+PathLike = Union[str, Path]
+
+# Elliptic++: 203,769 tx / 822,942 addresses; edges per transaction
+ELLIPTIC_RATIOS = {
+    'addr_per_tx': 822_942 / 203_769,
+    'tx_tx': 234_355 / 203_769,
+    'addr_tx': 477_117 / 203_769,
+    'tx_addr': 837_124 / 203_769,
+    'addr_addr': 2_868_964 / 203_769
+}
+SCALES = {'tiny': 2_000, 'small': 20_000, 'medium': 100_000, 'full': 203_769}
+# Absolute changes below these are timer noise, never regressions
+NOISE_FLOORS = {'s': 0.005, 'ms': 0.5, 'MB': 20.0}
+# Lightweight CLI commands must start within this (seconds)
+CLI_STARTUP_BUDGET_S = 0.2
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+def generate_elliptic_like(
+    root: PathLike,
+    num_tx: int = 20_000,
+    num_steps: int = 49,
+    addr_ratio: Optional[float] = None,
+    seed: int = 0
+) -> Path:
+    """
+    Write Elliptic++-shaped CSVs that `HeteroGraphBuilder` can load.
+
+    Transactions get 93 Local features, classes 1/2/3 at roughly 2% / 21% /
+    77%, and time steps 1..num_steps. tx-tx edges stay inside a time step,
+    like in Elliptic. Addresses get 55 features, including total_txs.
+
+    Args:
+        root: Output directory
+        num_tx: Number of transactions
+        num_steps: Number of time steps
+        addr_ratio: Addresses per transaction (default: Elliptic++ ratio)
+        seed: RNG seed
+    """
+    import pandas as pd
+
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    num_addr = max(1, int(num_tx * (addr_ratio or ELLIPTIC_RATIOS['addr_per_tx'])))
+
+    tx_ids = rng.permutation(np.arange(1, 10 * num_tx))[:num_tx]
+    tx_step = np.sort(rng.integers(1, num_steps + 1, num_tx))
+    tx_features = pd.DataFrame(rng.standard_normal((num_tx, 93)).astype(np.float32),
+                               columns=[f'Local_feature_{i + 1}' for i in range(93)])
+    tx_features.insert(0, 'Time step', tx_step)
+    tx_features.insert(0, 'txId', tx_ids)
+    tx_features.to_csv(root / 'txs_features.csv', index=False)
+    pd.DataFrame({'txId': tx_ids, 'class': rng.choice([1, 2, 3], num_tx, p=[0.02, 0.21, 0.77])}).to_csv(
+        root / 'txs_classes.csv', index=False)
+
+    addr_ids = np.array([f'addr{i:08d}' for i in range(num_addr)])
+    addr_features = pd.DataFrame(rng.standard_normal((num_addr, 54)).astype(np.float32),
+                                 columns=[f'feature_{i + 1}' for i in range(54)])
+    addr_features.insert(0, 'total_txs', rng.geometric(0.3, num_addr))
+    addr_features.insert(0, 'Time step', rng.integers(1, num_steps + 1, num_addr))
+    addr_features.insert(0, 'address', addr_ids)
+    addr_features['class'] = rng.choice([1, 2, 3], num_addr, p=[0.01, 0.29, 0.70])
+    addr_features.to_csv(root / 'wallets_features_classes_combined.csv', index=False)
+
+    # tx-tx: endpoints from the same time step (tx are sorted by step)
+    num_tx_tx = int(num_tx * ELLIPTIC_RATIOS['tx_tx'])
+    step_start = np.searchsorted(tx_step, tx_step)
+    step_end = np.searchsorted(tx_step, tx_step, side='right')
+    src = rng.integers(0, num_tx, num_tx_tx)
+    dst = step_start[src] + (rng.random(num_tx_tx) * (step_end[src] - step_start[src])).astype(np.int64)
+    edge_files = {
+        'txs_edgelist.csv': ('txId1', 'txId2', tx_ids[src], tx_ids[dst]),
+        'AddrTx_edgelist.csv': ('input_address', 'txId',
+                                addr_ids[rng.integers(0, num_addr, int(num_tx * ELLIPTIC_RATIOS['addr_tx']))],
+                                tx_ids[rng.integers(0, num_tx, int(num_tx * ELLIPTIC_RATIOS['addr_tx']))]),
+        'TxAddr_edgelist.csv': ('txId', 'output_address',
+                                tx_ids[rng.integers(0, num_tx, int(num_tx * ELLIPTIC_RATIOS['tx_addr']))],
+                                addr_ids[rng.integers(0, num_addr, int(num_tx * ELLIPTIC_RATIOS['tx_addr']))]),
+        'AddrAddr_edgelist.csv': ('input_address', 'output_address',
+                                  addr_ids[rng.integers(0, num_addr, int(num_tx * ELLIPTIC_RATIOS['addr_addr']))],
+                                  addr_ids[rng.integers(0, num_addr, int(num_tx * ELLIPTIC_RATIOS['addr_addr']))])
+    }
+    for name, (src_col, dst_col, src_ids, dst_ids) in edge_files.items():
+        pd.DataFrame({src_col: src_ids, dst_col: dst_ids}).to_csv(root / name, index=False)
+    return root
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _median_seconds(fn: Callable, repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def _metric(value: float, unit: str, higher_is_better: bool = False) -> dict:
+    return {'value': float(value), 'unit': unit, 'higher_is_better': higher_is_better}
+
+
+def bench_graph_build(data_root: PathLike, top_k_addresses: Optional[int] = None):
+    """Time each `HeteroGraphBuilder` stage; returns (metrics, HeteroData)."""
+    from torch_geometric.data import HeteroData
+    from src.data.build_hetero_graph import HeteroGraphBuilder
+
+    metrics = {}
+
+    def timed(stage, fn, *args):
+        start = time.perf_counter()
+        result = fn(*args)
+        metrics[f'build.{stage}_s'] = _metric(time.perf_counter() - start, 's')
+        return result
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        builder = HeteroGraphBuilder(str(data_root), use_all_addresses=top_k_addresses is None)
+        data = HeteroData()
+        tx_x, tx_y, tx_t = timed('transactions', builder.load_transaction_nodes)
+        addr_x, addr_y, addr_t = timed('addresses', builder.load_address_nodes, top_k_addresses)
+        splits = timed('splits', builder.create_temporal_splits, tx_t, tx_y)
+        data['transaction'].x, data['transaction'].y, data['transaction'].timestamp = tx_x, tx_y, tx_t
+        data['address'].x, data['address'].y, data['address'].timestamp = addr_x, addr_y, addr_t
+        for split in ('train', 'val', 'test'):
+            data['transaction'][f'{split}_mask'] = splits[f'{split}_mask']
+        for name, edge_type in [('tx-tx', ('transaction', 'to', 'transaction')),
+                                ('addr-tx', ('address', 'to', 'transaction')),
+                                ('tx-addr', ('transaction', 'to', 'address')),
+                                ('addr-addr', ('address', 'to', 'address'))]:
+            data[edge_type].edge_index = timed(f'edges_{name}', builder.load_edges, name)
+    metrics['build.total_s'] = _metric(sum(m['value'] for m in metrics.values()), 's')
+    return metrics, data
+
+
+def bench_trd_sampler(data, fanouts_list: Sequence[Sequence[int]], batch_sizes: Sequence[int],
+                      repeats: int = 3, seed: int = 0, backends: Sequence[str] = ('python', 'vectorized')) -> dict:
+    """
+    `TRDSampler` targets/s on the tx-tx graph for each backend, fanout and
+    batch size ('python' keeps the unprefixed metric names).
+    """
+    from src.data.trd_sampler import TRDSampler
+
+    edge_index = data['transaction', 'to', 'transaction'].edge_index
+    timestamps = data['transaction'].timestamp
+    metrics = {}
+    for backend in backends:
+        generator = torch.Generator().manual_seed(seed)
+        np.random.seed(seed)
+        prefix = 'sampler' if backend == 'python' else f'sampler.{backend}'
+        for fanouts in fanouts_list:
+            sampler = TRDSampler(fanouts=list(fanouts), backend=backend)
+            if sampler.backend_used != backend:
+                continue
+            for batch_size in batch_sizes:
+                targets = torch.randint(0, timestamps.numel(), (batch_size,), generator=generator)
+                seconds = _median_seconds(
+                    lambda: sampler.sample(edge_index, timestamps, targets, generator=generator), repeats)
+                key = f"{prefix}.fanout_{'x'.join(map(str, fanouts))}.batch_{batch_size}.targets_per_s"
+                metrics[key] = _metric(batch_size / seconds, 'targets/s', higher_is_better=True)
+    return metrics
+
+
+def bench_cli_startup(repeats: int = 5) -> dict:
+    """Wall time of `python -m src --help` / `splits --help` in a fresh interpreter."""
+    def run(*argv):
+        subprocess.run([sys.executable, '-m', 'src', *argv], cwd=REPO_ROOT, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    return {
+        'cli.startup_help_s': _metric(_median_seconds(lambda: run('--help'), repeats), 's'),
+        'cli.startup_splits_help_s': _metric(_median_seconds(lambda: run('splits', '--help'), repeats), 's')
+    }
+
+
+def bench_training(data, model_name: str = 'e7_a3', repeats: int = 3) -> dict:
+    """Full-graph training epoch and inference time of a packaged hetero model."""
+    from src.models.trainer import trainer_from_config
+
+    tx = data['transaction']
+    graph = {
+        'x_dict': {t: data[t].x for t in data.node_types},
+        'edge_index_dict': {et: data[et].edge_index for et in data.edge_types},
+        'y': tx.y, 'train_mask': tx.train_mask, 'val_mask': tx.val_mask, 'test_mask': tx.test_mask
+    }
+    trainer = trainer_from_config({'model': model_name}, graph)
+    trainer.train_epoch()  # warm-up
+    return {
+        'train.epoch_s': _metric(_median_seconds(trainer.train_epoch, repeats), 's'),
+        'inference.full_graph_s': _metric(_median_seconds(trainer.predict, repeats), 's')
+    }
+
+
+def bench_scoring_latency(data, model_name: str = 'e7_a3', num_requests: int = 200, seed: int = 0) -> dict:
+    """Sequential single-request latency through `ScoringServer` (no batching partners)."""
+    from src.data.adjacency import HeteroAdjacency, trd_edge_index_dict
+    from src.models.hhgtn import build_model
+    from src.models.serving import ScoringServer
+
+    edges = trd_edge_index_dict({et: data[et].edge_index for et in data.edge_types},
+                                {t: data[t].timestamp for t in data.node_types})
+    adjacency = HeteroAdjacency(edges, {t: data[t].num_nodes for t in data.node_types})
+    model = build_model(model_name).eval()
+    x_dict = {t: data[t].x for t in data.node_types}
+    rng = np.random.default_rng(seed)
+
+    async def run():
+        latencies = []
+        async with ScoringServer(model, x_dict, adjacency, max_wait_ms=0) as server:
+            for i, tx_id in enumerate(rng.integers(0, server.num_targets, num_requests + 10)):
+                start = time.perf_counter()
+                await server.score(tx_id=int(tx_id))
+                if i >= 10:  # warm-up
+                    latencies.append((time.perf_counter() - start) * 1000)
+        return latencies
+
+    latencies = np.array(asyncio.run(run()))
+    return {
+        'scoring.p50_ms': _metric(np.percentile(latencies, 50), 'ms'),
+        'scoring.p99_ms': _metric(np.percentile(latencies, 99), 'ms')
+    }
+
+
+def run_suite(
+    num_tx: int = 20_000,
+    work_dir: PathLike = 'data/benchmark',
+    fanouts_list: Sequence[Sequence[int]] = ((10, 10), (25, 10)),
+    batch_sizes: Sequence[int] = (64, 256),
+    model_name: str = 'e7_a3',
+    repeats: int = 3,
+    seed: int = 0
+) -> dict:
+    """
+    Run all benchmarks on a generated graph of `num_tx` transactions.
+
+    Returns:
+        {'config', 'environment', 'metrics'}; metrics map name -> {value, unit, higher_is_better}
+    """
+    work_dir = Path(work_dir) / f'elliptic_like_{num_tx}'
+    if not (work_dir / 'AddrAddr_edgelist.csv').exists():
+        print(f"Generating Elliptic++-shaped graph ({num_tx:,} transactions): {work_dir}")
+        generate_elliptic_like(work_dir, num_tx, seed=seed)
+
+    metrics = {}
+    print(" Graph build...")
+    build_metrics, data = bench_graph_build(work_dir)
+    metrics.update(build_metrics)
+    print(" TRD sampler...")
+    metrics.update(bench_trd_sampler(data, fanouts_list, batch_sizes, repeats, seed))
+    print(" Training / inference...")
+    metrics.update(bench_training(data, model_name, repeats))
+    print(" Scoring latency...")
+    metrics.update(bench_scoring_latency(data, model_name, seed=seed))
+    print(" CLI startup...")
+    metrics.update(bench_cli_startup(max(repeats, 5)))
+    metrics['memory.peak_rss_mb'] = _metric(peak_rss_mb(), 'MB')
+
+    return {
+        'config': {'num_tx': num_tx, 'num_addr': data['address'].num_nodes,
+                   'num_edges': int(sum(data[et].num_edges for et in data.edge_types)),
+                   'fanouts': [list(f) for f in fanouts_list], 'batch_sizes': list(batch_sizes),
+                   'model': model_name, 'repeats': repeats},
+        'environment': {'python': platform.python_version(), 'torch': torch.__version__,
+                        'cpu_count': os.cpu_count(), 'threads': torch.get_num_threads(),
+                        'machine': platform.machine()},
+        'metrics': metrics
+    }
+
+
+def compare_to_baseline(current: dict, baseline: dict, tolerance: float = 0.2,
+                        tolerances: Optional[Dict[str, float]] = None) -> List[dict]:
+    """
+    Metrics that regressed by more than the relative tolerance (and by
+    more than the unit's absolute noise floor, see `NOISE_FLOORS`).
+
+    Args:
+        current: Result of `run_suite`
+        baseline: Stored result of an earlier `run_suite`
+        tolerance: Allowed relative slowdown (0.2 = 20% slower / lower throughput)
+        tolerances: Per-metric overrides (e.g. looser for p99 latency)
+
+    Returns:
+        One record per regression (metric, baseline, current, change)
+    """
+    regressions = []
+    for name, base in baseline['metrics'].items():
+        if name not in current['metrics'] or base['value'] <= 0:
+            continue
+        value = current['metrics'][name]['value']
+        change = value / base['value'] - 1
+        allowed = (tolerances or {}).get(name, tolerance)
+        worse = -change if base['higher_is_better'] else change
+        if worse > allowed and abs(value - base['value']) > NOISE_FLOORS.get(base['unit'], 0.0):
+            regressions.append({'metric': name, 'baseline': base['value'], 'current': value,
+                                'change': change, 'tolerance': allowed})
+    return regressions
+
+
+def save_results(results: dict, path: PathLike) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+    return path
+
+
+def load_results(path: PathLike) -> dict:
+    with open(path) as f:
+        return json.load(f)
@@ -0,0 +1,164 @@
+"""
+Torch-Native Metrics for Imbalanced Fraud Evaluation
+
+One definition for every experiment:
+- PR-AUC:   average precision (step-wise, as sklearn `average_precision_score`)
+- ROC-AUC:  trapezoidal area under the ROC curve (as sklearn `roc_auc_score`)
+- Best F1:  max F1 over all distinct score thresholds (predict fraud if score >= t)
+- Recall@k%: share of frauds among the top k% scores (k = max(1, int(N * k%)))
+
+All curves come from a single sort of the scores; computations run in
+float64 on the scores' device, with no numpy round trips. Values are
+exact (they match sklearn to 1e-6), so every score is kept until
+`compute`: memory is O(N) in the evaluated rows, not bounded.
+"""
+import torch
+from typing import Dict, Sequence, Tuple
+
+
+def _as_tensors(y_true, y_score) -> Tuple[torch.Tensor, torch.Tensor]:
+    y_score = torch.as_tensor(y_score).detach().reshape(-1).double()
+    y_true = torch.as_tensor(y_true, device=y_score.device).detach().reshape(-1).double()
+    return y_true, y_score
+
+
+def binary_clf_curve(y_true, y_score) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+    """
+    False/true positive counts at every distinct threshold (descending).
+
+    Returns:
+        fps: [T] false positives with score >= threshold
+        tps: [T] true positives with score >= threshold
+        thresholds: [T] distinct scores, descending
+    """
+    y_true, y_score = _as_tensors(y_true, y_score)
+    order = torch.argsort(y_score, descending=True, stable=True)
+    score, y = y_score[order], y_true[order]
+    # Last index of each run of tied scores
+    last = torch.nonzero(score[1:] != score[:-1]).view(-1)
+    last = torch.cat([last, last.new_tensor([score.numel() - 1])])
+    tps = torch.cumsum(y, dim=0)[last]
+    fps = (last + 1).double() - tps
+    return fps, tps, score[last]
+
+
+def _pr_auc(fps: torch.Tensor, tps: torch.Tensor) -> float:
+    if tps.numel() == 0 or tps[-1] == 0:
+        return float('nan')
+    precision = tps / (tps + fps)
+    recall = tps / tps[-1]
+    return float((torch.diff(recall, prepend=recall.new_zeros(1)) * precision).sum())
+
+
+def _roc_auc(fps: torch.Tensor, tps: torch.Tensor) -> float:
+    if tps.numel() == 0 or tps[-1] == 0 or fps[-1] == 0:
+        return float('nan')
+    zero = tps.new_zeros(1)
+    return float(torch.trapezoid(torch.cat([zero, tps / tps[-1]]), torch.cat([zero, fps / fps[-1]])))
+
+
+def _best_f1(fps: torch.Tensor, tps: torch.Tensor, thresholds: torch.Tensor) -> Tuple[float, float]:
+    if tps.numel() == 0 or tps[-1] == 0:
+        return 0.0, 0.5
+    # F1 = 2TP / (2TP + FP + FN), FN = P - TP
+    f1 = 2 * tps / (tps + fps + tps[-1])
+    best = int(torch.argmax(f1))
+    return float(f1[best]), float(thresholds[best])
+
+
+def pr_auc(y_true, y_score) -> float:
+    """Average precision; NaN when there are no positives."""
+    return _pr_auc(*binary_clf_curve(y_true, y_score)[:2])
+
+
+def roc_auc(y_true, y_score) -> float:
+    """Area under the ROC curve; NaN when only one class is present."""
+    return _roc_auc(*binary_clf_curve(y_true, y_score)[:2])
+
+
+def best_f1(y_true, y_score) -> Tuple[float, float]:
+    """
+    Best F1 over all distinct thresholds.
+
+    Returns:
+        (f1, threshold) with predictions `score >= threshold`
+    """
+    return _best_f1(*binary_clf_curve(y_true, y_score))
+
+
+def recall_at_k(y_true, y_score, k_frac: float = 0.01) -> float:
+    """Recall among the top `k_frac` scores (partial selection via `topk`)."""
+    y_true, y_score = _as_tensors(y_true, y_score)
+    num_pos = y_true.sum()
+    if num_pos == 0:
+        return float('nan')
+    k = max(1, int(y_score.numel() * k_frac))
+    top = torch.topk(y_score, k, sorted=False).indices
+    return float(y_true[top].sum() / num_pos)
+
+
+def binary_metrics(y_true, y_score, k_fracs: Sequence[float] = (0.005, 0.01, 0.02)) -> Dict[str, float]:
+    """
+    PR-AUC, ROC-AUC, best F1 (+ threshold) and recall@k% in one pass.
+
+    Args:
+        y_true: [N] binary labels (tensor or array)
+        y_score: [N] fraud scores / probabilities
+        k_fracs: Fractions for recall@k%
+
+    Returns:
+        Dict with pr_auc, roc_auc, best_f1, best_threshold and recall@{k}%
+    """
+    y_true, y_score = _as_tensors(y_true, y_score)
+    fps, tps, thresholds = binary_clf_curve(y_true, y_score)
+    f1, threshold = _best_f1(fps, tps, thresholds)
+    results = {
+        'pr_auc': _pr_auc(fps, tps),
+        'roc_auc': _roc_auc(fps, tps),
+        'best_f1': f1,
+        'best_threshold': threshold
+    }
+    for k_frac in k_fracs:
+        results[f'recall@{k_frac * 100:g}%'] = recall_at_k(y_true, y_score, k_frac)
+    return results
+
+
+class StreamingMetrics:
+    """
+    Accumulates scores over mini-batches and computes exact metrics at the end.
+
+    Scores and labels are kept on their device; rows with label < 0
+    (unknown class) are dropped on update. Exactness needs every score,
+    so memory grows with the number of rows (O(N), ~16 bytes per fp64
+    score/label pair at compute time); it is meant for a validation/test
+    split, not an unbounded stream.
+
+    Example:
+        metrics = StreamingMetrics()
+        for batch in loader:
+            metrics.update(torch.sigmoid(model(batch)), batch.y)
+        results = metrics.compute()
+    """
+
+    def __init__(self, k_fracs: Sequence[float] = (0.005, 0.01, 0.02)):
+        self.k_fracs = tuple(k_fracs)
+        self.reset()
+
+    def reset(self):
+        self._scores, self._labels = [], []
+
+    def update(self, y_score: torch.Tensor, y_true: torch.Tensor):
+        y_score = y_score.detach().reshape(-1)
+        y_true = y_true.detach().reshape(-1).to(y_score.device)
+        known = y_true >= 0
+        self._scores.append(y_score[known])
+        self._labels.append(y_true[known])
+
+    @property
+    def num_samples(self) -> int:
+        return sum(s.numel() for s in self._scores)
+
+    def compute(self) -> Dict[str, float]:
+        if not self._scores:
+            raise ValueError("No samples accumulated")
+        return binary_metrics(torch.cat(self._labels), torch.cat(self._scores), self.k_fracs)
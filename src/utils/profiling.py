@@ -0,0 +1,198 @@
+"""
+torch.profiler Integration with Per-Relation Cost Breakdown
+
+`label_relations(model)` attaches hooks that wrap every relation's
+convolution inside a `HeteroConv` (and any `semantic_attention` block) in
+`record_function` ranges:
+
+    relation:<src>-><dst>            forward of one relation, all layers
+    relation:<src>-><dst>_backward   its backward (autograd marker nodes)
+    semantic_attention[_backward]    relation-level attention, if present
+
+`profile_trainer` runs a scheduled window of training or inference steps
+of a `FullGraphTrainer` under `torch.profiler` and writes:
+
+    <dir>/trace.json        Chrome trace (chrome://tracing, Perfetto)
+    <dir>/summary.txt       op tables sorted by self CPU time and memory
+    <dir>/relations.json    per-range totals (the breakdown above)
+"""
+import json
+from pathlib import Path
+from typing import Dict, List, Union
+
+import torch
+import torch.nn as nn
+from torch.profiler import ProfilerActivity, profile, record_function, schedule
+from torch_geometric.nn import HeteroConv
+
+
+PathLike = Union[str, Path]
+
+
+class _RangeStart(torch.autograd.Function):
+    """Identity on a module's outputs; opens the backward range when their gradients arrive."""
+
+    @staticmethod
+    def forward(ctx, state, *tensors):
+        ctx.state = state
+        return tuple(t.view_as(t) for t in tensors)
+
+    @staticmethod
+    def backward(ctx, *grads):
+        ctx.state['range'] = record_function(ctx.state['name']).__enter__()
+        return (None, *grads)
+
+
+class _RangeEnd(torch.autograd.Function):
+    """Identity on a module's inputs; closes the backward range once their gradients are done."""
+
+    @staticmethod
+    def forward(ctx, state, *tensors):
+        ctx.state = state
+        return tuple(t.view_as(t) for t in tensors)
+
+    @staticmethod
+    def backward(ctx, *grads):
+        rf = ctx.state.pop('range', None)
+        if rf is not None:
+            rf.__exit__(None, None, None)
+        return (None, *grads)
+
+
+def _mark(fn, state: dict, tensors: tuple) -> tuple:
+    """Apply a range marker to the grad-requiring tensors of `tensors`."""
+    idx = [i for i, t in enumerate(tensors) if isinstance(t, torch.Tensor) and t.requires_grad]
+    if not idx:
+        return tensors
+    marked = fn.apply(state, *(tensors[i] for i in idx))
+    out = list(tensors)
+    for i, t in zip(idx, marked):
+        out[i] = t
+    return tuple(out)
+
+
+def _attach(module: nn.Module, name: str) -> List:
+    """Forward + backward `record_function` ranges around `module`."""
+    forward_range = {}
+
+    def pre_hook(mod, args):
+        forward_range['rf'] = record_function(name).__enter__()
+        if not torch.is_grad_enabled():
+            return None
+        state = {'name': f'{name}_backward'}
+        forward_range['state'] = state
+        # HeteroConv passes the (x_src, x_dst) pair as the first argument
+        if args and isinstance(args[0], tuple):
+            return (_mark(_RangeEnd, state, args[0]), *args[1:])
+        return _mark(_RangeEnd, state, args)
+
+    def hook(mod, args, output):
+        forward_range.pop('rf').__exit__(None, None, None)
+        state = forward_range.pop('state', None)
+        if state is None:
+            return None
+        if isinstance(output, torch.Tensor):
+            return _mark(_RangeStart, state, (output,))[0]
+        if isinstance(output, tuple):
+            return _mark(_RangeStart, state, output)
+        return None
+
+    return [module.register_forward_pre_hook(pre_hook), module.register_forward_hook(hook)]
+
+
+def label_relations(model: nn.Module) -> List:
+    """
+    Wrap each relation convolution and semantic-attention block of `model`
+    in named profiler ranges.
+
+    Ranges are named `relation:<src>-><dst>`; relations other than `to`
+    (e.g. co_address) add their name, `relation:<src>-<rel>-><dst>`, so
+    parallel relations between the same node types stay separate.
+    Convolutions shared between layers (e.g. SimplifiedHHGTN's conv1 and
+    conv2) are labeled once, so every call opens exactly one range.
+
+    Returns:
+        Hook handles; call `.remove()` on each to detach
+    """
+    handles = []
+    labeled = set()
+    for module_name, module in model.named_modules():
+        if isinstance(module, HeteroConv):
+            for (src, rel, dst), conv in module.convs.items():
+                if id(conv) in labeled:
+                    continue
+                labeled.add(id(conv))
+                name = f'{src}->{dst}' if rel == 'to' else f'{src}-{rel}->{dst}'
+                handles += _attach(conv, f'relation:{name}')
+        elif module_name.split('.')[-1] == 'semantic_attention':
+            handles += _attach(module, 'semantic_attention')
+    return handles
+
+
+def relation_breakdown(events) -> Dict[str, dict]:
+    """Totals of the labeled ranges from `prof.key_averages()`."""
+    return {
+        e.key: {
+            'calls': e.count,
+            'cpu_ms': e.cpu_time_total / 1e3,
+            'cpu_memory_mb': e.cpu_memory_usage / 2 ** 20
+        }
+        for e in sorted(events, key=lambda e: -e.cpu_time_total)
+        if e.key.startswith(('relation', 'semantic_attention'))
+    }
+
+
+def profile_trainer(
+    trainer,
+    output_dir: PathLike,
+    mode: str = 'train',
+    wait: int = 1,
+    warmup: int = 1,
+    active: int = 3,
+    row_limit: int = 30
+) -> dict:
+    """
+    Profile a window of full-graph training or inference steps.
+
+    Args:
+        trainer: `FullGraphTrainer` (train: `train_epoch`, inference: `predict`)
+        output_dir: Where trace.json / summary.txt / relations.json go
+        mode: 'train' (forward + backward + step) or 'inference'
+        wait, warmup, active: `torch.profiler.schedule` window; only the
+            `active` steps are recorded
+        row_limit: Rows per summary table
+
+    Returns:
+        Dict with mode, steps and the per-relation breakdown
+    """
+    if mode not in ('train', 'inference'):
+        raise ValueError(f"Unknown mode: {mode}")
+    step_fn = trainer.train_epoch if mode == 'train' else trainer.predict
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    handles = label_relations(trainer.model)
+    try:
+        with profile(activities=[ProfilerActivity.CPU], profile_memory=True, record_shapes=True,
+                     schedule=schedule(wait=wait, warmup=warmup, active=active, repeat=1)) as prof:
+            for _ in range(wait + warmup + active):
+                with record_function(f'{mode}_step'):
+                    step_fn()
+                prof.step()
+    finally:
+        for h in handles:
+            h.remove()
+
+    prof.export_chrome_trace(str(output_dir / 'trace.json'))
+    events = prof.key_averages()
+    with open(output_dir / 'summary.txt', 'w') as f:
+        f.write(f"# Sorted by self CPU time ({mode}, {active} steps)\n")
+        f.write(events.table(sort_by='self_cpu_time_total', row_limit=row_limit))
+        f.write(f"\n\n# Sorted by self CPU memory ({mode}, {active} steps)\n")
+        f.write(events.table(sort_by='self_cpu_memory_usage', row_limit=row_limit))
+
+    report = {'mode': mode, 'steps': active, 'relations': relation_breakdown(events)}
+    with open(output_dir / 'relations.json', 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f" Saved profile: {output_dir}")
+    return report
@@ -0,0 +1,224 @@
+"""
+Parallel Sweep Runner for Hyperparameter / Ablation Configs
+
+Runs configurations concurrently in a process pool. The graph is written
+once to a torch file and every worker maps it with `torch.load(mmap=True)`,
+so all workers share the same page-cache copy instead of holding one graph
+each. Intra-op threads are split across workers (cores // workers) to avoid
+oversubscription.
+
+Results are appended to `<output_dir>/<name>.csv` and `<name>.json` as
+soon as each run finishes, so a partial sweep is never lost.
+
+Config file (JSON) formats:
+    {"runs": [{"name": "A1", "model": "simplified_hhgtn", ...}, ...]}
+    {"base": {...}, "grid": {"hidden_dim": [64, 128], "dropout": [0.2, 0.4]}}
+"""
+import csv
+import itertools
+import json
+import os
+import time
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import torch
+
+
+PathLike = Union[str, Path]
+
+# Per-process graph shared by all runs of a worker
+_GRAPH = None
+
+
+def expand_grid(grid: Dict[str, list], base: Optional[dict] = None) -> List[dict]:
+    """Cartesian product of `grid` values on top of `base`, with generated run names."""
+    base = base or {}
+    keys = list(grid)
+    configs = []
+    for values in itertools.product(*(grid[k] for k in keys)):
+        config = {**base, **dict(zip(keys, values))}
+        if 'name' not in grid:
+            suffix = '_'.join(f'{k}={json.dumps(v, separators=(",", ":"))}' for k, v in zip(keys, values))
+            config['name'] = f"{base.get('name', 'run')}_{suffix}" if suffix else base.get('name', 'run')
+        configs.append(config)
+    return configs
+
+
+def load_sweep_config(path: PathLike) -> List[dict]:
+    """Read a sweep file (`runs` list and/or `base` + `grid`) into run configs."""
+    with open(path) as f:
+        spec = json.load(f)
+    configs = [{**spec.get('base', {}), **run} for run in spec.get('runs', [])]
+    if 'grid' in spec:
+        configs += expand_grid(spec['grid'], spec.get('base'))
+    names = [c.get('name') for c in configs]
+    if len(set(names)) != len(names) or None in names:
+        raise ValueError("Every run config needs a unique 'name'")
+    return configs
+
+
+def share_graph(data, path: PathLike) -> Path:
+    """
+    Write the tensors a run needs from a HeteroData graph to one file.
+
+    Returns:
+        Path for `load_shared_graph`
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tx = data['transaction']
+    torch.save({
+        'x_dict': {t: data[t].x for t in data.node_types},
+        'edge_index_dict': {et: data[et].edge_index for et in data.edge_types},
+        'y': tx.y,
+        'train_mask': tx.train_mask,
+        'val_mask': tx.val_mask,
+        'test_mask': tx.test_mask
+    }, path)
+    return path
+
+
+def load_shared_graph(path: PathLike) -> dict:
+    """Memory-map a graph written by `share_graph` (pages are shared across processes)."""
+    return torch.load(path, map_location='cpu', mmap=True, weights_only=True)
+
+
+@contextmanager
+def num_threads(n: int):
+    """Set torch intra-op threads for the block and restore the caller's setting after."""
+    previous = torch.get_num_threads()
+    torch.set_num_threads(n)
+    try:
+        yield
+    finally:
+        torch.set_num_threads(previous)
+
+
+def _init_worker(graph_path: str, num_threads: int):
+    global _GRAPH
+    torch.set_num_threads(num_threads)
+    _GRAPH = load_shared_graph(graph_path)
+
+
+def run_config(config: dict, graph: Optional[dict] = None) -> dict:
+    """Train one config to completion and return its result record."""
+    from src.models.trainer import trainer_from_config
+
+    graph = _GRAPH if graph is None else graph
+    start = time.perf_counter()
+    trainer = trainer_from_config(config, graph)
+    result = trainer.fit(config.get('max_epochs', 100), config.get('patience', 15), verbose=False)
+    return {
+        'name': config['name'],
+        'config': config,
+        'best_epoch': result['best_epoch'],
+        'epochs_run': len(result['history']['val_pr_auc']),
+        'train_seconds': time.perf_counter() - start,
+        'threads': torch.get_num_threads(),
+        'pid': os.getpid(),
+        **{split: result[split] for split in ('train', 'val', 'test')},
+        'history': result['history']
+    }
+
+
+class ResultsWriter:
+    """Append-as-you-go CSV (flat metrics) and JSON (full records) writer."""
+
+    def __init__(self, output_dir: PathLike, name: str):
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        self.csv_path = output_dir / f'{name}.csv'
+        self.json_path = output_dir / f'{name}.json'
+        self.records = []
+        self._fields = None
+        self.csv_path.unlink(missing_ok=True)
+
+    @staticmethod
+    def flatten(record: dict) -> dict:
+        row = {'name': record['name']}
+        row.update({f'cfg_{k}': json.dumps(v) if isinstance(v, (list, dict)) else v
+                    for k, v in record['config'].items() if k != 'name'})
+        for split in ('val', 'test'):
+            row.update({f'{split}_{k}': v for k, v in record[split].items()})
+        row.update({k: record[k] for k in ('best_epoch', 'epochs_run', 'train_seconds', 'threads')})
+        return row
+
+    def append(self, record: dict):
+        self.records.append(record)
+        row = self.flatten(record)
+        new_file = self._fields is None
+        if new_file:
+            self._fields = list(row)
+        with open(self.csv_path, 'a', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=self._fields, extrasaction='ignore')
+            if new_file:
+                writer.writeheader()
+            writer.writerow(row)
+        tmp = self.json_path.with_suffix('.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(self.records, f, indent=2)
+        os.replace(tmp, self.json_path)
+
+
+def run_sweep(
+    configs: List[dict],
+    graph_path: PathLike,
+    output_dir: PathLike = 'reports/sweeps',
+    name: str = 'sweep',
+    workers: Optional[int] = None,
+    threads_per_worker: Optional[int] = None
+) -> List[dict]:
+    """
+    Run all configs, `workers` at a time, writing results as they finish.
+
+    Args:
+        configs: Run configs (see `trainer_from_config`; plus max_epochs, patience)
+        graph_path: File written by `share_graph`
+        output_dir: Where `<name>.csv` / `<name>.json` go
+        name: Sweep name
+        workers: Concurrent runs (default: min(#configs, #cores))
+        threads_per_worker: Intra-op threads per run (default: #cores // workers)
+
+    Returns:
+        Result records in completion order
+    """
+    num_cores = os.cpu_count() or 1
+    workers = workers or min(len(configs), num_cores)
+    threads = threads_per_worker or max(1, num_cores // workers)
+    writer = ResultsWriter(output_dir, name)
+
+    print(f"Sweep '{name}': {len(configs)} runs, {workers} workers x {threads} threads")
+    start = time.perf_counter()
+
+    def report(record):
+        writer.append(record)
+        print(f"   [{len(writer.records)}/{len(configs)}] {record['name']}: "
+              f"val PR-AUC {record['val']['pr_auc']:.4f}, test PR-AUC {record['test']['pr_auc']:.4f} "
+              f"({record['train_seconds']:.1f}s, {record['epochs_run']} epochs)")
+
+    if workers == 1:
+        # In-process: leave the caller's thread count and the worker global untouched
+        graph = load_shared_graph(graph_path)
+        with num_threads(threads):
+            for config in configs:
+                try:
+                    report(run_config(config, graph))
+                except Exception as e:
+                    print(f"   {config['name']} failed: {type(e).__name__}: {e}")
+    else:
+        # spawn: forked children would inherit the parent's OpenMP state
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context('spawn'),
+                                 initializer=_init_worker, initargs=(str(graph_path), threads)) as pool:
+            futures = {pool.submit(run_config, config): config['name'] for config in configs}
+            for future in as_completed(futures):
+                try:
+                    report(future.result())
+                except Exception as e:
+                    print(f"   {futures[future]} failed: {type(e).__name__}: {e}")
+
+    print(f" Sweep done in {time.perf_counter() - start:.1f}s -> {writer.csv_path}")
+    return writer.records
@@ -0,0 +1,62 @@
+"""Shared fixtures: small random transaction/address graphs"""
+import pytest
+import torch
+from torch_geometric.data import HeteroData
+
+from src.models.hhgtn import ALL_EDGE_TYPES
+
+
+def random_hetero_graph(num_tx=100, num_addr=50, num_edges=300, num_steps=5, seed=0, edge_types=ALL_EDGE_TYPES):
+    """
+    Random graph with model-sized features (93 tx / 55 address).
+
+    Returns:
+        {'x_dict', 'edge_index_dict' (raw relations), 'time_dict' (1..num_steps),
+         'y' (~20% positives), train/val/test masks (first half / next
+         quarter / rest of the transactions), 'num_nodes'}
+    """
+    g = torch.Generator().manual_seed(seed)
+    sizes = {'transaction': num_tx, 'address': num_addr}
+    idx = torch.arange(num_tx)
+    return {
+        'x_dict': {'transaction': torch.randn(num_tx, 93, generator=g),
+                   'address': torch.randn(num_addr, 55, generator=g)},
+        'edge_index_dict': {
+            et: torch.stack([
+                torch.randint(0, sizes[et[0]], (num_edges,), generator=g),
+                torch.randint(0, sizes[et[2]], (num_edges,), generator=g)
+            ])
+            for et in edge_types
+        },
+        'time_dict': {t: torch.randint(1, num_steps + 1, (n,), generator=g) for t, n in sizes.items()},
+        'y': (torch.rand(num_tx, generator=g) < 0.2).long(),
+        'train_mask': idx < num_tx // 2,
+        'val_mask': (idx >= num_tx // 2) & (idx < 3 * num_tx // 4),
+        'test_mask': idx >= 3 * num_tx // 4,
+        'num_nodes': sizes
+    }
+
+
+def to_hetero_data(graph) -> HeteroData:
+    """HeteroData with x / timestamp per node type, transaction labels and masks, and the relations."""
+    data = HeteroData()
+    for node_type, x in graph['x_dict'].items():
+        data[node_type].x = x
+        data[node_type].timestamp = graph['time_dict'][node_type]
+    for key in ('y', 'train_mask', 'val_mask', 'test_mask'):
+        data['transaction'][key] = graph[key]
+    for edge_type, edge_index in graph['edge_index_dict'].items():
+        data[edge_type].edge_index = edge_index
+    return data
+
+
+@pytest.fixture
+def make_graph():
+    """Factory fixture for `random_hetero_graph` (keyword args pass through)."""
+    return random_hetero_graph
+
+
+@pytest.fixture
+def make_hetero_data():
+    """Factory fixture: `random_hetero_graph(**kwargs)` as a HeteroData object."""
+    return lambda **kwargs: to_hetero_data(random_hetero_graph(**kwargs))
@@ -0,0 +1,66 @@
+"""Tests for the ASHA successive-halving scheduler"""
+import json
+import torch
+from src.utils.asha import ASHAScheduler, run_asha, rung_epochs
+from src.utils.sweep import share_graph
+
+
+def test_rung_epochs():
+    assert rung_epochs(5, 100, 3) == [5, 15, 45, 100]
+    assert rung_epochs(1, 9, 3) == [1, 3, 9]
+    assert rung_epochs(10, 10, 3) == [10]
+
+
+def _drive(scheduler, score):
+    """Run a scheduler to completion sequentially; returns the jobs in order."""
+    jobs = []
+    while (job := scheduler.next_job() or scheduler.flush()) is not None:
+        jobs.append(job)
+        scheduler.report(job[0], job[1], score(*job))
+    return jobs
+
+
+def test_promotes_top_fraction(tmp_path):
+    """Only the top 1/eta of each rung is resumed; decisions are logged."""
+    names = [f't{i}' for i in range(9)]
+    scheduler = ASHAScheduler(names, min_epochs=1, max_epochs=9, reduction_factor=3,
+                              log_path=tmp_path / 'rungs.jsonl')
+    jobs = _drive(scheduler, lambda trial, rung: -trial + rung)
+    last_rung = scheduler.finalize()
+
+    assert sum(1 for _, r in jobs if r == 0) == 9
+    assert {t for t, r in jobs if r == 1} == {0, 1, 2}
+    assert {t for t, r in jobs if r == 2} == {0}
+    assert [t for t, r in last_rung.items() if r == 2] == [0]
+
+    events = [json.loads(line) for line in (tmp_path / 'rungs.jsonl').read_text().splitlines()]
+    promotions = [e for e in events if e['event'] == 'promote']
+    assert len(promotions) == 4
+    assert all(e['rank'] <= e['of'] // 3 for e in promotions)
+    assert sum(e['event'] == 'stop' for e in events) == 8
+
+
+def test_flush_reaches_top_rung():
+    """Small searches still train one trial to max_epochs."""
+    scheduler = ASHAScheduler(['a', 'b', 'c', 'd'], min_epochs=1, max_epochs=27, reduction_factor=3)
+    jobs = _drive(scheduler, lambda trial, rung: float(trial == 2))
+    assert jobs[-1] == (2, 3)
+    assert max(r for t, r in jobs if t != 2) == 0
+
+
+def test_run_asha_end_to_end(tmp_path, make_hetero_data):
+    """Trials resume from checkpoints and the summary accounts for compute saved."""
+    graph_path = share_graph(make_hetero_data(num_tx=80, num_addr=40, num_edges=200), tmp_path / 'graph.pt')
+    configs = [{'name': f'h{h}_lr{lr}', 'model': 'e7_a3', 'hidden_dim': h, 'lr': lr}
+               for h in (4, 8) for lr in (0.01, 0.001)]
+
+    summary = run_asha(configs, graph_path, tmp_path / 'work', tmp_path / 'out', 'search',
+                       min_epochs=1, max_epochs=4, reduction_factor=2)
+
+    assert summary['rungs'] == [1, 2, 4]
+    assert summary['epochs_run'] < summary['epochs_full_budget']
+    best = summary['trials'][0]
+    assert best['last_rung'] == 2 and 'test' in best
+    state = torch.load(tmp_path / 'work' / f"{best['name']}.pt", weights_only=False)
+    assert state['trainer']['epoch'] == 4 and len(state['history']) == 4
+    assert (tmp_path / 'out' / 'search_rungs.jsonl').exists()
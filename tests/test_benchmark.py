@@ -0,0 +1,49 @@
+"""Tests for the benchmark suite and regression check"""
+from src.utils.benchmark import bench_graph_build, compare_to_baseline, generate_elliptic_like, run_suite
+
+
+def _results(**values):
+    return {'metrics': {
+        name: {'value': v, 'unit': 'targets/s' if 'per_s' in name else 's',
+               'higher_is_better': 'per_s' in name}
+        for name, v in values.items()
+    }}
+
+
+def test_generated_graph_loads_with_builder(tmp_path):
+    """The generated CSVs go through every HeteroGraphBuilder stage."""
+    generate_elliptic_like(tmp_path, num_tx=500)
+    metrics, data = bench_graph_build(tmp_path)
+
+    assert data['transaction'].x.shape == (500, 93)
+    assert data['address'].x.shape[1] == 55
+    assert int(data['transaction'].timestamp.max()) <= 49
+    assert all(data[et].num_edges > 0 for et in data.edge_types)
+    # tx-tx edges stay inside one time step
+    e = data['transaction', 'to', 'transaction'].edge_index
+    assert (data['transaction'].timestamp[e[0]] == data['transaction'].timestamp[e[1]]).all()
+    assert {'build.transactions_s', 'build.edges_addr-addr_s', 'build.total_s'} <= set(metrics)
+
+
+def test_compare_to_baseline_directions():
+    """Slower times and lower throughputs beyond tolerance are regressions; noise is not."""
+    baseline = _results(**{'train.epoch_s': 1.0, 'sampler.targets_per_s': 1000.0})
+
+    assert compare_to_baseline(_results(**{'train.epoch_s': 1.1, 'sampler.targets_per_s': 950.0}), baseline) == []
+    assert compare_to_baseline(_results(**{'train.epoch_s': 0.5, 'sampler.targets_per_s': 2000.0}), baseline) == []
+    regressions = compare_to_baseline(_results(**{'train.epoch_s': 1.5, 'sampler.targets_per_s': 700.0}),
+                                      baseline, tolerance=0.2)
+    assert {r['metric'] for r in regressions} == {'train.epoch_s', 'sampler.targets_per_s'}
+    assert compare_to_baseline(_results(**{'train.epoch_s': 1.5}), baseline,
+                               tolerances={'train.epoch_s': 0.6}) == []
+    # Sub-millisecond jitter on tiny timings is ignored
+    assert compare_to_baseline(_results(**{'train.epoch_s': 0.002}), _results(**{'train.epoch_s': 0.001})) == []
+
+
+def test_run_suite_reports_all_metric_groups(tmp_path):
+    """A tiny end-to-end run produces every metric group."""
+    results = run_suite(num_tx=300, work_dir=tmp_path, fanouts_list=[(5, 5)], batch_sizes=[16], repeats=1)
+    groups = {name.split('.')[0] for name in results['metrics']}
+
+    assert groups == {'build', 'sampler', 'train', 'inference', 'scoring', 'cli', 'memory'}
+    assert compare_to_baseline(results, results) == []
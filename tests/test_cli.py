@@ -0,0 +1,48 @@
+"""Tests for the trdgnn command-line interface"""
+import json
+import subprocess
+import sys
+
+import pytest
+from src.cli import main
+from src.utils.benchmark import CLI_STARTUP_BUDGET_S, REPO_ROOT, bench_cli_startup, generate_elliptic_like
+
+
+def test_help_does_not_import_heavy_dependencies():
+    code = ("import sys\n"
+            "from src.cli import build_parser\n"
+            "try:\n    build_parser().parse_args(['--help'])\nexcept SystemExit:\n    pass\n"
+            "print(sorted(m for m in ('torch', 'torch_geometric', 'pandas', 'numpy') if m in sys.modules))")
+    out = subprocess.run([sys.executable, '-c', code], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip().splitlines()[-1] == '[]'
+
+    metrics = bench_cli_startup(repeats=3)
+    assert all(m['value'] < CLI_STARTUP_BUDGET_S for m in metrics.values())
+
+
+def test_build_splits_sample_train_score(tmp_path, capsys):
+    root = generate_elliptic_like(tmp_path / 'csv', num_tx=400)
+    main(['build', '--data_root', str(root), '--output_dir', str(tmp_path)])
+    graph = str(tmp_path / 'hetero_graph.pt')
+
+    main(['splits', '--data_root', str(root), '--generate'])
+    splits = json.loads((root / 'splits.json').read_text())
+    assert sum(len(splits[s]) for s in ('train', 'val', 'test')) == 400
+    assert splits['metadata']['train_time_end'] < splits['metadata']['val_time_end']
+
+    main(['sample', '--graph', graph, '--batches', '2', '--batch_size', '8',
+          '--output', str(tmp_path / 'sample.json')])
+    report = json.loads((tmp_path / 'sample.json').read_text())
+    assert report['stats']['calls'] == 2 and report['audit']['leakage_violations'] == 0
+
+    main(['train', '--graph', graph, '--max_epochs', '2', '--output', str(tmp_path / 'train.json'),
+          '--checkpoint', str(tmp_path / 'model.pt')])
+    assert 'pr_auc' in json.loads((tmp_path / 'train.json').read_text())['test']
+
+    main(['score', '--graph', graph, '--checkpoint', str(tmp_path / 'model.pt'),
+          '--output', str(tmp_path / 'scores.csv')])
+    lines = (tmp_path / 'scores.csv').read_text().splitlines()
+    assert lines[0] == 'tx_index,fraud_prob' and len(lines) == 401
+
+    with pytest.raises(SystemExit):
+        main(['train', '--model', 'unknown'])
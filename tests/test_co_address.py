@@ -0,0 +1,69 @@
+"""Tests for the derived tx-address-tx co-address relation"""
+import torch
+from src.data.co_address import CO_ADDRESS, add_co_address_relation, co_address_edges, incidence_matrix
+from src.models.hhgtn import build_model
+
+
+def test_sparse_product_matches_dense_and_obeys_trd(make_hetero_data):
+    """Edges are shared-address pairs (weight = count) with time(src) <= time(dst)."""
+    data = make_hetero_data(num_tx=40, num_addr=10, num_edges=80)
+    incidence = incidence_matrix({et: data[et].edge_index for et in data.edge_types}, 40, 10)
+    t = data['transaction'].timestamp
+    edge_index, weight, stats = co_address_edges(incidence, t, max_address_degree=None)
+
+    dense = incidence.to_dense()
+    shared = dense @ dense.t()
+    expected = {(u, v): int(shared[u, v]) for u in range(40) for v in range(40)
+                if u != v and shared[u, v] > 0 and t[u] <= t[v]}
+    assert {(int(u), int(v)): int(w) for (u, v), w in zip(edge_index.t(), weight)} == expected
+    assert stats['co_address_edges'] == len(expected) and stats['capped_addresses'] == 0
+
+
+def test_degree_cap_is_causal():
+    """On a hub, each transaction keeps its newest earlier (or same-time) co-address sources."""
+    tx = torch.arange(10)
+    incidence = incidence_matrix({('transaction', 'to', 'address'): torch.stack([tx, torch.zeros(10, dtype=torch.long)])},
+                                 10, 1)
+    t = torch.tensor([1, 2, 3, 4, 5, 6, 7, 8, 9, 9])
+    edge_index, _, stats = co_address_edges(incidence, t, max_address_degree=3)
+
+    sources = {v: set() for v in range(10)}
+    for u, v in edge_index.t().tolist():
+        sources[v].add(u)
+    assert sources[0] == set() and sources[2] == {0, 1} and sources[3] == {0, 1, 2}
+    # 8 and 9 share a timestamp, so each is the newest source of the other
+    assert sources[8] == {9, 7, 6} and sources[9] == {8, 7, 6}
+    assert stats['capped_addresses'] == 1 and stats['capped_destinations'] == 1
+    assert stats['co_address_pairs'] == 25 and stats['co_address_edges'] == 24
+
+
+def test_capped_edges_ignore_future_transactions(make_hetero_data):
+    """Dropping newer transactions leaves the edges into older ones unchanged."""
+    data = make_hetero_data(num_tx=40, num_addr=10, num_edges=200)
+    t = data['transaction'].timestamp
+    incidence = incidence_matrix({et: data[et].edge_index for et in data.edge_types}, 40, 10)
+    full = co_address_edges(incidence, t, max_address_degree=2)
+
+    tx, addr = incidence.indices()
+    past = t[tx] <= 3
+    prefix = torch.sparse_coo_tensor(incidence.indices()[:, past], torch.ones(int(past.sum())),
+                                     incidence.shape).coalesce()
+    partial = co_address_edges(prefix, t, max_address_degree=2)
+
+    def edges(edge_index, weight):
+        return {(u, v, w) for (u, v), w in zip(edge_index.t().tolist(), weight.tolist()) if t[v] <= 3}
+
+    assert edges(*full[:2]) == edges(*partial[:2]) != set()
+
+
+def test_models_take_co_address_in_one_hop(make_hetero_data):
+    """The builder stage adds a relation that SimplifiedHHGTN can use directly."""
+    data = make_hetero_data(num_tx=40, num_addr=10, num_edges=80)
+    stats = add_co_address_relation(data, max_address_degree=5)
+    assert data[CO_ADDRESS].num_edges == stats['co_address_edges'] > 0
+    assert data[CO_ADDRESS].edge_weight.min() >= 1
+
+    model = build_model('simplified_hhgtn', hidden_dim=8, edge_types_to_use=[CO_ADDRESS])
+    assert CO_ADDRESS in model.conv1.convs and len(model.conv1.convs) == 1
+    out = model({t: data[t].x for t in data.node_types}, {et: data[et].edge_index for et in data.edge_types})
+    assert out.shape == (40,)
@@ -0,0 +1,73 @@
+"""Tests for degree-capped, recency-pruned relation storage"""
+import torch
+from src.data.adjacency import recency_rank
+from src.data.degree_pruning import prune_edges, prune_hetero_graph
+
+
+def test_recency_rank_orders_newest_first():
+    row = torch.tensor([0, 0, 0, 1, 1, 0])
+    time = torch.tensor([3, 7, 5, 1, 2, 7])
+    rank, degree = recency_rank(row, time, 3)
+
+    assert degree.tolist() == [4, 2, 0]
+    # Row 0: ties at time 7 go to the later entry (5), then 1, then 2 (t=5), then 0 (t=3)
+    assert rank.tolist() == [3, 1, 2, 1, 0, 0]
+
+
+def test_prune_keeps_most_recent_past_edges_per_direction():
+    """Each endpoint ranks only edges to neighbors no newer than itself; lost past edges are counted."""
+    # Address 0 (t=9) pays 6 txs (t=1..6); tx 5 (t=6) also receives from addresses 1..4 (t=1..4)
+    edge_index = torch.tensor([[0, 0, 0, 0, 0, 0, 1, 2, 3, 4],
+                               [0, 1, 2, 3, 4, 5, 5, 5, 5, 5]])
+    t_addr = torch.tensor([9, 1, 2, 3, 4])
+    t_tx = torch.tensor([1, 2, 3, 4, 5, 6])
+    keep, out_pruned, in_pruned = prune_edges(edge_index, t_addr, t_tx, 5, 6, max_degree=3)
+
+    # Out-cap: address 0 keeps txs 3, 4, 5; in-cap: tx 5 keeps addresses 4, 3, 2
+    # (address 0 is newer than tx 5, so that edge is address 0's decision)
+    assert edge_index[:, keep].t().tolist() == [[0, 3], [0, 4], [0, 5], [2, 5], [3, 5], [4, 5]]
+    assert out_pruned.tolist() == [3, 0, 0, 0, 0]
+    assert in_pruned.tolist() == [0, 0, 0, 0, 0, 1]
+
+
+def test_appending_later_edges_keeps_older_nodes_unchanged(make_hetero_data):
+    """Pruning decisions and pruned_degree of old nodes ignore everything newer."""
+    full = make_hetero_data(num_tx=60, num_addr=12, num_edges=200, num_steps=9)
+    past = make_hetero_data(num_tx=60, num_addr=12, num_edges=200, num_steps=9)
+    t0 = 5
+
+    def edge_time(data, et):
+        src, dst = data[et].edge_index
+        return torch.maximum(data[et[0]].timestamp[src], data[et[2]].timestamp[dst])
+
+    for et in past.edge_types:
+        past[et].edge_index = past[et].edge_index[:, edge_time(past, et) <= t0]
+    prune_hetero_graph(full, max_degree=3)
+    prune_hetero_graph(past, max_degree=3)
+
+    for et in full.edge_types:
+        old = edge_time(full, et) <= t0
+        assert full[et].edge_index[:, old].tolist() == past[et].edge_index.tolist()
+    for node_type in ('transaction', 'address'):
+        old = full[node_type].timestamp <= t0
+        assert torch.equal(full[node_type].pruned_degree[old], past[node_type].pruned_degree[old])
+    # The cap is active among old nodes too
+    assert past['address'].pruned_degree.sum() > 0
+
+
+def test_prune_hetero_graph_records_features_and_memory(make_hetero_data):
+    data = make_hetero_data(num_tx=60, num_addr=12, num_edges=200, num_steps=9)
+    data['address', 'to', 'address'].edge_weight = torch.arange(200)
+    report = prune_hetero_graph(data, max_degree=4)
+
+    assert set(report['relations']) == {'address_to_transaction', 'transaction_to_address', 'address_to_address'}
+    assert data['transaction', 'to', 'transaction'].num_edges == 200  # no address endpoint: untouched
+    aa = data['address', 'to', 'address']
+    assert aa.edge_weight.numel() == aa.num_edges == report['relations']['address_to_address']['edges_after']
+    assert data['address'].pruned_degree.shape == (12, 4)
+    assert data['transaction'].pruned_degree_names == ['address_to_transaction_in', 'transaction_to_address_out']
+    removed = sum(r['edges_removed'] for r in report['relations'].values())
+    assert removed > 0
+    memory = report['memory']
+    assert memory['edge_bytes_before'] - memory['edge_bytes_after'] == removed * 2 * 8 + (
+        200 - aa.num_edges) * 8
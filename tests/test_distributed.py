@@ -0,0 +1,52 @@
+"""Tests for data-parallel training"""
+import torch
+from src.data.adjacency import HeteroAdjacency
+from src.models.distributed import shard_targets, train_data_parallel
+from src.utils.sweep import share_graph
+
+
+def _adjacency(data):
+    return HeteroAdjacency({et: data[et].edge_index for et in data.edge_types},
+                           {t: data[t].num_nodes for t in data.node_types})
+
+
+def test_shard_targets_disjoint_and_equal():
+    """Shards are equal-sized, disjoint and drop at most world_size - 1 targets."""
+    targets = torch.arange(103)
+    shards = [shard_targets(targets, r, 4) for r in range(4)]
+
+    assert len({s.numel() for s in shards}) == 1
+    merged = torch.cat(shards)
+    assert merged.unique().numel() == merged.numel() == 100
+
+
+def test_sample_respects_fanout(make_hetero_data):
+    """Sampled edges exist in the graph and respect the per-node fanout."""
+    data = make_hetero_data(num_tx=80, num_addr=40, num_edges=200)
+    adjacency = _adjacency(data)
+    seeds = torch.tensor([0, 5, 9])
+    nodes, edges = adjacency.sample({'transaction': seeds}, [2, 2], torch.Generator().manual_seed(0))
+
+    assert torch.isin(seeds, nodes['transaction']).all()
+    for et, e in edges.items():
+        src, dst = nodes[et[0]][e[0]], nodes[et[2]][e[1]]
+        graph_pairs = set(zip(*data[et].edge_index.tolist()))
+        assert set(zip(src.tolist(), dst.tolist())) <= graph_pairs
+        if e.shape[1]:
+            assert torch.bincount(e[1]).max() <= 2
+
+
+def test_ranks_stay_in_sync(tmp_path, make_hetero_data):
+    """Gradient all-reduce keeps the replicas identical."""
+    data = make_hetero_data(num_tx=80, num_addr=40, num_edges=200)
+    graph_path = share_graph(data, tmp_path / 'graph.pt')
+    _adjacency(data).save(tmp_path / 'adj.pt')
+    config = {'model': 'e7_a3', 'hidden_dim': 8, 'epochs': 1, 'batch_size': 8, 'fanouts': [3, 3]}
+
+    result = train_data_parallel(config, graph_path, tmp_path / 'adj.pt', world_size=2, threads_per_rank=1,
+                                 result_path=tmp_path / 'result.json')
+
+    assert result['world_size'] == 2
+    assert result['param_checksums'][0] == result['param_checksums'][1]
+    assert len(result['history']['val_pr_auc']) == 1
+    assert (tmp_path / 'result.pt').exists()
@@ -0,0 +1,86 @@
+"""Tests for the persistent embedding store"""
+import numpy as np
+import torch
+from src.data.embedding_store import EmbeddingStore, build_fusion_features, compute_embeddings
+from src.models.hhgtn import E7_A3_Model
+
+
+def _tiny_hetero_graph(num_tx=20, num_addr=10):
+    torch.manual_seed(0)
+    x_dict = {
+        'transaction': torch.randn(num_tx, 93),
+        'address': torch.randn(num_addr, 55)
+    }
+    edge_index_dict = {
+        ('transaction', 'to', 'transaction'): torch.randint(0, num_tx, (2, 40)),
+        ('address', 'to', 'transaction'): torch.stack([
+            torch.randint(0, num_addr, (30,)), torch.randint(0, num_tx, (30,))
+        ]),
+        ('transaction', 'to', 'address'): torch.stack([
+            torch.randint(0, num_tx, (30,)), torch.randint(0, num_addr, (30,))
+        ]),
+        ('address', 'to', 'address'): torch.randint(0, num_addr, (2, 15)),
+    }
+    return x_dict, edge_index_dict
+
+
+def test_roundtrip_is_memory_mapped(tmp_path):
+    """Stored embeddings come back unchanged as read-only memmaps."""
+    store = EmbeddingStore(tmp_path)
+    emb = {'transaction': torch.randn(5, 4), 'address': torch.randn(3, 4)}
+    store.write('k', emb, metadata={'model': 'test'})
+
+    loaded = store.load('k')
+    assert isinstance(loaded['transaction'], np.memmap)
+    np.testing.assert_allclose(loaded['transaction'], emb['transaction'].numpy())
+    np.testing.assert_allclose(loaded['address'], emb['address'].numpy())
+    assert store.metadata('k')['model'] == 'test'
+    assert store.keys() == ['k']
+
+
+def test_key_tracks_checkpoint_and_graph(tmp_path):
+    """Key changes when either the checkpoint content or graph version changes."""
+    ckpt_a = tmp_path / 'a.pt'
+    ckpt_b = tmp_path / 'b.pt'
+    torch.save({'w': torch.zeros(2)}, ckpt_a)
+    torch.save({'w': torch.ones(2)}, ckpt_b)
+
+    key = EmbeddingStore.make_key(ckpt_a, 'g1')
+    assert key == EmbeddingStore.make_key(ckpt_a, 'g1')
+    assert key != EmbeddingStore.make_key(ckpt_b, 'g1')
+    assert key != EmbeddingStore.make_key(ckpt_a, 'g2')
+
+
+def test_get_or_compute_runs_forward_once(tmp_path):
+    """Second lookup is served from disk without calling the model."""
+    store = EmbeddingStore(tmp_path / 'store')
+    model = E7_A3_Model(hidden_dim=8)
+    x_dict, edge_index_dict = _tiny_hetero_graph()
+
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return compute_embeddings(model, x_dict, edge_index_dict)
+
+    first = store.get_or_compute('key', compute)
+    second = store.get_or_compute('key', compute)
+
+    assert len(calls) == 1
+    assert first['transaction'].shape == (20, 8)
+    np.testing.assert_array_equal(first['transaction'], second['transaction'])
+
+
+def test_fusion_features_standardize_on_train():
+    """Tabular block is standardized with train statistics only."""
+    rng = np.random.default_rng(0)
+    emb = rng.normal(size=(10, 3)).astype(np.float32)
+    tab = rng.normal(loc=5.0, scale=2.0, size=(10, 4))
+    train_mask = np.arange(10) < 6
+
+    fused = build_fusion_features(emb, tab, train_mask)
+
+    assert fused.shape == (10, 7)
+    np.testing.assert_allclose(fused[:, :3], emb)
+    np.testing.assert_allclose(fused[train_mask, 3:].mean(axis=0), 0.0, atol=1e-5)
+    np.testing.assert_allclose(fused[train_mask, 3:].std(axis=0), 1.0, atol=1e-5)
@@ -0,0 +1,105 @@
+"""Tests for incremental rescoring of new time steps"""
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+import pytest
+from torch_geometric.nn import HeteroConv, SAGEConv
+from src.data.adjacency import trd_edge_index_dict
+from src.models.hhgtn import E7_A3_Model, ALL_EDGE_TYPES
+from src.models.incremental import IncrementalScorer
+
+
+class TwoLayerHetero(nn.Module):
+    """Minimal 2-layer hetero model exposing get_embeddings/classifier."""
+
+    def __init__(self, hidden_dim=8):
+        super().__init__()
+        self.input_projs = nn.ModuleDict({
+            'transaction': nn.Linear(93, hidden_dim),
+            'address': nn.Linear(55, hidden_dim)
+        })
+        self.convs = nn.ModuleList([
+            HeteroConv({et: SAGEConv(hidden_dim, hidden_dim) for et in ALL_EDGE_TYPES}, aggr='sum')
+            for _ in range(2)
+        ])
+        self.classifier = nn.Linear(hidden_dim, 1)
+
+    def get_embeddings(self, x_dict, edge_index_dict):
+        h = {k: self.input_projs[k](x) for k, x in x_dict.items()}
+        for conv in self.convs:
+            h = {k: F.relu(v) for k, v in conv(h, edge_index_dict).items()}
+        return h
+
+
+def _temporal_graph(num_tx=60, num_addr=30, num_steps=4, num_edges=120, seed=0):
+    g = torch.Generator().manual_seed(seed)
+    x = {'transaction': torch.randn(num_tx, 93, generator=g),
+         'address': torch.randn(num_addr, 55, generator=g)}
+    # Node ids are sorted by time so the last step can be split off as "new"
+    t = {'transaction': torch.arange(num_tx) * num_steps // num_tx + 1,
+         'address': torch.arange(num_addr) * num_steps // num_addr + 1}
+    sizes = {'transaction': num_tx, 'address': num_addr}
+    e = {
+        et: torch.stack([
+            torch.randint(0, sizes[et[0]], (num_edges,), generator=g),
+            torch.randint(0, sizes[et[2]], (num_edges,), generator=g)
+        ])
+        for et in ALL_EDGE_TYPES
+    }
+    return x, e, t
+
+
+def _split_last_step(x, e, t):
+    last = int(t['transaction'].max())
+    n_old = {k: int((v < last).sum()) for k, v in t.items()}
+    old_x = {k: v[:n_old[k]] for k, v in x.items()}
+    old_t = {k: v[:n_old[k]] for k, v in t.items()}
+    new_x = {k: v[n_old[k]:] for k, v in x.items()}
+    new_t = {k: v[n_old[k]:] for k, v in t.items()}
+    old_e, new_e = {}, {}
+    for et, ei in e.items():
+        old = (ei[0] < n_old[et[0]]) & (ei[1] < n_old[et[2]])
+        old_e[et], new_e[et] = ei[:, old], ei[:, ~old]
+    return (old_x, old_e, old_t), (new_x, new_e, new_t), n_old
+
+
+def test_trd_message_graph_has_no_future_messages():
+    """Every kept message flows from an earlier-or-equal node."""
+    x, e, t = _temporal_graph()
+    for directed in (True, False):
+        msgs = trd_edge_index_dict(e, t, directed=directed)
+        for (src_type, _, dst_type), ei in msgs.items():
+            assert (t[src_type][ei[0]] <= t[dst_type][ei[1]]).all()
+
+
+@pytest.mark.parametrize('model_cls,num_layers', [(E7_A3_Model, 1), (TwoLayerHetero, 2)])
+def test_incremental_matches_full_recompute(model_cls, num_layers):
+    """Incremental update equals a full-graph pass on the grown graph."""
+    torch.manual_seed(0)
+    model = model_cls(hidden_dim=8).eval()
+    x, e, t = _temporal_graph()
+    (old_x, old_e, old_t), (new_x, new_e, new_t), _ = _split_last_step(x, e, t)
+
+    scorer = IncrementalScorer(model, old_x, old_e, old_t, num_layers=num_layers)
+    scorer.add_time_step(new_x, new_t, new_e)
+
+    full = IncrementalScorer(model, x, e, t, num_layers=num_layers)
+    for node_type in x:
+        torch.testing.assert_close(scorer.embeddings[node_type], full.embeddings[node_type])
+    torch.testing.assert_close(scorer.scores, full.scores)
+
+
+def test_only_new_step_is_rescored():
+    """Under TRD, existing nodes from earlier steps are never recomputed."""
+    model = E7_A3_Model(hidden_dim=8).eval()
+    x, e, t = _temporal_graph()
+    (old_x, old_e, old_t), (new_x, new_e, new_t), n_old = _split_last_step(x, e, t)
+
+    scorer = IncrementalScorer(model, old_x, old_e, old_t, num_layers=1)
+    before = scorer.scores.clone()
+    result = scorer.add_time_step(new_x, new_t, new_e)
+
+    for node_type, idx in result['affected'].items():
+        assert (idx >= n_old[node_type]).all()
+    assert torch.equal(scorer.scores[:n_old['transaction']], before)
+    assert result['scores'].numel() == new_x['transaction'].shape[0]
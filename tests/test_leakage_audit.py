@@ -0,0 +1,62 @@
+"""Tests for the per-batch TRD leakage audit"""
+import pytest
+import torch
+from src.data.adjacency import HeteroAdjacency, trd_edge_index_dict
+from src.data.leakage_audit import LeakageAudit
+from src.data.trd_sampler import TRDSampler
+from src.models.pipeline import PipelineExecutor
+
+
+def test_counts_future_edges():
+    """Edges from later to earlier nodes are counted per batch and in total."""
+    time_dict = {'transaction': torch.tensor([1, 2, 3]), 'address': torch.tensor([2, 5])}
+    audit = LeakageAudit(time_dict)
+    nodes = {'transaction': torch.tensor([0, 2]), 'address': torch.tensor([0, 1])}
+    edges = {
+        ('transaction', 'to', 'transaction'): torch.tensor([[0, 1], [1, 0]]),  # t3 -> t1 leaks
+        ('address', 'to', 'transaction'): torch.tensor([[0, 1], [1, 1]])       # t5 -> t3 leaks
+    }
+
+    assert audit.check(nodes, edges, sample_seconds=1.0) == 2
+    assert audit.check(nodes, {}) == 0
+    metrics = audit.metrics()
+    assert metrics['leakage_violations'] == 2
+    assert metrics['leakage_violating_batches'] == 1
+    assert metrics['leakage_batches_audited'] == 2
+    assert metrics['leakage_edges_audited'] == 4
+
+    with pytest.raises(RuntimeError):
+        LeakageAudit(time_dict, strict=True).check(nodes, edges)
+
+
+def test_trd_batches_pass_audit(tmp_path, make_graph):
+    """Batches sampled from the TRD index never violate; raw edges do."""
+    graph = make_graph()
+    num_nodes = {t: x.shape[0] for t, x in graph['x_dict'].items()}
+    trd = HeteroAdjacency(trd_edge_index_dict(graph['edge_index_dict'], graph['time_dict']), num_nodes)
+    raw = HeteroAdjacency(graph['edge_index_dict'], num_nodes)
+    seeds = {'transaction': torch.arange(0, 100, 7)}
+    audit = LeakageAudit(graph['time_dict'])
+
+    assert audit.check(*trd.sample(seeds, [5, 5], torch.Generator().manual_seed(0))) == 0
+    assert audit.check(*raw.sample(seeds, [5, 5], torch.Generator().manual_seed(0))) > 0
+
+    trd.save(tmp_path / 'adj.pt')
+    executor = PipelineExecutor(tmp_path / 'adj.pt', graph['x_dict'], graph['y'], [3, 3],
+                                batch_size=32, time_dict=graph['time_dict'])
+    report = executor.run_sequential(torch.arange(100), lambda *batch: 0.0)
+    assert report['leakage_batches_audited'] == 4 and report['leakage_violations'] == 0
+
+
+def test_trd_sampler_audits_every_batch():
+    """TRDSampler audits each sampled batch by default."""
+    edge_index = torch.tensor([[0, 1, 2, 3], [1, 2, 3, 0]])
+    timestamps = torch.tensor([1, 2, 3, 4])
+    sampler = TRDSampler(fanouts=[5, 5])
+    for target in range(4):
+        sampler.sample(edge_index, timestamps, torch.tensor([target]))
+
+    metrics = sampler.audit.metrics()
+    assert metrics['leakage_batches_audited'] == 4
+    assert metrics['leakage_violations'] == 0
+    assert TRDSampler(audit=False).audit is None
@@ -0,0 +1,65 @@
+"""Tests for the torch-native fraud metrics"""
+import numpy as np
+import torch
+import pytest
+from sklearn.metrics import average_precision_score, f1_score, precision_recall_curve, roc_auc_score
+from src.utils.metrics import StreamingMetrics, best_f1, binary_metrics, pr_auc, recall_at_k, roc_auc
+
+
+def _scores(n=5000, pos_rate=0.02, ties=False, seed=0):
+    rng = np.random.default_rng(seed)
+    y = (rng.random(n) < pos_rate).astype(np.int64)
+    score = rng.random(n) + 0.5 * y
+    if ties:
+        score = np.round(score, 2)
+    return y, score.astype(np.float32)
+
+
+@pytest.mark.parametrize('ties', [False, True])
+def test_auc_matches_sklearn(ties):
+    """PR-AUC (average precision) and ROC-AUC agree with sklearn, with and without ties."""
+    y, score = _scores(ties=ties)
+    assert abs(pr_auc(torch.from_numpy(y), torch.from_numpy(score)) - average_precision_score(y, score)) < 1e-6
+    assert abs(roc_auc(y, score) - roc_auc_score(y, score)) < 1e-6
+
+
+def test_best_f1_matches_sklearn():
+    """Best F1 equals the max over sklearn's PR curve and is achieved at the threshold."""
+    y, score = _scores(ties=True)
+    f1, threshold = best_f1(y, score)
+
+    precision, recall, _ = precision_recall_curve(y, score)
+    expected = np.max(2 * precision * recall / np.maximum(precision + recall, 1e-300))
+    assert abs(f1 - expected) < 1e-6
+    assert abs(f1_score(y, score >= threshold) - f1) < 1e-6
+
+
+def test_recall_at_k():
+    """Top-k recall matches the argsort definition."""
+    y, score = _scores()
+    k = int(len(y) * 0.01)
+    expected = y[np.argsort(score)[-k:]].sum() / y.sum()
+    assert abs(recall_at_k(y, score, 0.01) - expected) < 1e-12
+
+
+def test_streaming_equals_full():
+    """Accumulating mini-batches (with unknown labels) gives the full-set metrics."""
+    y, score = _scores()
+    y_masked = torch.from_numpy(y).clone()
+    y_masked[::7] = -1
+
+    metrics = StreamingMetrics()
+    for s, t in zip(torch.from_numpy(score).split(512), y_masked.split(512)):
+        metrics.update(s, t)
+
+    known = (y_masked >= 0).numpy()
+    assert metrics.num_samples == known.sum()
+    assert metrics.compute() == binary_metrics(y[known], score[known])
+    assert abs(metrics.compute()['pr_auc'] - average_precision_score(y[known], score[known])) < 1e-6
+
+
+def test_degenerate_inputs():
+    """Single-class inputs give NaN AUCs instead of raising."""
+    results = binary_metrics(np.zeros(10), np.random.rand(10))
+    assert np.isnan(results['pr_auc']) and np.isnan(results['roc_auc'])
+    assert np.isnan(roc_auc(np.ones(10), np.random.rand(10)))
@@ -0,0 +1,76 @@
+"""Tests for the torch.profiler integration"""
+import json
+
+import torch
+from src.data.co_address import CO_ADDRESS
+from src.models.hhgtn import ALL_EDGE_TYPES
+from src.models.trainer import trainer_from_config
+from src.utils.profiling import label_relations, profile_trainer
+
+
+def test_labels_do_not_change_outputs_or_gradients(make_graph):
+    graph = make_graph(num_tx=120, num_addr=80, num_edges=400)
+    trainer = trainer_from_config({'model': 'trd_hhgtn', 'dropout': 0.0}, graph)
+    model = trainer.model
+
+    def run():
+        model.zero_grad()
+        out = model(graph['x_dict'], graph['edge_index_dict'])
+        out.sum().backward()
+        return out.detach(), [p.grad.clone() for p in model.parameters() if p.grad is not None]
+
+    ref_out, ref_grads = run()
+    handles = label_relations(model)
+    assert len(handles) == 2 * (4 * model.num_layers + 1)  # + semantic attention
+    out, grads = run()
+    for h in handles:
+        h.remove()
+    assert torch.allclose(out, ref_out)
+    assert all(torch.allclose(a, b, atol=1e-6) for a, b in zip(grads, ref_grads))
+
+
+def test_profile_train_and_inference(tmp_path, make_graph):
+    graph = make_graph(num_tx=120, num_addr=80, num_edges=400)
+    for mode in ('train', 'inference'):
+        trainer = trainer_from_config({'model': 'e7_a3'}, graph)
+        report = profile_trainer(trainer, tmp_path / mode, mode, wait=0, warmup=1, active=2)
+        names = set(report['relations'])
+        assert {f'relation:{s}->{d}' for s, _, d in ALL_EDGE_TYPES} <= names
+        # Only relations feeding the transaction logits get gradients
+        backward = {n for n in names if n.endswith('_backward')}
+        assert (mode == 'train') == bool(backward)
+        assert all(r['calls'] == 2 for r in report['relations'].values())
+        assert (tmp_path / mode / 'trace.json').stat().st_size > 0
+        assert 'Self CPU' in (tmp_path / mode / 'summary.txt').read_text()
+        assert json.loads((tmp_path / mode / 'relations.json').read_text())['mode'] == mode
+        # Hooks are removed afterwards
+        assert not trainer.model.convs.convs[ALL_EDGE_TYPES[0]]._forward_hooks
+
+
+def test_shared_convs_are_labeled_once(tmp_path, make_graph):
+    """SimplifiedHHGTN reuses its relation convs across layers; each call is one range."""
+    graph = make_graph(num_tx=120, num_addr=80, num_edges=400)
+    trainer = trainer_from_config({'model': 'simplified_hhgtn'}, graph)
+    model = trainer.model
+    handles = label_relations(model)
+    assert len(handles) == 2 * len(model.conv1.convs)
+    for h in handles:
+        h.remove()
+
+    report = profile_trainer(trainer, tmp_path, 'inference', wait=0, warmup=1, active=2)
+    names = {f'relation:{s}->{d}' for s, _, d in ALL_EDGE_TYPES}
+    assert names <= set(report['relations'])
+    # 2 layers x 2 active steps
+    assert all(report['relations'][n]['calls'] == 4 for n in names)
+
+
+def test_parallel_relations_get_distinct_labels(tmp_path, make_graph):
+    """tx->tx and co_address->tx are profiled as separate ranges."""
+    tx_tx = ALL_EDGE_TYPES[0]
+    graph = make_graph(num_tx=120, num_addr=80, num_edges=400, edge_types=ALL_EDGE_TYPES + [CO_ADDRESS])
+    trainer = trainer_from_config({'model': 'simplified_hhgtn', 'edge_types': [tx_tx, CO_ADDRESS]}, graph)
+
+    report = profile_trainer(trainer, tmp_path, 'inference', wait=0, warmup=1, active=2)
+    names = {n for n in report['relations'] if n.startswith('relation:')}
+    assert names == {'relation:transaction->transaction', 'relation:transaction-co_address->transaction'}
+    assert all(report['relations'][n]['calls'] == 4 for n in names)
@@ -0,0 +1,46 @@
+"""Tests for int8 dynamic quantization of the E7-A3 scorer"""
+import torch
+import torch.nn as nn
+from src.models.hhgtn import E7_A3_Model
+from src.models.quantize import (
+    export_quantized_e7_a3, load_quantized_e7_a3, model_size_bytes, quantize_dynamic_int8
+)
+
+
+def test_all_linear_layers_quantized():
+    """Input projections, SAGE linears and classifier all become int8."""
+    model = E7_A3_Model(hidden_dim=32).eval()
+    qmodel = quantize_dynamic_int8(model)
+
+    assert not any(type(m) is nn.Linear for m in qmodel.modules())
+    num_quantized = sum(isinstance(m, torch.ao.nn.quantized.dynamic.Linear) for m in qmodel.modules())
+    assert num_quantized == 2 + 4 * 2 + 2  # projections, 4 x (lin_l, lin_r), attn, classifier
+    assert model_size_bytes(qmodel) < model_size_bytes(model)
+
+
+def test_int8_scores_close_to_fp32(make_graph):
+    """Quantization error on probabilities stays small."""
+    torch.manual_seed(0)
+    model = E7_A3_Model(hidden_dim=32).eval()
+    qmodel = quantize_dynamic_int8(model)
+    graph = make_graph()
+    x, e = graph['x_dict'], graph['edge_index_dict']
+    with torch.no_grad():
+        diff = (torch.sigmoid(model(x, e)) - torch.sigmoid(qmodel(x, e))).abs().max()
+    assert diff < 0.05
+
+
+def test_export_roundtrip(tmp_path, make_graph):
+    """Exported artifact reloads to an identical int8 scorer."""
+    torch.manual_seed(0)
+    model = E7_A3_Model(hidden_dim=32)
+    torch.save(model.state_dict(), tmp_path / 'a3_best.pt')
+
+    artifact = export_quantized_e7_a3(tmp_path / 'a3_best.pt', tmp_path / 'int8', hidden_dim=32)
+    reloaded = load_quantized_e7_a3(artifact)
+    expected = quantize_dynamic_int8(model.eval())
+
+    graph = make_graph()
+    x, e = graph['x_dict'], graph['edge_index_dict']
+    with torch.no_grad():
+        torch.testing.assert_close(reloaded(x, e), expected(x, e))
@@ -0,0 +1,165 @@
+"""Parity tests for the TRDSampler backends"""
+import numpy as np
+import pytest
+import torch
+from src.data.trd_sampler import BACKENDS, TRDSampler, pyglib_available
+
+
+def _graph(num_nodes=300, num_edges=3000, num_steps=10, seed=0):
+    g = torch.Generator().manual_seed(seed)
+    edge_index = torch.randint(0, num_nodes, (2, num_edges), generator=g)
+    timestamps = torch.randint(1, num_steps + 1, (num_nodes,), generator=g)
+    return edge_index, timestamps
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_no_future_neighbors_any_backend(backend):
+    edge_index, timestamps = _graph()
+    sampler = TRDSampler(fanouts=[8, 4], max_in_neighbors=5, max_out_neighbors=5,
+                         backend=backend, strict_audit=True)
+    for seed in range(5):
+        targets = torch.randint(0, 300, (32,), generator=torch.Generator().manual_seed(seed))
+        nodes, edges, layer_sizes = sampler.sample(edge_index, timestamps, targets,
+                                                   generator=torch.Generator().manual_seed(seed))
+        assert (timestamps[nodes[edges[0]]] <= timestamps[nodes[edges[1]]]).all()
+        assert torch.isin(targets, nodes).all()
+        assert layer_sizes[0] == targets.unique().numel()
+    assert sampler.audit.metrics()['leakage_violations'] == 0
+    if backend == 'pyglib' and not pyglib_available():
+        assert sampler.backend_used == 'vectorized'
+
+
+def test_backends_match_neighbor_counts_and_selection():
+    """Per-node neighbor counts are identical; neighbor choice is uniform on both paths."""
+    edge_index, timestamps = _graph()
+    targets = torch.arange(0, 300, 3)
+    counts = {}
+    for backend in ('python', 'vectorized'):
+        sampler = TRDSampler(fanouts=[6], max_in_neighbors=4, max_out_neighbors=4,
+                             allow_self_loops=False, backend=backend, instrument=True)
+        np.random.seed(0)
+        nodes, edges, _ = sampler.sample(edge_index, timestamps, targets, generator=torch.Generator().manual_seed(0))
+        counts[backend] = torch.bincount(nodes[edges[1]], minlength=300)[targets]
+        summary = sampler.stats.summary()['layers'][0]
+        counts[backend + '_stats'] = {k: summary[k] for k in ('candidates', 'time_kept', 'in_cap_hits',
+                                                               'out_cap_hits', 'fanout_hits', 'sampled')}
+    assert torch.equal(counts['python'], counts['vectorized'])
+    assert counts['python_stats'] == counts['vectorized_stats']
+
+    # Node 0 at t=5 with 4 valid in-neighbors, fanout 2: each chosen half the time
+    edge_index = torch.tensor([[1, 2, 3, 4, 5], [0, 0, 0, 0, 0]])
+    timestamps = torch.tensor([5, 1, 2, 3, 4, 9])
+    sampler = TRDSampler(fanouts=[2], allow_self_loops=False, backend='vectorized', audit=False)
+    generator = torch.Generator().manual_seed(0)
+    hits = torch.zeros(6)
+    for _ in range(2000):
+        nodes, edges, _ = sampler.sample(edge_index, timestamps, torch.tensor([0]), generator=generator)
+        hits[nodes[edges[0]]] += 1
+    assert hits[5] == 0
+    assert torch.allclose(hits[1:5] / 2000, torch.full((4,), 0.5), atol=0.05)
+
+
+def test_pyglib_matches_vectorized_counts():
+    """With fanout <= both caps the caps never bind, so per-node counts must match."""
+    pytest.importorskip('pyg_lib')
+    if not pyglib_available():
+        pytest.skip('pyg-lib has no neighbor_sample')
+    edge_index, timestamps = _graph()
+    targets = torch.arange(0, 300, 3)
+    counts = {}
+    for backend in ('vectorized', 'pyglib'):
+        sampler = TRDSampler(fanouts=[4], max_in_neighbors=4, max_out_neighbors=6,
+                             allow_self_loops=False, backend=backend, strict_audit=True)
+        assert sampler.backend_used == backend
+        nodes, edges, _ = sampler.sample(edge_index, timestamps, targets, generator=torch.Generator().manual_seed(0))
+        assert (timestamps[nodes[edges[0]]] <= timestamps[nodes[edges[1]]]).all()
+        counts[backend] = torch.bincount(nodes[edges[1]], minlength=300)[targets]
+    assert torch.equal(counts['vectorized'], counts['pyglib'])
+
+def test_unknown_backend_and_index_cache():
+    with pytest.raises(ValueError):
+        TRDSampler(backend='cuda')
+    edge_index, timestamps = _graph()
+    sampler = TRDSampler(backend='vectorized', instrument=True)
+    sampler.sample(edge_index, timestamps, torch.arange(10))
+    index = sampler._index
+    sampler.sample(edge_index, timestamps, torch.arange(10, 20))
+    assert sampler._index is index
+
+    # Timestamps that need a dtype conversion are still cached on the caller's tensor
+    timestamps = timestamps.int()
+    sampler.sample(edge_index, timestamps, torch.arange(10))
+    index = sampler._index
+    sampler.sample(edge_index, timestamps, torch.arange(10, 20))
+    assert sampler._index is index and index['times'].dtype == torch.long
+
+
+def test_recency_strategy_prefers_recent_valid_neighbors():
+    # Node 0 at t=10; in-neighbors 1..10 at times 1..10, node 11 in the future
+    edge_index = torch.stack([torch.arange(1, 12), torch.zeros(11, dtype=torch.long)])
+    timestamps = torch.tensor([10] + list(range(1, 12)))
+    with pytest.raises(ValueError):
+        TRDSampler(strategy='recency')
+
+    freq = {}
+    for tau in (1.0, 1e6):
+        sampler = TRDSampler(fanouts=[1], directed=False, allow_self_loops=False, backend='vectorized',
+                             strategy='recency', recency_tau=tau, strict_audit=True)
+        generator = torch.Generator().manual_seed(0)
+        hits = torch.zeros(12)
+        for _ in range(3000):
+            nodes, edges, _ = sampler.sample(edge_index, timestamps, torch.tensor([0]), generator=generator)
+            hits[nodes[edges[0]]] += 1
+        freq[tau] = hits / 3000
+    assert freq[1.0][11] == 0 and freq[1e6][11] == 0
+    # tau=1: weight ratio e per step -> the newest neighbor gets 1 - 1/e of the draws
+    assert freq[1.0][10] == pytest.approx(1 - 1 / torch.e, abs=0.03)
+    assert (freq[1.0][1:10].diff() > -0.01).all()
+    # Very slow decay ~ uniform over the 10 valid neighbors
+    assert torch.allclose(freq[1e6][1:11], torch.full((10,), 0.1), atol=0.025)
+
+    # At most `fanout` distinct neighbors per node
+    edge_index, timestamps = _graph()
+    sampler = TRDSampler(fanouts=[5], backend='vectorized', strategy='recency', allow_self_loops=False,
+                         strict_audit=True)
+    nodes, edges, _ = sampler.sample(edge_index, timestamps, torch.arange(50), generator=torch.Generator())
+    assert edges.unique(dim=1).shape[1] == edges.shape[1]
+    assert torch.bincount(edges[1]).max() <= 5
+
+
+def test_recency_weights_survive_large_preceding_rows():
+    """An early-time node behind many heavy rows keeps its recency bias (no cancellation)."""
+    # Nodes 0..1999 at t=49, each with 10 in-neighbors at t=49; query node 2000 at t=10
+    # with in-neighbors 2001..2010 at times 1..10
+    heavy_dst = torch.arange(2000).repeat_interleave(10)
+    heavy_src = (heavy_dst + torch.arange(1, 11).repeat(2000)) % 2000
+    query_src = torch.arange(2001, 2011)
+    edge_index = torch.cat([torch.stack([heavy_src, heavy_dst]),
+                            torch.stack([query_src, torch.full((10,), 2000)])], dim=1)
+    timestamps = torch.cat([torch.full((2000,), 49), torch.tensor([10]), torch.arange(1, 11)])
+
+    sampler = TRDSampler(fanouts=[1], directed=False, allow_self_loops=False, backend='vectorized',
+                         strategy='recency', recency_tau=1.0, strict_audit=True)
+    generator = torch.Generator().manual_seed(0)
+    hits = torch.zeros(2011)
+    for _ in range(2000):
+        nodes, edges, _ = sampler.sample(edge_index, timestamps, torch.tensor([2000]), generator=generator)
+        hits[nodes[edges[0]]] += 1
+    assert hits[2010] / 2000 == pytest.approx(1 - 1 / torch.e, abs=0.04)
+
+
+def test_index_cache_tracks_timestamps():
+    """New or modified timestamps on the same edge tensor rebuild the recency table."""
+    edge_index = torch.tensor([[1, 2], [0, 0]])
+    sampler = TRDSampler(fanouts=[2], directed=False, allow_self_loops=False, backend='vectorized',
+                         strategy='recency')
+    sampler.sample(edge_index, torch.tensor([5, 1, 2]), torch.tensor([0]), generator=torch.Generator())
+
+    # Neighbor 2 moves into node 0's future: it must not be sampled
+    timestamps = torch.tensor([5, 1, 9])
+    nodes, edges, _ = sampler.sample(edge_index, timestamps, torch.tensor([0]), generator=torch.Generator())
+    assert set(nodes[edges[0]].tolist()) == {1}
+    timestamps[1] = 7
+    nodes, edges, _ = sampler.sample(edge_index, timestamps, torch.tensor([0]), generator=torch.Generator())
+    assert edges.shape[1] == 0
+    assert sampler.audit.metrics()['leakage_violations'] == 0
@@ -0,0 +1,62 @@
+"""Tests for segment-softmax semantic attention (SegmentHHGTN)"""
+import torch
+from src.models.hhgtn import ALL_EDGE_TYPES, TX_TX, TRD_HHGTN, build_model
+from src.models.segment_hhgtn import SemanticAttention
+
+
+def test_segment_softmax_matches_padded_reference():
+    """Variable-length segments give the same mix as a padded, masked softmax."""
+    torch.manual_seed(0)
+    attention = SemanticAttention(8, ['transaction'], num_layers=1)
+    entries = torch.randn(7, 8)
+    index = torch.tensor([0, 1, 0, 2, 0, 1, 3])
+    out = attention(0, 'transaction', entries, index, num_nodes=5)
+
+    query = attention.query['transaction'][0]
+    for node in range(5):
+        own = entries[index == node]
+        if own.numel() == 0:
+            assert torch.equal(out[node], torch.zeros(8))
+            continue
+        alpha = torch.softmax((torch.tanh(own) * query).sum(-1), dim=0)
+        torch.testing.assert_close(out[node], (alpha.unsqueeze(-1) * own).sum(0))
+
+
+def test_nodes_without_messages_keep_their_own_projection(make_graph):
+    """A node with no in-edges attends only over its self entry."""
+    torch.manual_seed(0)
+    model = build_model('segment_hhgtn', hidden_dim=16, num_layers=1, edge_types=[TX_TX]).eval()
+    graph = make_graph(num_tx=50, num_addr=20, num_edges=120)
+    edges = {TX_TX: torch.tensor([[0, 1], [2, 2]])}
+    with torch.no_grad():
+        h = model.encode(graph['x_dict'])
+        out = model.propagate(0, h, edges)
+        expected = torch.relu(model.self_projections[0]['transaction'](h['transaction'][5]))
+    torch.testing.assert_close(out['transaction'][5], expected)
+    assert not torch.allclose(out['transaction'][2],
+                              torch.relu(model.self_projections[0]['transaction'](h['transaction'][2])))
+
+
+def test_segment_model_trains_attention_vectors(make_graph):
+    torch.manual_seed(0)
+    model = build_model('segment_hhgtn', hidden_dim=16)
+    graph = make_graph(num_tx=50, num_addr=20, num_edges=120)
+    logits = model(graph['x_dict'], graph['edge_index_dict'])
+    assert logits.shape == (50,)
+    logits.sum().backward()
+    assert all(p.grad is not None and p.grad.abs().sum() > 0 for p in model.semantic_attention.parameters())
+
+
+def test_mha_reference_loads_e6_checkpoint(make_graph):
+    """apply_semantic_attention only changes forward; E6 weights load unchanged."""
+    metadata = (['transaction', 'address'], ALL_EDGE_TYPES)
+    torch.manual_seed(0)
+    e6 = TRD_HHGTN(metadata, hidden_dim=16)
+    mha = TRD_HHGTN(metadata, hidden_dim=16, apply_semantic_attention=True)
+    mha.load_state_dict(e6.state_dict())
+
+    graph = make_graph(num_tx=50, num_addr=20, num_edges=120)
+    with torch.no_grad():
+        out = mha.eval()(graph['x_dict'], graph['edge_index_dict'])
+    assert out.shape == (50,)
+    assert not torch.allclose(out, e6.eval()(graph['x_dict'], graph['edge_index_dict']))
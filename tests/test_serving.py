@@ -0,0 +1,188 @@
+"""Tests for the async micro-batching scoring server"""
+import asyncio
+import json
+import torch
+import pytest
+from src.data.adjacency import HeteroAdjacency, trd_edge_index_dict
+from src.data.co_address import CO_ADDRESS
+from src.models.hhgtn import build_model
+from src.models.serving import ScoringServer
+
+
+def _graph(make_graph):
+    graph = make_graph(num_tx=120, num_addr=60, num_edges=400, num_steps=9)
+    return graph['x_dict'], trd_edge_index_dict(graph['edge_index_dict'], graph['time_dict']), graph['num_nodes']
+
+
+def _model(name='simplified_hhgtn'):
+    torch.manual_seed(0)
+    return build_model(name, hidden_dim=16).eval()
+
+
+def test_adjacency_save_load(tmp_path, make_graph):
+    """The persisted index reloads (memory-mapped) with identical CSR arrays."""
+    _, e, sizes = _graph(make_graph)
+    adjacency = HeteroAdjacency(e, sizes)
+    adjacency.save(tmp_path / 'adj.pt')
+    loaded = HeteroAdjacency.load(tmp_path / 'adj.pt')
+
+    assert loaded.num_nodes == adjacency.num_nodes
+    for et, (ptr, src) in adjacency.csr.items():
+        assert torch.equal(loaded.csr[et][0], ptr)
+        assert torch.equal(loaded.csr[et][1], src)
+
+
+@pytest.mark.parametrize('name', ['e7_a3', 'simplified_hhgtn'])
+def test_batched_scores_match_full_graph(name, make_graph):
+    """Micro-batched scores of indexed transactions equal full-graph scores."""
+    model = _model(name)
+    x, e, sizes = _graph(make_graph)
+    ids = [5, 17, 17, 99, 3]
+
+    async def run():
+        async with ScoringServer(model, x, HeteroAdjacency(e, sizes), max_wait_ms=50) as server:
+            return await asyncio.gather(*(server.score(tx_id=i) for i in ids))
+
+    probs = torch.tensor(asyncio.run(run()))
+    with torch.no_grad():
+        expected = torch.sigmoid(model(x, e))[ids]
+    torch.testing.assert_close(probs, expected)
+
+
+def test_new_transaction_matches_appended_graph(make_graph):
+    """A feature-row request scores like the same node appended to the graph."""
+    model = _model()
+    x, e, sizes = _graph(make_graph)
+    features = torch.randn(93)
+    neighbors = {'transaction': [4, 8], 'address': [1, 2, 3]}
+
+    async def run():
+        async with ScoringServer(model, x, HeteroAdjacency(e, sizes)) as server:
+            return await server.score(features=features.tolist(), neighbors=neighbors)
+
+    new_id = sizes['transaction']
+    x_full = {**x, 'transaction': torch.cat([x['transaction'], features[None]])}
+    e_full = dict(e)
+    for src_type, ids in neighbors.items():
+        et = (src_type, 'to', 'transaction')
+        e_full[et] = torch.cat([e[et], torch.tensor([ids, [new_id] * len(ids)])], dim=1)
+    with torch.no_grad():
+        expected = torch.sigmoid(model(x_full, e_full))[new_id]
+    assert abs(asyncio.run(run()) - float(expected)) < 1e-5
+
+
+def test_requests_are_coalesced(make_graph):
+    """Concurrent requests share model calls and respect max_batch_size."""
+    model = _model()
+    x, e, sizes = _graph(make_graph)
+
+    async def run():
+        async with ScoringServer(model, x, HeteroAdjacency(e, sizes),
+                                 max_batch_size=16, max_wait_ms=20) as server:
+            await asyncio.gather(*(server.score(tx_id=i % 120) for i in range(64)))
+            with pytest.raises(ValueError):
+                await server.score(tx_id=10_000)
+            return server.stats.summary()
+
+    stats = asyncio.run(run())
+    assert stats['requests'] == 64
+    assert stats['batches'] < 64
+    assert max(int(k[2:]) for k in stats['batch_size_histogram']) <= 16
+    assert stats['p99_ms'] >= stats['p50_ms'] > 0
+
+
+def test_tcp_roundtrip(make_graph):
+    """JSON-lines endpoint returns probabilities, errors and stats."""
+    model = _model()
+    x, e, sizes = _graph(make_graph)
+
+    async def run():
+        async with ScoringServer(model, x, HeteroAdjacency(e, sizes)) as server:
+            tcp = await server.serve_tcp(port=0)
+            port = tcp.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            responses = []
+            for message in ({'tx_id': 7}, {'tx_id': -1}, {'op': 'stats'}):
+                writer.write((json.dumps(message) + '\n').encode())
+                await writer.drain()
+                responses.append(json.loads(await reader.readline()))
+            writer.close()
+            tcp.close()
+            await tcp.wait_closed()
+            return responses
+
+    prob, error, stats = asyncio.run(run())
+    assert 0.0 <= prob['prob'] <= 1.0
+    assert 'error' in error
+    assert stats['requests'] == 1 and stats['num_targets'] == 120
+
+
+def test_neighbors_are_keyed_by_relation(make_graph):
+    """Node-type neighbors use the raw relation only; derived ones must be named."""
+    model = _model()
+    x, e, sizes = _graph(make_graph)
+    e = {**e, CO_ADDRESS: torch.tensor([[1, 2, 3], [4, 5, 6]])}
+    features = torch.randn(93)
+    neighbors = {'transaction': [4, 8], 'transaction__co_address__transaction': [2]}
+
+    async def run():
+        async with ScoringServer(model, x, HeteroAdjacency(e, sizes)) as server:
+            with pytest.raises(ValueError):
+                await server.score(features=features.tolist(), neighbors={'address__co_address__transaction': [1]})
+            return await server.score(features=features.tolist(), neighbors=neighbors)
+
+    new_id = sizes['transaction']
+    x_full = {**x, 'transaction': torch.cat([x['transaction'], features[None]])}
+    e_full = dict(e)
+    for et, ids in ((('transaction', 'to', 'transaction'), [4, 8]), (CO_ADDRESS, [2])):
+        e_full[et] = torch.cat([e[et], torch.tensor([ids, [new_id] * len(ids)])], dim=1)
+    with torch.no_grad():
+        expected = torch.sigmoid(model(x_full, e_full))[new_id]
+    assert abs(asyncio.run(run()) - float(expected)) < 1e-5
+
+
+def test_server_lifecycle(make_graph):
+    """Scoring needs start(); a stopped server can be started again."""
+    model = _model()
+    x, e, sizes = _graph(make_graph)
+    server = ScoringServer(model, x, HeteroAdjacency(e, sizes))
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            await server.score(tx_id=1)
+        probs = []
+        for _ in range(2):
+            async with server:
+                probs.append(await server.score(tx_id=1))
+        return probs
+
+    first, second = asyncio.run(run())
+    assert first == second
+
+
+def test_tcp_reports_model_failures(monkeypatch, make_graph):
+    """Unexpected scoring failures come back as an error line, not a dropped connection."""
+    model = _model()
+    x, e, sizes = _graph(make_graph)
+
+    def fail(batch):
+        raise RuntimeError('model crashed')
+
+    async def run():
+        async with ScoringServer(model, x, HeteroAdjacency(e, sizes)) as server:
+            monkeypatch.setattr(server, 'score_batch', fail)
+            tcp = await server.serve_tcp(port=0)
+            port = tcp.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            responses = []
+            for _ in range(2):
+                writer.write((json.dumps({'tx_id': 7}) + '\n').encode())
+                await writer.drain()
+                responses.append(json.loads(await reader.readline()))
+            writer.close()
+            tcp.close()
+            await tcp.wait_closed()
+            return responses
+
+    for response in asyncio.run(run()):
+        assert 'model crashed' in response['error']
@@ -0,0 +1,70 @@
+"""Tests for the parallel sweep runner"""
+import csv
+import json
+import torch
+from src.models.hhgtn import ALL_EDGE_TYPES
+from src.utils.sweep import expand_grid, load_sweep_config, load_shared_graph, run_sweep, share_graph
+
+
+def test_load_sweep_config(tmp_path):
+    """Explicit runs and grid expansion share the base config."""
+    path = tmp_path / 'sweep.json'
+    path.write_text(json.dumps({
+        'base': {'model': 'e7_a3', 'lr': 0.01},
+        'runs': [{'name': 'a'}],
+        'grid': {'hidden_dim': [8, 16], 'dropout': [0.1]}
+    }))
+    configs = load_sweep_config(path)
+
+    assert len(configs) == 3
+    assert all(c['model'] == 'e7_a3' and c['lr'] == 0.01 for c in configs)
+    assert {c['hidden_dim'] for c in configs[1:]} == {8, 16}
+    assert len({c['name'] for c in configs}) == 3
+    assert len(expand_grid({'a': [1, 2], 'b': [3, 4, 5]})) == 6
+
+
+def test_shared_graph_roundtrip(tmp_path, make_hetero_data):
+    """The shared file reloads the run tensors unchanged."""
+    data = make_hetero_data(num_tx=80, num_addr=40, num_edges=200)
+    graph = load_shared_graph(share_graph(data, tmp_path / 'graph.pt'))
+
+    assert torch.equal(graph['x_dict']['transaction'], data['transaction'].x)
+    assert torch.equal(graph['edge_index_dict'][ALL_EDGE_TYPES[0]], data[ALL_EDGE_TYPES[0]].edge_index)
+
+
+def test_parallel_sweep_writes_results(tmp_path, make_hetero_data):
+    """Runs in a process pool and writes one CSV row / JSON record per config."""
+    graph_path = share_graph(make_hetero_data(num_tx=80, num_addr=40, num_edges=200), tmp_path / 'graph.pt')
+    configs = [
+        {'name': 'A1', 'model': 'simplified_hhgtn', 'hidden_dim': 8,
+         'edge_types': [['transaction', 'to', 'transaction']], 'max_epochs': 2},
+        {'name': 'A3', 'model': 'e7_a3', 'hidden_dim': 8, 'max_epochs': 2}
+    ]
+    records = run_sweep(configs, graph_path, tmp_path / 'out', 'e7', workers=2, threads_per_worker=1)
+
+    assert {r['name'] for r in records} == {'A1', 'A3'}
+    assert len({r['pid'] for r in records}) >= 1 and all(r['threads'] == 1 for r in records)
+    with open(tmp_path / 'out' / 'e7.csv') as f:
+        rows = list(csv.DictReader(f))
+    assert {r['name'] for r in rows} == {'A1', 'A3'}
+    assert 'test_pr_auc' in rows[0]
+    assert len(json.loads((tmp_path / 'out' / 'e7.json').read_text())) == 2
+
+
+def test_in_process_sweep_isolates_caller(tmp_path, make_hetero_data):
+    """workers=1 restores the caller's threads, leaves the worker graph unset and skips a failing config."""
+    from src.utils import sweep
+
+    graph_path = share_graph(make_hetero_data(num_tx=80, num_addr=40, num_edges=200), tmp_path / 'graph.pt')
+    configs = [
+        {'name': 'bad', 'model': 'no_such_model', 'max_epochs': 2},
+        {'name': 'A3', 'model': 'e7_a3', 'hidden_dim': 8, 'max_epochs': 2}
+    ]
+    threads = torch.get_num_threads()
+    records = run_sweep(configs, graph_path, tmp_path / 'out', 'e7', workers=1,
+                        threads_per_worker=threads + 1)
+
+    assert [r['name'] for r in records] == ['A3']
+    assert records[0]['threads'] == threads + 1
+    assert torch.get_num_threads() == threads
+    assert sweep._GRAPH is None
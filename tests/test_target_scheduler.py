@@ -0,0 +1,81 @@
+"""Tests for the class-aware target batch scheduler"""
+import torch
+from src.data.adjacency import HeteroAdjacency
+from src.data.target_scheduler import ClassAwareScheduler
+from src.models.hhgtn import build_model
+from src.models.pipeline import PipelineExecutor, make_step_fn
+
+
+def _labels(num_tx=200, seed=0):
+    """~5% fraud, ~20% unknown (-1)."""
+    g = torch.Generator().manual_seed(seed)
+    y = (torch.rand(num_tx, generator=g) < 0.05).long()
+    y[torch.rand(num_tx, generator=g) < 0.2] = -1
+    return y
+
+
+def test_batches_are_fraud_enriched():
+    """Each batch holds the requested positive share; unknown labels are dropped."""
+    y = _labels()
+    scheduler = ClassAwareScheduler(torch.arange(200), y, batch_size=20, fraud_ratio=0.25)
+    batches = scheduler.epoch(seed=0)
+
+    assert len(batches) == scheduler.num_batches
+    for ids, weights in batches:
+        assert ids.numel() == weights.numel() == 20
+        assert (y[ids] == 1).sum() == 5 and (y[ids] >= 0).all()
+    seen = torch.cat([ids for ids, _ in batches])
+    assert set(seen[y[seen] == 1].tolist()) == set(torch.nonzero(y == 1).view(-1).tolist())
+    assert scheduler.summary()['targets_processed'] == 20 * len(batches)
+
+
+def test_weighted_loss_is_unbiased():
+    """Importance-weighted batch means average to the full-data mean."""
+    y = _labels()
+    targets = torch.nonzero(y >= 0).view(-1)
+    losses = torch.rand(y.numel(), generator=torch.Generator().manual_seed(1)) + 2.0 * (y == 1)
+    scheduler = ClassAwareScheduler(targets, y, batch_size=16, hard_negative_ratio=0.5, hard_pool_size=20)
+    scheduler.update_scores(targets, losses[targets])
+
+    estimates = [(losses[ids] * weights).mean() for seed in range(300) for ids, weights in scheduler.epoch(seed)]
+    assert abs(torch.stack(estimates).mean() - losses[targets].mean()) < 0.03
+
+
+def test_hard_negatives_come_from_top_scores():
+    """After scoring, the hard share of each batch is drawn from the top-scored negatives."""
+    y = _labels()
+    targets = torch.nonzero(y >= 0).view(-1)
+    scheduler = ClassAwareScheduler(targets, y, batch_size=20, fraud_ratio=0.25,
+                                    hard_negative_ratio=0.4, hard_pool_size=10)
+    assert scheduler.epoch(0)[0][1].unique().numel() == 2  # uniform negatives before any scores
+
+    scores = torch.rand(targets.numel(), generator=torch.Generator().manual_seed(0))
+    scheduler.update_scores(targets, scores)
+    negatives = targets[y[targets] == 0]
+    top = set(negatives[torch.argsort(scheduler.scores[negatives], descending=True)[:10]].tolist())
+    for ids, weights in scheduler.epoch(1):
+        hard = ids[5:5 + scheduler.num_hard]
+        assert set(hard.tolist()) <= top
+        assert (weights[5:5 + scheduler.num_hard] < weights[-1]).all()
+
+
+def test_pipeline_with_scheduler(tmp_path, make_graph):
+    """Scheduled batches train through the executor and feed scores back."""
+    graph = make_graph(num_tx=200, num_addr=50, num_edges=400)
+    graph['y'] = _labels()
+    HeteroAdjacency(graph['edge_index_dict'], {t: x.shape[0] for t, x in graph['x_dict'].items()}).save(
+        tmp_path / 'adj.pt')
+    torch.manual_seed(0)
+    model = build_model('e7_a3', hidden_dim=8)
+    step = make_step_fn(model, torch.optim.Adam(model.parameters(), lr=0.01),
+                        torch.nn.BCEWithLogitsLoss(pos_weight=torch.tensor([2.0])), return_scores=True)
+    scheduler = ClassAwareScheduler(torch.nonzero(graph['y'] >= 0).view(-1), graph['y'], batch_size=16)
+
+    executor = PipelineExecutor(tmp_path / 'adj.pt', graph['x_dict'], graph['y'], [3, 3], num_samplers=1)
+    report = executor.run_sequential(None, step, scheduler=scheduler)
+
+    assert report['batches'] == scheduler.num_batches
+    assert report['targets_processed'] == 16 * scheduler.num_batches and report['loss'] > 0
+    assert (~torch.isnan(scheduler.scores)).sum() > 0
+    with executor:
+        assert executor.run_epoch(None, step, seed=1, scheduler=scheduler)['batches'] == scheduler.num_batches
@@ -0,0 +1,61 @@
+"""Tests for time-sorted snapshot views"""
+import torch
+from src.data.temporal_graph import TemporalGraph
+from src.models.hhgtn import ALL_EDGE_TYPES
+
+
+def _original_edges(graph, et, t0, t1):
+    """Reference: original edges appearing in [t0, t1] via boolean masks."""
+    e = graph['edge_index_dict'][et]
+    edge_time = torch.maximum(graph['time_dict'][et[0]][e[0]], graph['time_dict'][et[2]][e[1]])
+    keep = (edge_time >= t0) & (edge_time <= t1)
+    return set(zip(e[0, keep].tolist(), e[1, keep].tolist()))
+
+
+def test_as_of_and_window_match_masks(make_graph):
+    """Views contain exactly the nodes/edges a timestamp mask would select."""
+    graph = make_graph()
+    tg = TemporalGraph(graph['x_dict'], graph['edge_index_dict'], graph['time_dict'],
+                       {'transaction': {'y': graph['y']}})
+
+    for t0, t1 in [(1, 3), (2, 4), (5, 5)]:
+        view = tg.window(t0, t1)
+        for node_type, time in graph['time_dict'].items():
+            assert view.num_nodes[node_type] == int((time <= t1).sum())
+            born = tg.to_original(node_type, view.new_nodes(node_type))
+            assert set(born.tolist()) == set(((time >= t0) & (time <= t1)).nonzero().view(-1).tolist())
+        for et, e in view.edge_index_dict.items():
+            src, dst = tg.to_original(et[0], e[0]), tg.to_original(et[2], e[1])
+            assert set(zip(src.tolist(), dst.tolist())) == _original_edges(graph, et, t0, t1)
+
+    view = tg.as_of(3)
+    tx = tg.to_original('transaction', torch.arange(view.num_nodes['transaction']))
+    assert torch.equal(view.x_dict['transaction'], graph['x_dict']['transaction'][tx])
+    assert torch.equal(view.node_attrs['transaction']['y'], graph['y'][tx])
+
+
+def test_views_are_zero_copy(make_graph):
+    """Views share storage with the parent graph."""
+    graph = make_graph()
+    tg = TemporalGraph(graph['x_dict'], graph['edge_index_dict'], graph['time_dict'])
+    view = tg.window(2, 3)
+
+    assert view.x_dict['address'].data_ptr() == tg.x_dict['address'].data_ptr()
+    et = ALL_EDGE_TYPES[0]
+    assert view.edge_index_dict[et].untyped_storage().data_ptr() == \
+        tg.edge_index_dict[et].untyped_storage().data_ptr()
+
+
+def test_homogeneous_and_induced_window(make_graph):
+    """Single-type graphs expose x / edge_index; induced windows use local ids."""
+    graph = make_graph()
+    et = ('transaction', 'to', 'transaction')
+    tg = TemporalGraph.from_homogeneous(graph['x_dict']['transaction'], graph['edge_index_dict'][et],
+                                        graph['time_dict']['transaction'], y=graph['y'])
+    view = tg.as_of(2)
+    assert view.x.shape[0] == view['y'].shape[0] == int((graph['time_dict']['transaction'] <= 2).sum())
+    assert view.edge_index.max() < view.x.shape[0]
+
+    induced = tg.induced_window(3, 4)
+    assert (induced['time'] >= 3).all() and (induced['time'] <= 4).all()
+    assert induced.edge_index.numel() == 0 or induced.edge_index.max() < induced.x.shape[0]
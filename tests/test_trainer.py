@@ -0,0 +1,31 @@
+"""Tests for the full-graph trainer"""
+import torch
+from src.data.adjacency import sample_in_edges
+from src.models.trainer import trainer_from_config
+
+
+def test_sample_in_edges_caps_degree():
+    """At most `fanout` in-edges per destination, all from the original set."""
+    edge_index = torch.randint(0, 20, (2, 500), generator=torch.Generator().manual_seed(0))
+    sampled = sample_in_edges(edge_index, 20, 3, torch.Generator().manual_seed(1))
+
+    in_deg = torch.bincount(edge_index[1], minlength=20)
+    assert torch.equal(torch.bincount(sampled[1], minlength=20), in_deg.clamp(max=3))
+    original = set(map(tuple, edge_index.T.tolist()))
+    assert all(tuple(e) in original for e in sampled.T.tolist())
+
+
+def test_fit_restores_best_and_reports_splits(make_graph):
+    """fit() early-stops, restores the best val state and evaluates every split."""
+    graph = make_graph()
+    graph['y'][::10] = -1
+    trainer = trainer_from_config({
+        'model': 'simplified_hhgtn', 'hidden_dim': 16,
+        'edge_types': [['transaction', 'to', 'transaction']], 'fanout': 5
+    }, graph)
+
+    result = trainer.fit(max_epochs=6, patience=3, verbose=False)
+    assert set(result) >= {'train', 'val', 'test', 'best_epoch', 'history'}
+    assert abs(result['val']['pr_auc'] - max(result['history']['val_pr_auc'])) < 1e-9
+    assert 'recall@1%' in result['test']
+    assert len(trainer.model.conv1.convs) == 1
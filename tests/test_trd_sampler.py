@@ -143,3 +143,31 @@ def test_multiple_targets():
     # Both targets should be in sampled nodes
     assert 1 in sampled_nodes
     assert 2 in sampled_nodes
+
+
+def test_instrumentation_stats():
+    """Instrumented sampler aggregates phase times and per-layer counters."""
+    # Target 0 (t=5) has in-neighbors 1..6: three past (t=1), three future (t=9)
+    edge_index = torch.tensor([[1, 2, 3, 4, 5, 6], [0, 0, 0, 0, 0, 0]], dtype=torch.long)
+    timestamps = torch.tensor([5, 1, 1, 1, 9, 9, 9], dtype=torch.long)
+    targets = torch.tensor([0], dtype=torch.long)
+
+    sampler = TRDSampler(fanouts=[1], max_in_neighbors=2, instrument=True)
+    for _ in range(3):
+        sampler.sample(edge_index, timestamps, targets)
+
+    summary = sampler.stats.summary()
+    assert summary['calls'] == 3 and summary['targets'] == 3
+    assert all(v >= 0 for v in summary['seconds'].values())
+    layer = summary['layers'][0]
+    assert layer['frontier'] == 3 and layer['mean_frontier'] == 1
+    assert layer['candidates'] == 18 and layer['time_kept'] == 9
+    assert layer['time_filtered_fraction'] == pytest.approx(0.5)
+    assert layer['in_cap_rate'] == 1.0 and layer['fanout_cap_rate'] == 1.0
+    assert layer['sampled'] == 3
+
+    metrics = sampler.stats.metrics()
+    assert metrics['sampler_layer0_time_filtered_fraction'] == pytest.approx(0.5)
+    assert sampler.stats.pop()['calls'] == 3
+    assert sampler.stats.summary()['calls'] == 0
+    assert TRDSampler().stats is None